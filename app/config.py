@@ -22,6 +22,73 @@ class Settings(BaseSettings):
     # Anthropic Claude (optional)
     ANTHROPIC_API_KEY: Optional[str] = None
     
+    # "auto" tries Gemini then Groq; "fake" uses the offline FakeLLM for load tests
+    AI_PROVIDER: str = "auto"
+    # FakeLLM latency is log-normal around the median; sigma 0 makes it constant
+    FAKE_LLM_MEDIAN_MS: float = 800
+    FAKE_LLM_SIGMA: float = 0.5
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_MALFORMED_RATE: float = 0.0
+    FAKE_LLM_SEED: Optional[int] = None
+    
+    # Trained weight-forecast model (app.scripts.train_weight_model)
+    WEIGHT_MODEL_PATH: str = "models/weight_forecast.joblib"
+    
+    # Response compression (brotli is used when the package is installed)
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    # Fraction of DEBUG records kept
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1
+    
+    # MongoDB commands at or above this are logged with their filter shape
+    SLOW_QUERY_MS: float = 100
+    
+    # Event-loop stalls past this are reported with the blocking stack,
+    # at most once per LOOP_LAG_STACK_INTERVAL_S
+    LOOP_LAG_THRESHOLD_MS: float = 100
+    LOOP_LAG_STACK_INTERVAL_S: float = 60
+    
+    # Request traces: requests slower than TRACE_SLOW_MS are always exported,
+    # the rest at TRACE_SAMPLE_RATE
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_SLOW_MS: float = 1000
+    TRACE_EXPORT_PATH: str = "traces/traces.jsonl"
+    # /traces/slowest serves span trees and timings without auth; enable only
+    # where the port is not publicly reachable
+    TRACES_ENDPOINT_ENABLED: bool = False
+    
+    # Motor connection pool, per worker process. Unset values keep the driver
+    # defaults; compressors is a comma list from zstd, snappy, zlib (zstd and
+    # snappy need the zstandard / python-snappy packages)
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_COMPRESSORS: Optional[str] = None
+    
+    # Startup waits this long for MongoDB to answer before failing, then opens
+    # MONGO_WARM_CONNECTIONS pooled connections; /ready pings with READY_TIMEOUT_S
+    MONGO_STARTUP_TIMEOUT_S: float = 30
+    MONGO_WARM_CONNECTIONS: int = 4
+    READY_TIMEOUT_S: float = 2
+    
+    # Adaptive concurrency limits per route class (see ConcurrencyLimitMiddleware):
+    # the most requests in flight per worker, and the latency above which the
+    # limit backs off
+    CONCURRENCY_LIMITS_ENABLED: bool = True
+    CONCURRENCY_AI_MAX: int = 16
+    CONCURRENCY_AI_TARGET_MS: float = 8000
+    CONCURRENCY_AUTH_MAX: int = 8
+    CONCURRENCY_AUTH_TARGET_MS: float = 1000
+    CONCURRENCY_CRUD_MAX: int = 200
+    CONCURRENCY_CRUD_TARGET_MS: float = 250
+    
     class Config:
         env_file = ".env"
         extra = "ignore"  # This allows extra fields in .env without errors
@@ -1,23 +1,85 @@
+import asyncio
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
 from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.db_monitor import command_listener, pool_listener
+
+logger = get_logger(__name__)
 
 client = None
 db = None
 
+def client_options() -> dict:
+    """Pool and wire options from settings; unset ones keep the driver defaults"""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "compressors": settings.MONGO_COMPRESSORS
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
 async def connect_to_mongo():
     global client, db
     try:
-        client = AsyncIOMotorClient(settings.MONGODB_URI)
+        options = client_options()
+        client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            event_listeners=[command_listener, pool_listener],
+            **options
+        )
         db = client.get_database()
-        print("✅ Connected to MongoDB successfully")
-    except Exception as e:
-        print(f"❌ MongoDB connection error: {e}")
+        logger.info("connected to MongoDB", extra=options)
+    except Exception:
+        logger.exception("MongoDB connection error")
+        raise
 
 async def close_mongo_connection():
     global client
     if client:
         client.close()
-        print("✅ Closed MongoDB connection")
+        logger.info("closed MongoDB connection")
+
+async def ensure_indexes():
+    """Create indexes the application relies on (idempotent)"""
+    if db is None:
+        return
+    await db.personal_records.create_index(
+        [("user_id", 1), ("exercise_id", 1)], unique=True
+    )
+    await db.daily_totals.create_index(
+        [("user_id", 1), ("day", 1)], unique=True
+    )
+    await db.weight_logs.create_index([("user_id", 1), ("date", 1)])
+    logger.info("database indexes ensured")
+
+async def ping_database(timeout: float):
+    """Round trip to the server; raises if it does not answer within timeout"""
+    if db is None:
+        raise PyMongoError("not connected")
+    await asyncio.wait_for(db.command("ping"), timeout)
+
+async def wait_for_database(timeout: float):
+    """Retry pings with backoff until MongoDB answers or timeout runs out"""
+    deadline = time.monotonic() + timeout
+    delay = 0.5
+    while True:
+        try:
+            await ping_database(max(0.1, min(5.0, deadline - time.monotonic())))
+            return
+        except (PyMongoError, asyncio.TimeoutError) as e:
+            if time.monotonic() + delay >= deadline:
+                raise
+            logger.warning("MongoDB not reachable yet, retrying", extra={"error": str(e), "retry_in_s": delay})
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+async def warm_pool(connections: int):
+    """Open pooled connections up front so the first requests skip the handshakes"""
+    await asyncio.gather(*(db.command("ping") for _ in range(connections)))
 
 def get_database():
     return db
\ No newline at end of file
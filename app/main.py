@@ -1,15 +1,62 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import connect_to_mongo, close_mongo_connection
-from app.routers import auth, users, workouts, meals, social, ai, water  # ADD water here
+from app.utils.serialization import ORJSONResponse
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware, metrics_response
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.concurrency import ConcurrencyLimitMiddleware
+from app.utils.logger import setup_logging, get_logger, RequestContextMiddleware
+from app.utils.loop_monitor import loop_monitor
+from app.utils.tracing import TracingMiddleware, exporter
+from app.config import settings
+from app.database import (
+    connect_to_mongo, close_mongo_connection, ensure_indexes,
+    ping_database, wait_for_database, warm_pool
+)
+
+# Before the routers import, since the AI clients log while initializing
+setup_logging()
+
+from app.routers import auth, users, workouts, meals, social, ai, water, analytics  # ADD water here
+from app.services.weight_forecast import weight_forecaster
+
+logger = get_logger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm everything the first requests would otherwise pay for
+
+    Fails startup if MongoDB does not answer within MONGO_STARTUP_TIMEOUT_S,
+    so the orchestrator restarts the pod instead of routing traffic to it.
+    """
+    app.state.ready = False
+    await connect_to_mongo()
+    await wait_for_database(settings.MONGO_STARTUP_TIMEOUT_S)
+    await warm_pool(settings.MONGO_WARM_CONNECTIONS)
+    await ensure_indexes()
+    weight_forecaster.load()
+    ai.init_ai_providers()
+    loop_monitor.start()
+    app.state.ready = True
+    logger.info("startup complete")
+    
+    yield
+    
+    app.state.ready = False
+    await loop_monitor.stop()
+    await close_mongo_connection()
 
 app = FastAPI(
     title="Fitness Tracker API",
     description="Complete fitness tracking application with AI features",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -23,6 +70,33 @@ app = FastAPI(
 #     allow_methods=["*"],
 #     allow_headers=["*"],
 # )
+
+# Compress large JSON bodies (meal lists, feeds, AI plans) for mobile clients
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY
+)
+
+# MongoDB command count and time per request (X-DB-Query-Count / X-DB-Time-Ms)
+app.add_middleware(QueryStatsMiddleware)
+
+# Sheds load per route class before any work is done; inside Metrics so
+# shed 503s are still counted
+if settings.CONCURRENCY_LIMITS_ENABLED:
+    app.add_middleware(ConcurrencyLimitMiddleware)
+
+# Latency histograms per route template; exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Root span per request; inside RequestContext so traces carry the request id
+app.add_middleware(TracingMiddleware)
+
+# Every log line and response carries the request id
+app.add_middleware(RequestContextMiddleware)
+
+# Outermost, so every response, including shed 503s, carries the CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -33,17 +107,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Request-ID", "X-DB-Query-Count", "X-DB-Time-Ms", "Retry-After"],
 )
 
-# Startup and shutdown events
-@app.on_event("startup")
-async def startup_db_client():
-    await connect_to_mongo()
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    await close_mongo_connection()
-
 # Include routers - VERIFY THIS ORDER
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
@@ -52,6 +118,7 @@ app.include_router(meals.router, prefix="/meals", tags=["Meals"])
 app.include_router(water.router, prefix="/water", tags=["Water"])  # ADD this line
 app.include_router(social.router, prefix="/social", tags=["Social"])
 app.include_router(ai.router, prefix="/ai", tags=["AI Features"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 
 @app.get("/")
 async def root():
@@ -61,6 +128,32 @@ async def root():
         "docs": "/docs"
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+if settings.TRACES_ENDPOINT_ENABLED:
+    @app.get("/traces/slowest", include_in_schema=False)
+    def slowest_traces(limit: int = Query(20, ge=1, le=100)):
+        return {"traces": exporter.slowest(limit)}
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    """Liveness: the process is up and serving. See /ready for dependencies."""
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: startup warm-up finished and MongoDB answers a ping right now"""
+    checks = {"startup": getattr(app.state, "ready", False), "mongodb": True}
+    try:
+        await ping_database(settings.READY_TIMEOUT_S)
+    except Exception as e:
+        checks["mongodb"] = False
+        logger.warning("readiness ping failed", extra={"error": str(e)})
+    
+    ready = all(checks.values())
+    return ORJSONResponse(
+        {"status": "ready" if ready else "not_ready", "checks": checks},
+        status_code=200 if ready else 503
+    )
\ No newline at end of file
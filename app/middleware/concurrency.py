@@ -0,0 +1,147 @@
+import math
+import time
+from typing import Dict, Optional
+from prometheus_client import Counter, Gauge
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Limit multiplier applied on a slow or failed response
+BACKOFF = 0.9
+# Operational endpoints are never shed, so probes keep answering under load
+UNLIMITED_PATHS = {"/health", "/ready", "/metrics", "/traces/slowest"}
+# Password hashing routes (bcrypt, ~300ms of CPU each)
+AUTH_PATHS = {"/auth/login", "/auth/register"}
+
+CONCURRENCY_LIMIT = Gauge(
+    "http_concurrency_limit",
+    "Current adaptive concurrency limit by route class",
+    ["route_class"],
+    multiprocess_mode="livesum"
+)
+CONCURRENCY_IN_FLIGHT = Gauge(
+    "http_concurrency_in_flight",
+    "Admitted requests in flight by route class",
+    ["route_class"],
+    multiprocess_mode="livesum"
+)
+REQUESTS_SHED = Counter(
+    "http_requests_shed_total",
+    "Requests rejected with 503 because their route class was at its limit",
+    ["route_class"]
+)
+
+class AIMDLimit:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit
+
+    A response within the target latency grows the limit by 1/limit (about
+    one per limit's worth of requests) while the limit is actually in use;
+    a slower or failed one multiplies it by BACKOFF. Only requests admitted
+    after the last decrease can trigger another, so a burst of slow
+    responses caused by one overload backs off once.
+    """
+
+    def __init__(self, name: str, max_limit: int, target_ms: float, min_limit: int = 1):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.target = target_ms / 1000
+        self.limit = float(max(min_limit, max_limit // 2))
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        CONCURRENCY_LIMIT.labels(name).set(self.limit)
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.target))
+
+    def try_acquire(self) -> bool:
+        # Requests run on one event loop, so no lock is needed
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        CONCURRENCY_IN_FLIGHT.labels(self.name).inc()
+        return True
+
+    def release(self, started: float, failed: bool):
+        latency = time.perf_counter() - started
+        in_use = self.in_flight
+        self.in_flight -= 1
+        CONCURRENCY_IN_FLIGHT.labels(self.name).dec()
+
+        if failed or latency > self.target:
+            if started > self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * BACKOFF)
+                self._last_decrease = time.perf_counter()
+                logger.info("concurrency limit decreased", extra={
+                    "route_class": self.name,
+                    "limit": round(self.limit, 1),
+                    "latency_ms": round(latency * 1000),
+                    "failed": failed
+                })
+        elif in_use * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        CONCURRENCY_LIMIT.labels(self.name).set(self.limit)
+
+def route_class(scope: Scope) -> Optional[str]:
+    path = scope["path"]
+    if scope["method"] == "OPTIONS" or path in UNLIMITED_PATHS:
+        return None
+    if path.startswith("/ai/"):
+        return "ai"
+    if path in AUTH_PATHS:
+        return "auth"
+    return "crud"
+
+class ConcurrencyLimitMiddleware:
+    """
+    Adaptive per-route-class concurrency limits with load shedding
+
+    AI, password-hashing and CRUD routes each get their own AIMD limit, so a
+    backlog of slow LLM calls sheds /ai/* requests while CRUD keeps its
+    capacity. Requests over the limit get an immediate 503 with Retry-After
+    instead of queueing in memory.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Optional[Dict[str, AIMDLimit]] = None):
+        self.app = app
+        self.limits = limits or {
+            "ai": AIMDLimit("ai", settings.CONCURRENCY_AI_MAX, settings.CONCURRENCY_AI_TARGET_MS),
+            "auth": AIMDLimit("auth", settings.CONCURRENCY_AUTH_MAX, settings.CONCURRENCY_AUTH_TARGET_MS),
+            "crud": AIMDLimit("crud", settings.CONCURRENCY_CRUD_MAX, settings.CONCURRENCY_CRUD_TARGET_MS)
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        name = route_class(scope) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits[name]
+        if not limit.try_acquire():
+            REQUESTS_SHED.labels(name).inc()
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(limit.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            limit.release(started, failed=status_code >= 500)
@@ -0,0 +1,53 @@
+from prometheus_client import Histogram
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.middleware.metrics import UNMATCHED_ROUTE
+from app.utils.db_monitor import QueryStats, query_stats_var
+
+QUERIES_PER_REQUEST = Histogram(
+    "http_request_db_queries",
+    "MongoDB commands issued per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "http_request_db_seconds",
+    "Total MongoDB command time per request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+class QueryStatsMiddleware:
+    """
+    Per-request MongoDB query count and time
+
+    Sent as X-DB-Query-Count / X-DB-Time-Ms (counted up to the response
+    headers) and recorded per route template in Prometheus, so an endpoint
+    that starts issuing N queries shows up on both.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats_var.set(stats)
+
+        async def send_with_stats(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = f"{stats.duration_ms:.1f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            query_stats_var.reset(token)
+            route = getattr(scope.get("route"), "path_format", None) or UNMATCHED_ROUTE
+            QUERIES_PER_REQUEST.labels(route).observe(stats.count)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.duration_ms / 1000)
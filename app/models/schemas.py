@@ -56,6 +56,7 @@ class Exercise(BaseModel):
     reps: int
     weight: Optional[float] = None
     duration: Optional[int] = None
+    exercise_id: Optional[str] = None
 
 class WorkoutCreate(BaseModel):
     title: str
@@ -243,10 +244,22 @@ class AllTimeStats(BaseModel):
     total_workouts: int
     total_meals: int
 
+class StreakStats(BaseModel):
+    current: int
+    longest: int
+
+class NutritionTargets(BaseModel):
+    daily_calories: int
+    macros: dict
+    water_liters: float
+    calories_remaining: int
+
 class DetailedStatsResponse(BaseModel):
     today: DailyStats
     week: WeeklyStats
     all_time: AllTimeStats
+    streak: Optional[StreakStats] = None
+    targets: Optional[NutritionTargets] = None
     debug_info: Optional[dict] = None
 
 class UserStats(BaseModel):
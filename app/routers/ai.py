@@ -1,44 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
 from app.models.schemas import UserHealthData
 from app.utils.dependencies import get_current_user
 from app.services.diet_recommender import DietRecommender
-from app.services.workout_planner import WorkoutPlanner
+from app.services.workout_planner import WorkoutPlanner, plan_seed
+from app.services.nutrition_targets import resolve_nutrition_targets, profile_from_user
+from app.services.progression import progression_engine
+from app.services.weight_forecast import weight_forecaster, recent_energy
+from app.services.fake_llm import FakeLLM
+from app.database import get_database
 from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.tracing import span, traced
+from collections import OrderedDict
+import copy
 import json
 import os
 import re
+import time
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 # Initialize services
 diet_recommender = DietRecommender()
 workout_planner = WorkoutPlanner()
 
-# Try to initialize FREE AI clients
+# Generated workout plans per (user, week, profile) so re-renders skip the LLM:
+# key -> (plan, expiry on the monotonic clock or None)
+WORKOUT_PLAN_CACHE_SIZE = 1024
+workout_plan_cache = OrderedDict()
+# Fallback plans are reused this long, so an LLM outage costs one failed call
+# per key and interval rather than one per request
+FALLBACK_PLAN_TTL = 300
+
+# FREE AI clients, created by init_ai_providers() at startup
 gemini_model = None
 groq_client = None
+fake_llm = None
+ai_providers_initialized = False
+
+def init_ai_providers():
+    """Create the configured AI clients once per worker, before traffic arrives"""
+    global gemini_model, groq_client, fake_llm, ai_providers_initialized
+    if ai_providers_initialized:
+        return
+    ai_providers_initialized = True
+    
+    if settings.AI_PROVIDER == "fake":
+        # Offline provider for load tests; the real clients are left uninitialized
+        fake_llm = FakeLLM(
+            median_ms=settings.FAKE_LLM_MEDIAN_MS,
+            sigma=settings.FAKE_LLM_SIGMA,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            malformed_rate=settings.FAKE_LLM_MALFORMED_RATE,
+            seed=settings.FAKE_LLM_SEED
+        )
+        logger.info("Fake LLM provider enabled")
+        return
+    
+    # Try Google Gemini (FREE - 15 requests/min, 1500/day)
+    try:
+        import google.generativeai as genai
+        api_key = getattr(settings, 'GOOGLE_API_KEY', None) or os.getenv('GOOGLE_API_KEY')
+        if api_key:
+            genai.configure(api_key=api_key)
+            # Use the updated model name
+            gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            logger.info("Google Gemini initialized")
+    except Exception as e:
+        logger.info("Gemini not available: %s", e)
+
+    # Try Groq (FREE - Fast inference)
+    try:
+        from groq import Groq
+        api_key = getattr(settings, 'GROQ_API_KEY', None) or os.getenv('GROQ_API_KEY')
+        if api_key:
+            groq_client = Groq(api_key=api_key)
+            logger.info("Groq initialized")
+    except Exception as e:
+        logger.info("Groq not available: %s", e)
 
-# Try Google Gemini (FREE - 15 requests/min, 1500/day)
-try:
-    import google.generativeai as genai
-    api_key = getattr(settings, 'GOOGLE_API_KEY', None) or os.getenv('GOOGLE_API_KEY')
-    if api_key:
-        genai.configure(api_key=api_key)
-        # Use the updated model name
-        gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-        print("✅ Google Gemini initialized (FREE)")
-except Exception as e:
-    print(f"ℹ️ Gemini not available: {e}")
+def cached_workout_plan(key) -> Optional[dict]:
+    entry = workout_plan_cache.get(key)
+    if entry is None:
+        return None
+    plan, expires = entry
+    if expires is not None and expires <= time.monotonic():
+        del workout_plan_cache[key]
+        return None
+    workout_plan_cache.move_to_end(key)
+    return plan
 
-# Try Groq (FREE - Fast inference)
-try:
-    from groq import Groq
-    api_key = getattr(settings, 'GROQ_API_KEY', None) or os.getenv('GROQ_API_KEY')
-    if api_key:
-        groq_client = Groq(api_key=api_key)
-        print("✅ Groq initialized (FREE)")
-except Exception as e:
-    print(f"ℹ️ Groq not available: {e}")
+def cache_workout_plan(key, plan: dict, ttl: Optional[float] = None):
+    workout_plan_cache[key] = (plan, time.monotonic() + ttl if ttl is not None else None)
+    workout_plan_cache.move_to_end(key)
+    if len(workout_plan_cache) > WORKOUT_PLAN_CACHE_SIZE:
+        workout_plan_cache.popitem(last=False)
 
 def clean_json_response(text: str) -> str:
     """Extract JSON from markdown code blocks or other formatting"""
@@ -54,17 +113,31 @@ def clean_json_response(text: str) -> str:
     return text
 
 def call_free_ai(prompt: str, system_prompt: str = None, max_tokens: int = 2000):
-    """Universal FREE AI caller - tries Gemini, then Groq, then fallback"""
+    """
+    Universal FREE AI caller - tries Gemini, then Groq, then fallback
+
+    The SDK clients block for the whole call, so handlers run this with
+    run_in_threadpool to keep the event loop serving other requests.
+    """
+    
+    if fake_llm:
+        try:
+            with span("ai.fake", max_tokens=max_tokens):
+                cleaned = clean_json_response(fake_llm.generate(prompt, system_prompt))
+                return json.loads(cleaned)
+        except Exception as e:
+            logger.warning("Fake LLM failed: %s", e)
     
     # Try Google Gemini first (FREE)
     if gemini_model:
         try:
             full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
-            response = gemini_model.generate_content(full_prompt)
-            cleaned = clean_json_response(response.text)
-            return json.loads(cleaned)
+            with span("ai.gemini", max_tokens=max_tokens):
+                response = gemini_model.generate_content(full_prompt)
+                cleaned = clean_json_response(response.text)
+                return json.loads(cleaned)
         except Exception as e:
-            print(f"Gemini failed: {e}")
+            logger.warning("Gemini failed: %s", e)
     
     # Try Groq if Gemini failed (FREE)
     if groq_client:
@@ -74,43 +147,42 @@ def call_free_ai(prompt: str, system_prompt: str = None, max_tokens: int = 2000)
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
             
-            chat_completion = groq_client.chat.completions.create(
-                messages=messages,
-                model="llama-3.3-70b-versatile",  # Free model
-                temperature=0.7,
-                max_tokens=max_tokens,
-            )
-            
-            cleaned = clean_json_response(chat_completion.choices[0].message.content)
-            return json.loads(cleaned)
+            with span("ai.groq", max_tokens=max_tokens):
+                chat_completion = groq_client.chat.completions.create(
+                    messages=messages,
+                    model="llama-3.3-70b-versatile",  # Free model
+                    temperature=0.7,
+                    max_tokens=max_tokens,
+                )
+                
+                cleaned = clean_json_response(chat_completion.choices[0].message.content)
+                return json.loads(cleaned)
         except Exception as e:
-            print(f"Groq failed: {e}")
+            logger.warning("Groq failed: %s", e)
     
     # Both failed
     raise Exception("No AI service available")
 
 @router.post("/diet-recommendations")
 async def get_diet_recommendations(
-    user_data: UserHealthData,
+    user_data: Optional[UserHealthData] = None,
     current_user: dict = Depends(get_current_user)
 ):
     """Generate AI-powered diet recommendations with actual meal plans"""
     
-    # Calculate basic metrics
-    bmr = diet_recommender.calculate_bmr(
-        user_data.age, user_data.gender, user_data.height, user_data.weight
-    )
-    tdee = diet_recommender.calculate_tdee(bmr, user_data.activity_level)
-    daily_calories = diet_recommender.get_calorie_target(tdee, user_data.goal)
-    macros = diet_recommender.calculate_macros(daily_calories, user_data.goal)
-    meals = diet_recommender.create_meal_breakdown(daily_calories)
+    # Targets are stored on the user; only recomputed if the client sent a different profile
+    profile = profile_from_user(current_user, user_data)
+    targets = await resolve_nutrition_targets(current_user, user_data)
+    daily_calories = targets["daily_calories"]
+    macros = targets["macros"]
+    meals = targets["meals_breakdown"]
     
     try:
         # Generate complete meal plan with AI
         prompt = f"""Create a complete daily meal plan for a client with these details:
 
-Profile: Age {user_data.age}, Gender {user_data.gender}, Height {user_data.height}cm, Weight {user_data.weight}kg
-Activity Level: {user_data.activity_level}, Goal: {user_data.goal}
+Profile: Age {profile['age']}, Gender {profile['gender']}, Height {profile['height']}cm, Weight {profile['weight']}kg
+Activity Level: {profile['activity_level']}, Goal: {profile['goal']}
 
 Targets:
 - Daily Calories: {daily_calories}
@@ -148,7 +220,7 @@ Return ONLY valid JSON (no markdown, no extra text):
 
         system_prompt = "You are a professional nutritionist. Create detailed meal plans with realistic food portions. Return ONLY valid JSON, no markdown formatting."
         
-        ai_response = call_free_ai(prompt, system_prompt, max_tokens=2000)
+        ai_response = await run_in_threadpool(call_free_ai, prompt, system_prompt, max_tokens=2000)
         
         # Calculate totals from generated meals
         total_calories = sum(
@@ -169,8 +241,8 @@ Return ONLY valid JSON (no markdown, no extra text):
         )
         
         return {
-            "bmr": round(bmr, 1),
-            "tdee": round(tdee, 1),
+            "bmr": targets["bmr"],
+            "tdee": targets["tdee"],
             "daily_calories": daily_calories,
             "target_protein": macros["protein"],
             "target_carbs": macros["carbs"],
@@ -185,23 +257,19 @@ Return ONLY valid JSON (no markdown, no extra text):
             "recommendations": ai_response['tips']
         }
     except Exception as e:
-        print(f"AI generation failed, using fallback: {e}")
-        return get_fallback_diet_plan(user_data)
+        logger.warning("AI diet plan failed, using fallback: %s", e)
+        return get_fallback_diet_plan(targets, profile["goal"])
 
-def get_fallback_diet_plan(user_data: UserHealthData):
+@traced("ai.fallback_diet_plan")
+def get_fallback_diet_plan(targets: dict, goal: str):
     """Fallback diet plan when AI is unavailable"""
-    bmr = diet_recommender.calculate_bmr(
-        user_data.age, user_data.gender, user_data.height, user_data.weight
-    )
-    tdee = diet_recommender.calculate_tdee(bmr, user_data.activity_level)
-    daily_calories = diet_recommender.get_calorie_target(tdee, user_data.goal)
-    macros = diet_recommender.calculate_macros(daily_calories, user_data.goal)
-    meals_breakdown = diet_recommender.create_meal_breakdown(daily_calories)
+    macros = targets["macros"]
+    meals_breakdown = targets["meals_breakdown"]
     
     # Create sample meals based on goal
-    if user_data.goal == "lose_weight":
+    if goal == "lose_weight":
         sample_meals = get_weight_loss_meals(meals_breakdown)
-    elif user_data.goal == "gain_muscle":
+    elif goal == "gain_muscle":
         sample_meals = get_muscle_gain_meals(meals_breakdown)
     else:
         sample_meals = get_maintenance_meals(meals_breakdown)
@@ -212,12 +280,12 @@ def get_fallback_diet_plan(user_data: UserHealthData):
     total_carbs = sum(sum(f['carbs'] for f in m['foods']) for m in sample_meals)
     total_fats = sum(sum(f['fats'] for f in m['foods']) for m in sample_meals)
     
-    recommendations = diet_recommender.get_recommendations(user_data.goal)
+    recommendations = diet_recommender.get_recommendations(goal)
     
     return {
-        "bmr": round(bmr, 1),
-        "tdee": round(tdee, 1),
-        "daily_calories": daily_calories,
+        "bmr": targets["bmr"],
+        "tdee": targets["tdee"],
+        "daily_calories": targets["daily_calories"],
         "target_protein": macros["protein"],
         "target_carbs": macros["carbs"],
         "target_fats": macros["fats"],
@@ -375,15 +443,29 @@ def get_maintenance_meals(breakdown):
 
 @router.post("/workout-plan")
 async def get_workout_plan(
-    user_data: UserHealthData,
+    user_data: Optional[UserHealthData] = None,
+    days_per_week: int = Query(4, ge=1, le=7),
     current_user: dict = Depends(get_current_user)
 ):
     """Generate AI-powered workout plan"""
+    profile = profile_from_user(current_user, user_data)
+    seed = plan_seed(current_user["id"])
+    cache_key = (seed, profile["age"], profile["gender"], profile["goal"], profile["activity_level"], days_per_week)
+    
+    # Per-exercise load targets from logged history (cached per workouts data version)
+    progression = await progression_engine.get_recommendations(
+        get_database(), current_user, profile["goal"]
+    )
+    
+    cached = cached_workout_plan(cache_key)
+    if cached is not None:
+        return workout_planner.apply_progression(copy.deepcopy(cached), progression["by_exercise"])
+    
     try:
-        prompt = f"""Create a 4-day workout plan for someone:
-- Age: {user_data.age}, Gender: {user_data.gender}
-- Goal: {user_data.goal}
-- Activity Level: {user_data.activity_level}
+        prompt = f"""Create a {days_per_week}-day workout plan for someone:
+- Age: {profile['age']}, Gender: {profile['gender']}
+- Goal: {profile['goal']}
+- Activity Level: {profile['activity_level']}
 
 Return ONLY valid JSON (no markdown):
 {{
@@ -412,42 +494,58 @@ Return ONLY valid JSON (no markdown):
 }}"""
         
         system_prompt = "You are a fitness trainer. Create detailed workout plans. Return ONLY valid JSON."
-        workout_plan = call_free_ai(prompt, system_prompt, max_tokens=2000)
-        return workout_plan
+        workout_plan = await run_in_threadpool(call_free_ai, prompt, system_prompt, max_tokens=2000)
+        cache_workout_plan(cache_key, workout_plan)
+        return workout_planner.apply_progression(copy.deepcopy(workout_plan), progression["by_exercise"])
     except Exception as e:
-        print(f"AI workout failed, using fallback: {e}")
-        return workout_planner.generate_plan(user_data.goal, user_data.activity_level, 4)
+        logger.warning("AI workout plan failed, using fallback: %s", e)
+        # Local scheduler respects recovery windows and volume targets, no LLM needed
+        plan = workout_planner.generate_scheduled_plan(
+            profile["goal"], profile["activity_level"], days_per_week, seed=seed
+        )
+        # Retried against the LLM once the TTL lapses
+        cache_workout_plan(cache_key, plan, ttl=FALLBACK_PLAN_TTL)
+        return workout_planner.apply_progression(copy.deepcopy(plan), progression["by_exercise"])
 
 @router.post("/predict-calories")
 async def predict_calories(
-    user_data: UserHealthData,
+    user_data: Optional[UserHealthData] = None,
     current_user: dict = Depends(get_current_user)
 ):
     """Calculate calorie needs with insights"""
-    bmr = diet_recommender.calculate_bmr(
-        user_data.age, user_data.gender, user_data.height, user_data.weight
-    )
-    tdee = diet_recommender.calculate_tdee(bmr, user_data.activity_level)
+    profile = profile_from_user(current_user, user_data)
+    targets = await resolve_nutrition_targets(current_user, user_data)
+    bmr = targets["bmr"]
+    tdee = targets["tdee"]
     
     try:
         prompt = f"""Provide 3 brief nutrition insights for someone with:
 - BMR: {round(bmr)} calories
 - TDEE: {round(tdee)} calories  
-- Goal: {user_data.goal}
-- Activity: {user_data.activity_level}
+- Goal: {profile['goal']}
+- Activity: {profile['activity_level']}
 
 Return ONLY JSON array: ["Insight 1", "Insight 2", "Insight 3"]"""
         
-        insights = call_free_ai(prompt, "You are a nutrition expert. Return only JSON array.", max_tokens=200)
+        insights = await run_in_threadpool(
+            call_free_ai, prompt, "You are a nutrition expert. Return only JSON array.", max_tokens=200
+        )
         if not isinstance(insights, list):
             raise Exception("Invalid response")
     except:
         insights = [
             f"Your body burns {round(bmr)} calories at rest daily",
             f"With your activity level, you need {round(tdee)} calories to maintain weight",
-            f"Adjust your intake based on your goal of {user_data.goal}"
+            f"Adjust your intake based on your goal of {profile['goal']}"
         ]
     
+    # Projection from logged intake and burn; no LLM involved
+    weight_projection = None
+    if profile.get("weight"):
+        daily_intake, daily_burn = await recent_energy(get_database(), current_user["id"])
+        if daily_intake:
+            weight_projection = weight_forecaster.project(profile["weight"], daily_intake, daily_burn, tdee)
+    
     return {
         "bmr": round(bmr, 1),
         "tdee": round(tdee, 1),
@@ -456,7 +554,8 @@ Return ONLY JSON array: ["Insight 1", "Insight 2", "Insight 3"]"""
             "maintain": int(tdee),
             "gain_muscle": int(tdee + 300)
         },
-        "insights": insights
+        "insights": insights,
+        "weight_projection": weight_projection
     }
 
 @router.get("/food-database")
@@ -495,35 +594,46 @@ async def chat_with_trainer(
     try:
         prompt = f"As a fitness and nutrition expert, answer this question briefly (2-3 sentences): {question}"
         
+        if fake_llm:
+            try:
+                with span("ai.fake", max_tokens=300):
+                    answer = await run_in_threadpool(fake_llm.generate, prompt)
+                return {"question": question, "answer": answer}
+            except Exception as e:
+                logger.warning("Fake LLM failed: %s", e)
+        
         # Try Gemini first
         if gemini_model:
             try:
-                response = gemini_model.generate_content(prompt)
+                with span("ai.gemini", max_tokens=300):
+                    response = await run_in_threadpool(gemini_model.generate_content, prompt)
                 return {"question": question, "answer": response.text}
             except Exception as e:
-                print(f"Gemini failed: {e}")
+                logger.warning("Gemini failed: %s", e)
         
         # Try Groq if Gemini failed
         if groq_client:
             try:
-                chat_completion = groq_client.chat.completions.create(
-                    messages=[
-                        {"role": "system", "content": "You are a professional fitness trainer and nutritionist. Give concise, helpful advice in 2-3 sentences."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    model="llama-3.3-70b-versatile",
-                    temperature=0.7,
-                    max_tokens=300,
-                )
+                with span("ai.groq", max_tokens=300):
+                    chat_completion = await run_in_threadpool(
+                        groq_client.chat.completions.create,
+                        messages=[
+                            {"role": "system", "content": "You are a professional fitness trainer and nutritionist. Give concise, helpful advice in 2-3 sentences."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        model="llama-3.3-70b-versatile",
+                        temperature=0.7,
+                        max_tokens=300,
+                    )
                 return {"question": question, "answer": chat_completion.choices[0].message.content}
             except Exception as e:
-                print(f"Groq failed: {e}")
+                logger.warning("Groq failed: %s", e)
         
         # Both failed
         raise Exception("No AI service available")
         
     except Exception as e:
-        print(f"Chat failed: {e}")
+        logger.warning("chat failed: %s", e)
         return {
             "question": question,
             "answer": "I'm currently unavailable. Please try again later or check your AI service configuration."
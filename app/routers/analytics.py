@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Iterable, List, Literal, Optional
+from datetime import datetime, timedelta
+import asyncio
+import pandas as pd
+from app.utils.dependencies import get_current_user
+from app.database import get_database
+from app.services.daily_totals import range_totals
+
+router = APIRouter()
+
+# pandas frequency matching each $dateTrunc unit (weeks start on Monday)
+BUCKET_FREQUENCIES = {"day": "D", "week": "W-MON", "month": "MS"}
+MAX_RANGE_DAYS = 3 * 366
+
+METRICS = [
+    "calories_in", "calories_out", "protein", "carbs", "fats",
+    "water_liters", "workout_minutes", "meals", "workouts"
+]
+
+def parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+def bucket_start(value: datetime, bucket: str) -> datetime:
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def trunc_pipeline(user_id: str, start: datetime, end: datetime, bucket: str, sums: dict) -> list:
+    return [
+        {"$match": {"user_id": user_id, "date": {"$gte": start, "$lt": end}}},
+        {"$group": {
+            "_id": {"$dateTrunc": {"date": "$date", "unit": bucket, "startOfWeek": "monday"}},
+            **{field: {"$sum": expression} for field, expression in sums.items()}
+        }}
+    ]
+
+def trend_buckets(series: Iterable[List[Dict]], start: datetime, end: datetime,
+                  bucket: str, rolling: int) -> Dict:
+    """
+    Totals and one row per bucket from $dateTrunc-grouped aggregation rows
+
+    Each row is {"_id": bucket start, <metric>: value, ...}. Buckets with no
+    rows are zeros, and rolling > 1 adds <metric>_rolling means over that
+    many buckets.
+    """
+    # Align all series on a continuous bucket index so empty periods are zeros
+    index = pd.date_range(start, end - timedelta(days=1), freq=BUCKET_FREQUENCIES[bucket], name="period")
+    frame = pd.DataFrame(0.0, index=index, columns=METRICS)
+    for rows in series:
+        if rows:
+            frame.update(pd.DataFrame(rows).set_index("_id").reindex(index))
+
+    frame = frame.fillna(0)
+    frame[["meals", "workouts"]] = frame[["meals", "workouts"]].astype(int)
+    frame["net_calories"] = frame["calories_in"] - frame["calories_out"]
+
+    if rolling > 1:
+        for column in ("calories_in", "calories_out", "net_calories", "water_liters"):
+            frame[f"{column}_rolling"] = frame[column].rolling(rolling, min_periods=1).mean().round(1)
+
+    frame = frame.round(1)
+    totals = frame[METRICS + ["net_calories"]].sum().round(1)
+    return {
+        "totals": totals.to_dict(),
+        "buckets": [
+            {"period": period.isoformat(), **values}
+            for period, values in zip(frame.index, frame.to_dict(orient="records"))
+        ]
+    }
+
+@router.get("/trends")
+async def get_trends(
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    bucket: Literal["day", "week", "month"] = Query("day"),
+    rolling: int = Query(7, ge=0, le=90, description="Rolling average window in buckets (0 disables)"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Calories, macros, water and workout minutes bucketed by day, week or month"""
+    db = get_database()
+    user_id = current_user["id"]
+
+    end = parse_date(end_date) if end_date else datetime.utcnow()
+    start = parse_date(start_date) if start_date else end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {MAX_RANGE_DAYS} days")
+
+    start = bucket_start(start, bucket)
+    end = end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    meals, workouts, water = await asyncio.gather(
+        db.meals.aggregate(trunc_pipeline(user_id, start, end, bucket, {
+            "calories_in": "$total_calories",
+            "protein": "$total_protein",
+            "carbs": "$total_carbs",
+            "fats": "$total_fats",
+            "meals": 1
+        })).to_list(length=None),
+        db.workouts.aggregate(trunc_pipeline(user_id, start, end, bucket, {
+            "calories_out": "$calories_burned",
+            "workout_minutes": "$duration",
+            "workouts": 1
+        })).to_list(length=None),
+        db.water.aggregate(trunc_pipeline(user_id, start, end, bucket, {
+            "water_liters": "$amount"
+        })).to_list(length=None)
+    )
+
+    return {
+        "bucket": bucket,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "rolling_window": rolling if rolling > 1 else None,
+        **trend_buckets((meals, workouts, water), start, end, bucket, rolling)
+    }
+
+@router.get("/energy-balance")
+async def get_energy_balance(
+    start_date: Optional[str] = Query(None, description="Defaults to all history"),
+    end_date: Optional[str] = Query(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Calories in and out over any date range, read from per-day prefix sums"""
+    db = get_database()
+
+    end = parse_date(end_date) if end_date else datetime.utcnow()
+    start = parse_date(start_date) if start_date else None
+    if start is not None and start > end:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+
+    totals = await range_totals(db, current_user["id"], start, end)
+    totals = {field: round(value, 1) for field, value in totals.items()}
+
+    return {
+        "start_date": start.date().isoformat() if start else None,
+        "end_date": end.date().isoformat(),
+        **totals,
+        "net_calories": round(totals["calories_in"] - totals["calories_out"], 1)
+    }
@@ -4,6 +4,12 @@ from datetime import datetime
 from bson import ObjectId
 from app.models.schemas import UserCreate, Token, UserUpdate
 from app.services.auth_service import authenticate_user, create_user, create_user_token
+from app.services.streaks import current_streak
+from app.services.nutrition_targets import (
+    compute_nutrition_targets, profile_changed, has_complete_profile
+)
+from app.services.weight_forecast import log_weight
+from app.services.data_versions import bump_version
 from app.utils.dependencies import get_current_user
 from app.database import get_database
 
@@ -15,8 +21,11 @@ async def register(user: UserCreate):
     user_dict["created_at"] = datetime.utcnow()
     user_dict["followers"] = []
     user_dict["following"] = []
+    user_dict["nutrition_targets"] = compute_nutrition_targets(user_dict)
     
     created_user = await create_user(user_dict)
+    if created_user.get("weight"):
+        await log_weight(get_database(), str(created_user["_id"]), created_user["weight"])
     access_token = create_user_token(str(created_user["_id"]))
     
     return {
@@ -64,7 +73,9 @@ async def get_me(current_user: dict = Depends(get_current_user)):
         "weight": current_user.get("weight"),
         "activity_level": current_user.get("activity_level"),
         "goal": current_user.get("goal"),
-        "bio": current_user.get("bio")
+        "bio": current_user.get("bio"),
+        "nutrition_targets": current_user.get("nutrition_targets"),
+        "streak_days": current_streak(current_user.get("streak"))
     }
 
 @router.put("/me")
@@ -87,6 +98,11 @@ async def update_user_profile(
             detail="No fields to update"
         )
     
+    # Recompute derived nutrition targets only when the profile changed
+    merged_profile = {**current_user, **update_data}
+    if profile_changed(current_user, update_data) and has_complete_profile(merged_profile):
+        update_data["nutrition_targets"] = compute_nutrition_targets(merged_profile)
+    
     # Update user in database
     result = await db.users.update_one(
         {"_id": ObjectId(current_user["id"])},
@@ -99,6 +115,10 @@ async def update_user_profile(
             detail="User not found"
         )
     
+    await bump_version(db, current_user, "profile")
+    if update_data.get("weight") and update_data["weight"] != current_user.get("weight"):
+        await log_weight(db, current_user["id"], update_data["weight"])
+    
     # Fetch updated user
     updated_user = await db.users.find_one({"_id": ObjectId(current_user["id"])})
     
@@ -118,5 +138,6 @@ async def update_user_profile(
         "weight": updated_user.get("weight"),
         "activity_level": updated_user.get("activity_level"),
         "goal": updated_user.get("goal"),
-        "bio": updated_user.get("bio")
+        "bio": updated_user.get("bio"),
+        "nutrition_targets": updated_user.get("nutrition_targets")
     }
\ No newline at end of file
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import Optional, List
 from app.models.schemas import MealCreate, MealUpdate
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, conditional_get
 from app.database import get_database
+from app.utils.serialization import ORJSONResponse, serialize_doc, serialize_docs
+from app.services.streaks import record_activity
+from app.services.daily_totals import apply_delta, meal_delta, combine
+from app.services.data_versions import bump_version
+from app.utils.logger import get_logger
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
+import logging
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -32,31 +40,20 @@ async def create_meal(
         meal_dict["total_carbs"] = sum(food.get("carbs", 0) for food in meal_dict["foods"])
         meal_dict["total_fats"] = sum(food.get("fats", 0) for food in meal_dict["foods"])
         
-        print(f"✅ Creating meal:")
-        print(f"   User ID: {meal_dict['user_id']}")
-        print(f"   Type: {meal_dict['type']}")
-        print(f"   Date: {meal_dict['date']}")
-        print(f"   Calories: {meal_dict['total_calories']}")
-        
         result = await db.meals.insert_one(meal_dict)
-        created_meal = await db.meals.find_one({"_id": result.inserted_id})
-        
-        print(f"   Saved with ID: {result.inserted_id}")
-        
-        created_meal["id"] = str(created_meal["_id"])
-        del created_meal["_id"]
-        
-        # Convert datetime to ISO string
-        if isinstance(created_meal.get("date"), datetime):
-            created_meal["date"] = created_meal["date"].isoformat()
-        if isinstance(created_meal.get("created_at"), datetime):
-            created_meal["created_at"] = created_meal["created_at"].isoformat()
+        await apply_delta(db, current_user["id"], meal_dict["date"], meal_delta(meal_dict))
+        await bump_version(db, current_user, "meals")
+        await record_activity(db, current_user, meal_dict["date"])
+        
+        logger.info("meal created", extra={
+            "meal_id": str(result.inserted_id),
+            "meal_type": meal_dict["type"],
+            "calories": meal_dict["total_calories"]
+        })
         
-        return created_meal
+        return ORJSONResponse(serialize_doc(meal_dict), status_code=status.HTTP_201_CREATED)
     except Exception as e:
-        print(f"❌ Error creating meal: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("error creating meal")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("")
@@ -64,7 +61,8 @@ async def create_meal(
 async def get_meals(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(conditional_get("meals"))
 ):
     """Get all meals for the current user"""
     db = get_database()
@@ -72,54 +70,36 @@ async def get_meals(
     try:
         query = {"user_id": current_user["id"]}
         
-        print(f"\n🔍 Fetching meals:")
-        print(f"   User ID: {current_user['id']}")
-        print(f"   Start date: {start_date}")
-        print(f"   End date: {end_date}")
-        
         if start_date or end_date:
             query["date"] = {}
             if start_date:
                 start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
                 start_dt = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
                 query["date"]["$gte"] = start_dt
-                print(f"   From: {start_dt}")
             if end_date:
                 end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
                 end_dt = end_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
                 query["date"]["$lte"] = end_dt
-                print(f"   To: {end_dt}")
-        
-        print(f"   Query: {query}")
         
         cursor = db.meals.find(query).sort("date", -1)
         meals = await cursor.to_list(length=100)
         
-        print(f"   ✅ Found {len(meals)} meals")
+        logger.debug("meals fetched", extra={"query": query, "count": len(meals)})
         
-        if len(meals) == 0:
+        # Diagnostics cost extra queries, so only run them when debug logging is on
+        if len(meals) == 0 and logger.isEnabledFor(logging.DEBUG):
             # Check if user has ANY meals
             total_meals = await db.meals.count_documents({"user_id": current_user["id"]})
-            print(f"   📊 User has {total_meals} total meals in database")
-            
             if total_meals > 0:
                 # Show a sample meal
                 sample = await db.meals.find_one({"user_id": current_user["id"]})
-                print(f"   Sample meal date: {sample.get('date')}")
-        
-        for meal in meals:
-            meal["id"] = str(meal["_id"])
-            del meal["_id"]
-            if isinstance(meal.get("date"), datetime):
-                meal["date"] = meal["date"].isoformat()
-            if isinstance(meal.get("created_at"), datetime):
-                meal["created_at"] = meal["created_at"].isoformat()
+                logger.debug("no meals in range", extra={
+                    "total_meals": total_meals, "sample_date": sample.get("date")
+                })
         
-        return meals
+        return ORJSONResponse(serialize_docs(meals), headers={"ETag": etag})
     except Exception as e:
-        print(f"❌ Error fetching meals: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("error fetching meals")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/debug/all")
@@ -127,27 +107,16 @@ async def debug_all_meals(current_user: dict = Depends(get_current_user)):
     """Debug endpoint - get ALL meals"""
     db = get_database()
     
-    print(f"\n🐛 DEBUG - All meals for user: {current_user['id']}")
-    
     cursor = db.meals.find({"user_id": current_user["id"]})
     meals = await cursor.to_list(length=100)
     
-    print(f"   Found {len(meals)} total meals")
-    
-    for i, meal in enumerate(meals):
-        print(f"   Meal {i+1}: {meal.get('type')} - {meal.get('date')}")
-        meal["id"] = str(meal["_id"])
-        del meal["_id"]
-        if isinstance(meal.get("date"), datetime):
-            meal["date"] = meal["date"].isoformat()
-        if isinstance(meal.get("created_at"), datetime):
-            meal["created_at"] = meal["created_at"].isoformat()
+    logger.debug("debug meal listing", extra={"count": len(meals)})
     
-    return {
+    return ORJSONResponse({
         "user_id": current_user["id"],
         "total_meals": len(meals),
-        "meals": meals
-    }
+        "meals": serialize_docs(meals)
+    })
 
 @router.get("/{meal_id}")
 async def get_meal(
@@ -166,16 +135,9 @@ async def get_meal(
         if not meal:
             raise HTTPException(status_code=404, detail="Meal not found")
         
-        meal["id"] = str(meal["_id"])
-        del meal["_id"]
-        if isinstance(meal.get("date"), datetime):
-            meal["date"] = meal["date"].isoformat()
-        if isinstance(meal.get("created_at"), datetime):
-            meal["created_at"] = meal["created_at"].isoformat()
-        
-        return meal
+        return ORJSONResponse(serialize_doc(meal))
     except Exception as e:
-        print(f"Error fetching meal: {e}")
+        logger.exception("error fetching meal")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{meal_id}")
@@ -197,25 +159,25 @@ async def update_meal(
             update_data["total_fats"] = sum(food.get("fats", 0) for food in update_data["foods"])
         
         if update_data:
-            result = await db.meals.update_one(
+            previous = await db.meals.find_one_and_update(
                 {"_id": ObjectId(meal_id), "user_id": current_user["id"]},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.BEFORE
             )
             
-            if result.matched_count == 0:
+            if previous is None:
                 raise HTTPException(status_code=404, detail="Meal not found")
+            
+            if "foods" in update_data:
+                await apply_delta(db, current_user["id"], previous["date"], combine(
+                    meal_delta(update_data), meal_delta(previous, -1)
+                ))
+            await bump_version(db, current_user, "meals")
         
         meal = await db.meals.find_one({"_id": ObjectId(meal_id)})
-        meal["id"] = str(meal["_id"])
-        del meal["_id"]
-        if isinstance(meal.get("date"), datetime):
-            meal["date"] = meal["date"].isoformat()
-        if isinstance(meal.get("created_at"), datetime):
-            meal["created_at"] = meal["created_at"].isoformat()
-        
-        return meal
+        return ORJSONResponse(serialize_doc(meal))
     except Exception as e:
-        print(f"Error updating meal: {e}")
+        logger.exception("error updating meal")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{meal_id}")
@@ -227,17 +189,20 @@ async def delete_meal(
     db = get_database()
     
     try:
-        result = await db.meals.delete_one({
+        deleted = await db.meals.find_one_and_delete({
             "_id": ObjectId(meal_id),
             "user_id": current_user["id"]
         })
         
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Meal not found")
         
-        print(f"✅ Deleted meal {meal_id}")
+        await apply_delta(db, current_user["id"], deleted["date"], meal_delta(deleted, -1))
+        await bump_version(db, current_user, "meals")
+        
+        logger.info("meal deleted", extra={"meal_id": meal_id})
         
         return {"message": "Meal deleted successfully"}
     except Exception as e:
-        print(f"Error deleting meal: {e}")
+        logger.exception("error deleting meal")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
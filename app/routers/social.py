@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from app.models.schemas import PostCreate
 from app.utils.dependencies import get_current_user
 from app.database import get_database
+from app.utils.serialization import ORJSONResponse, serialize_doc, serialize_docs
 from bson import ObjectId
 from datetime import datetime
 
@@ -21,11 +22,9 @@ async def create_post(
     post_dict["comments"] = []
     post_dict["created_at"] = datetime.utcnow()
     
-    result = await db.social_posts.insert_one(post_dict)
-    post_dict["id"] = str(result.inserted_id)
-    del post_dict["_id"]
+    await db.social_posts.insert_one(post_dict)
     
-    return post_dict
+    return ORJSONResponse(serialize_doc(post_dict))
 
 @router.get("/feed")
 async def get_feed(
@@ -40,18 +39,14 @@ async def get_feed(
     cursor = db.social_posts.find().sort("created_at", -1).skip(skip).limit(limit)
     posts = await cursor.to_list(length=limit)
     
-    for post in posts:
-        post["id"] = str(post["_id"])
-        del post["_id"]
-    
     total = await db.social_posts.count_documents({})
     
-    return {
-        "posts": posts,
+    return ORJSONResponse({
+        "posts": serialize_docs(posts),
         "current_page": page,
         "total_pages": (total + limit - 1) // limit,
         "total": total
-    }
+    })
 
 @router.post("/posts/{post_id}/like")
 async def like_post(
@@ -80,10 +75,7 @@ async def like_post(
         )
     
     updated_post = await db.social_posts.find_one({"_id": ObjectId(post_id)})
-    updated_post["id"] = str(updated_post["_id"])
-    del updated_post["_id"]
-    
-    return updated_post
+    return ORJSONResponse(serialize_doc(updated_post))
 
 @router.post("/posts/{post_id}/comment")
 async def add_comment(
@@ -111,7 +103,4 @@ async def add_comment(
     )
     
     updated_post = await db.social_posts.find_one({"_id": ObjectId(post_id)})
-    updated_post["id"] = str(updated_post["_id"])
-    del updated_post["_id"]
-    
-    return updated_post
\ No newline at end of file
+    return ORJSONResponse(serialize_doc(updated_post))
\ No newline at end of file
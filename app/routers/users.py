@@ -1,13 +1,23 @@
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, conditional_get
+from app.utils.serialization import ORJSONResponse
 from app.database import get_database
+from app.services.nutrition_targets import get_nutrition_targets
+from app.services.personal_records import get_personal_records
+from app.services.streaks import current_streak
+from app.utils.logger import get_logger
 from bson import ObjectId
+import logging
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 @router.get("/stats/detailed")
-async def get_detailed_user_stats(current_user: dict = Depends(get_current_user)):
+async def get_detailed_user_stats(
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(conditional_get("meals", "workouts", "water", "profile", daily=True))
+):
     """Get comprehensive user statistics"""
     db = get_database()
     user_id = current_user["id"]
@@ -46,8 +56,6 @@ async def get_detailed_user_stats(current_user: dict = Depends(get_current_user)
                 return items
         return []
     
-    print(f"🔍 Fetching stats for user_id: {user_id} (type: {type(user_id)})")
-    
     # TODAY's workouts
     today_workouts, _ = await count_with_fallback(
         db.workouts, 
@@ -62,7 +70,6 @@ async def get_detailed_user_stats(current_user: dict = Depends(get_current_user)
     
     # ALL TIME workouts
     total_workouts, workout_user_id = await count_with_fallback(db.workouts)
-    print(f"✅ Total workouts: {total_workouts} (user_id format: {type(workout_user_id)})")
     
     # TODAY's meals
     today_meals, _ = await count_with_fallback(
@@ -72,17 +79,21 @@ async def get_detailed_user_stats(current_user: dict = Depends(get_current_user)
     
     # ALL TIME meals
     total_meals, meal_user_id = await count_with_fallback(db.meals)
-    print(f"✅ Total meals: {total_meals} (user_id format: {type(meal_user_id)})")
+    logger.debug("stats totals", extra={
+        "total_workouts": total_workouts,
+        "workout_user_id_type": type(workout_user_id).__name__,
+        "total_meals": total_meals,
+        "meal_user_id_type": type(meal_user_id).__name__
+    })
     
-    # If still 0, let's check what's actually in the database
-    if total_meals == 0:
-        # Sample query to see what's there
+    # If still 0, check what's actually in the database (extra queries, debug only)
+    if total_meals == 0 and logger.isEnabledFor(logging.DEBUG):
         sample = await db.meals.find_one({})
-        if sample:
-            print(f"⚠️  Sample meal document found with user_id: {sample.get('user_id')} (type: {type(sample.get('user_id'))})")
-            print(f"⚠️  Current user_id: {user_id} (type: {type(user_id)})")
         all_meals_count = await db.meals.count_documents({})
-        print(f"⚠️  Total meals in database (all users): {all_meals_count}")
+        logger.debug("no meals found for user", extra={
+            "sample_user_id_type": type(sample.get("user_id")).__name__ if sample else None,
+            "all_meals": all_meals_count
+        })
     
     # Calculate TODAY's calories consumed
     meals_today_list = await find_with_fallback(
@@ -107,7 +118,10 @@ async def get_detailed_user_stats(current_user: dict = Depends(get_current_user)
         round(calories_consumed_today / today_meals) if today_meals > 0 else 0
     )
     
-    return {
+    # Stored on the user document, no recomputation needed
+    targets = await get_nutrition_targets(current_user)
+    
+    return ORJSONResponse({
         "today": {
             "workouts": today_workouts,
             "meals": today_meals,
@@ -118,14 +132,31 @@ async def get_detailed_user_stats(current_user: dict = Depends(get_current_user)
         "week": {
             "workouts": week_workouts
         },
+        "streak": {
+            "current": current_streak(current_user.get("streak")),
+            "longest": (current_user.get("streak") or {}).get("longest", 0)
+        },
         "all_time": {
             "total_workouts": total_workouts,
             "total_meals": total_meals
         },
+        "targets": {
+            "daily_calories": targets["daily_calories"],
+            "macros": targets["macros"],
+            "water_liters": targets["water_liters"],
+            "calories_remaining": targets["daily_calories"] - calories_consumed_today + calories_burned_today
+        } if targets else None,
         "debug_info": {
             "user_id": user_id,
             "user_id_type": type(user_id).__name__,
             "workout_user_id_type": type(workout_user_id).__name__ if total_workouts > 0 else "none",
             "meal_user_id_type": type(meal_user_id).__name__ if total_meals > 0 else "none"
         }
-    }
\ No newline at end of file
+    }, headers={"ETag": etag})
+
+@router.get("/personal-records")
+async def get_user_personal_records(current_user: dict = Depends(get_current_user)):
+    """Best lift, reps, volume and duration per exercise (one indexed read)"""
+    db = get_database()
+    records = await get_personal_records(db, current_user["id"])
+    return {"records": records}
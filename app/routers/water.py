@@ -1,9 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
 from pydantic import BaseModel, Field
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, conditional_get
 from app.database import get_database
+from app.utils.serialization import ORJSONResponse, serialize_doc, serialize_docs
+from app.services.nutrition_targets import get_nutrition_targets
+from app.services.streaks import record_activity
+from app.services.daily_totals import apply_delta, water_delta
+from app.services.data_versions import bump_version
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime, timedelta
 
 router = APIRouter()
@@ -20,6 +26,11 @@ class WaterUpdate(BaseModel):
     time: Optional[str] = None
     notes: Optional[str] = None
 
+async def get_water_goal(current_user: dict) -> float:
+    """Daily hydration goal in liters from the user's stored targets"""
+    targets = await get_nutrition_targets(current_user)
+    return targets["water_liters"] if targets else 3.0
+
 @router.post("/")
 async def create_water(water: WaterCreate, current_user: dict = Depends(get_current_user)):
     db = get_database()
@@ -48,15 +59,12 @@ async def create_water(water: WaterCreate, current_user: dict = Depends(get_curr
         "updated_at": datetime.utcnow()
     }
     
-    result = await db.water.insert_one(water_dict)
-    created_water = await db.water.find_one({"_id": result.inserted_id})
-    
-    created_water["id"] = str(created_water["_id"])
-    del created_water["_id"]
-    if isinstance(created_water.get("user_id"), ObjectId):
-        created_water["user_id"] = str(created_water["user_id"])
+    await db.water.insert_one(water_dict)
+    await apply_delta(db, current_user["id"], water_date, water_delta(water_dict))
+    await bump_version(db, current_user, "water")
+    await record_activity(db, current_user, water_date)
     
-    return {"success": True, "data": created_water, "message": "Water intake logged successfully"}
+    return ORJSONResponse({"success": True, "data": serialize_doc(water_dict), "message": "Water intake logged successfully"})
 
 @router.get("/")
 async def get_water_records(start_date: Optional[str] = Query(None), end_date: Optional[str] = Query(None), current_user: dict = Depends(get_current_user)):
@@ -73,17 +81,14 @@ async def get_water_records(start_date: Optional[str] = Query(None), end_date: O
     cursor = db.water.find(query).sort("date", -1).sort("time", -1)
     water_records = await cursor.to_list(length=100)
     
-    for record in water_records:
-        record["id"] = str(record["_id"])
-        del record["_id"]
-        if isinstance(record.get("user_id"), ObjectId):
-            record["user_id"] = str(record["user_id"])
-    
     total = sum(record["amount"] for record in water_records)
-    return {"success": True, "data": water_records, "total": round(total, 2)}
+    return ORJSONResponse({"success": True, "data": serialize_docs(water_records), "total": round(total, 2)})
 
 @router.get("/today")
-async def get_today_water(current_user: dict = Depends(get_current_user)):
+async def get_today_water(
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(conditional_get("water", "profile", daily=True))
+):
     db = get_database()
     today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
     tomorrow = today + timedelta(days=1)
@@ -92,14 +97,9 @@ async def get_today_water(current_user: dict = Depends(get_current_user)):
     cursor = db.water.find(query).sort("time", -1)
     water_records = await cursor.to_list(length=100)
     
-    for record in water_records:
-        record["id"] = str(record["_id"])
-        del record["_id"]
-        if isinstance(record.get("user_id"), ObjectId):
-            record["user_id"] = str(record["user_id"])
-    
     total = sum(record["amount"] for record in water_records)
-    return {"success": True, "data": water_records, "total": round(total, 2), "goal": 3.0}
+    goal = await get_water_goal(current_user)
+    return ORJSONResponse({"success": True, "data": serialize_docs(water_records), "total": round(total, 2), "goal": goal}, headers={"ETag": etag})
 
 @router.get("/stats")
 async def get_water_stats(start_date: Optional[str] = Query(None), end_date: Optional[str] = Query(None), current_user: dict = Depends(get_current_user)):
@@ -119,7 +119,7 @@ async def get_water_stats(start_date: Optional[str] = Query(None), end_date: Opt
     total = sum(record["amount"] for record in water_records)
     count = len(water_records)
     average = total / count if count > 0 else 0
-    goal = 3.0
+    goal = await get_water_goal(current_user)
     goal_percentage = (total / goal) * 100 if goal > 0 else 0
     
     return {"success": True, "stats": {"total": round(total, 2), "average": round(average, 2), "count": count, "goal": goal, "goal_percentage": round(goal_percentage, 2)}}
@@ -132,12 +132,7 @@ async def get_water(water_id: str, current_user: dict = Depends(get_current_user
     if not water:
         raise HTTPException(status_code=404, detail="Water record not found")
     
-    water["id"] = str(water["_id"])
-    del water["_id"]
-    if isinstance(water.get("user_id"), ObjectId):
-        water["user_id"] = str(water["user_id"])
-    
-    return water
+    return ORJSONResponse(serialize_doc(water))
 
 @router.put("/{water_id}")
 async def update_water(water_id: str, water_update: WaterUpdate, current_user: dict = Depends(get_current_user)):
@@ -162,26 +157,35 @@ async def update_water(water_id: str, water_update: WaterUpdate, current_user: d
     update_data["updated_at"] = datetime.utcnow()
     
     if update_data:
-        result = await db.water.update_one({"_id": ObjectId(water_id), "user_id": current_user["id"]}, {"$set": update_data})
-        if result.matched_count == 0:
+        previous = await db.water.find_one_and_update(
+            {"_id": ObjectId(water_id), "user_id": current_user["id"]},
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
             raise HTTPException(status_code=404, detail="Water record not found")
+        
+        # Move the record's amount out of its old day and into its (possibly new) one
+        if "amount" in update_data or "date" in update_data:
+            updated = {**previous, **update_data}
+            await apply_delta(db, current_user["id"], previous["date"], water_delta(previous, -1))
+            await apply_delta(db, current_user["id"], updated["date"], water_delta(updated))
+        await bump_version(db, current_user, "water")
     
     water = await db.water.find_one({"_id": ObjectId(water_id)})
-    water["id"] = str(water["_id"])
-    del water["_id"]
-    if isinstance(water.get("user_id"), ObjectId):
-        water["user_id"] = str(water["user_id"])
-    
-    return {"success": True, "data": water, "message": "Water intake updated successfully"}
+    return ORJSONResponse({"success": True, "data": serialize_doc(water), "message": "Water intake updated successfully"})
 
 @router.delete("/{water_id}")
 async def delete_water(water_id: str, current_user: dict = Depends(get_current_user)):
     db = get_database()
-    result = await db.water.delete_one({"_id": ObjectId(water_id), "user_id": current_user["id"]})
+    deleted = await db.water.find_one_and_delete({"_id": ObjectId(water_id), "user_id": current_user["id"]})
     
-    if result.deleted_count == 0:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Water record not found")
     
+    await apply_delta(db, current_user["id"], deleted["date"], water_delta(deleted, -1))
+    await bump_version(db, current_user, "water")
+    
     return {"success": True, "message": "Water deleted successfully"}
 
 @router.delete("/today/reset")
@@ -190,9 +194,13 @@ async def reset_today_water(current_user: dict = Depends(get_current_user)):
     today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
     tomorrow = today + timedelta(days=1)
     
-    result = await db.water.delete_many({
-        "user_id": current_user["id"],
-        "date": {"$gte": today, "$lt": tomorrow}
-    })
+    query = {"user_id": current_user["id"], "date": {"$gte": today, "$lt": tomorrow}}
+    records = await db.water.find(query, {"_id": 1, "amount": 1}).to_list(length=None)
+    result = await db.water.delete_many({"_id": {"$in": [record["_id"] for record in records]}})
+    
+    total = sum(record.get("amount") or 0 for record in records)
+    await apply_delta(db, current_user["id"], today, {"water_liters": -total})
+    if result.deleted_count:
+        await bump_version(db, current_user, "water")
     
     return {"success": True, "message": f"Reset {result.deleted_count} water records for today", "deleted_count": result.deleted_count}
\ No newline at end of file
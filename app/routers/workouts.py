@@ -1,13 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional, List
 from app.models.schemas import WorkoutCreate, WorkoutUpdate
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, conditional_get
 from app.database import get_database
+from app.utils.serialization import ORJSONResponse, serialize_doc, serialize_docs
+from app.services.calorie_predictor import CaloriePredictor
+from app.services.exercise_registry import exercise_registry
+from app.services.progression import progression_engine
+from app.services.streaks import record_activity
+from app.services.daily_totals import apply_delta, workout_delta, combine
+from app.services.data_versions import bump_version
+from app.services.personal_records import (
+    record_personal_records, recompute_personal_records, exercise_key
+)
 from bson import ObjectId
 from datetime import datetime
 
 router = APIRouter()
 
+calorie_predictor = CaloriePredictor()
+
+# Fields that change the server-side calorie estimate
+CALORIE_FIELDS = ("title", "type", "exercises", "duration")
+
+def add_exercise_ids(exercises: list) -> list:
+    """Tag logged exercises with their canonical registry id"""
+    for exercise in exercises:
+        entry = exercise_registry.resolve(exercise.get("name"))
+        exercise["exercise_id"] = entry["id"] if entry else None
+    return exercises
+
+def estimate_calories(workout_dict: dict, current_user: dict) -> int:
+    """Estimate calories burned using the user's body weight (70kg if unknown)"""
+    weight = current_user.get("weight") or 70
+    return calorie_predictor.estimate_workout_document(workout_dict, weight)
+
 @router.post("/")
 async def create_workout(
     workout: WorkoutCreate,
@@ -22,26 +49,28 @@ async def create_workout(
     if workout_dict.get("date") is None:
         workout_dict["date"] = datetime.utcnow()
     
-    result = await db.workouts.insert_one(workout_dict)
-    
-    # Fetch the created workout from database
-    created_workout = await db.workouts.find_one({"_id": result.inserted_id})
+    add_exercise_ids(workout_dict["exercises"])
     
-    # Convert ObjectIds to strings
-    created_workout["id"] = str(created_workout["_id"])
-    del created_workout["_id"]
+    # Enrich on write so stats can trust calories_burned
+    if not workout_dict.get("calories_burned"):
+        workout_dict["calories_burned"] = estimate_calories(workout_dict, current_user)
+        workout_dict["calories_estimated"] = True
     
-    # Convert user_id if it's an ObjectId
-    if isinstance(created_workout.get("user_id"), ObjectId):
-        created_workout["user_id"] = str(created_workout["user_id"])
+    await db.workouts.insert_one(workout_dict)
+    await apply_delta(db, current_user["id"], workout_dict["date"], workout_delta(workout_dict))
+    await bump_version(db, current_user, "workouts")
+    await record_personal_records(db, current_user["id"], workout_dict["exercises"])
+    await record_activity(db, current_user, workout_dict["date"])
     
-    return created_workout
+    # insert_one set _id on the dict, so it is the stored document
+    return ORJSONResponse(serialize_doc(workout_dict))
 
 @router.get("/")
 async def get_workouts(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(conditional_get("workouts"))
 ):
     db = get_database()
     
@@ -57,15 +86,16 @@ async def get_workouts(
     cursor = db.workouts.find(query).sort("date", -1)
     workouts = await cursor.to_list(length=100)
     
-    for workout in workouts:
-        workout["id"] = str(workout["_id"])
-        del workout["_id"]
-        
-        # Convert user_id if it's an ObjectId
-        if isinstance(workout.get("user_id"), ObjectId):
-            workout["user_id"] = str(workout["user_id"])
-    
-    return workouts
+    return ORJSONResponse(serialize_docs(workouts), headers={"ETag": etag})
+
+@router.get("/progression")
+async def get_progression(current_user: dict = Depends(get_current_user)):
+    """Next-session load targets per exercise from the user's workout history"""
+    db = get_database()
+    recommendations = await progression_engine.get_recommendations(
+        db, current_user, current_user.get("goal") or "maintain"
+    )
+    return {"exercises": recommendations["exercises"]}
 
 @router.get("/{workout_id}")
 async def get_workout(
@@ -82,14 +112,7 @@ async def get_workout(
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     
-    workout["id"] = str(workout["_id"])
-    del workout["_id"]
-    
-    # Convert user_id if it's an ObjectId
-    if isinstance(workout.get("user_id"), ObjectId):
-        workout["user_id"] = str(workout["user_id"])
-    
-    return workout
+    return ORJSONResponse(serialize_doc(workout))
 
 @router.put("/{workout_id}")
 async def update_workout(
@@ -101,6 +124,25 @@ async def update_workout(
     
     update_data = {k: v for k, v in workout_update.model_dump().items() if v is not None}
     
+    if "exercises" in update_data:
+        add_exercise_ids(update_data["exercises"])
+    
+    existing = None
+    if any(field in update_data for field in CALORIE_FIELDS + ("calories_burned",)):
+        existing = await db.workouts.find_one({
+            "_id": ObjectId(workout_id),
+            "user_id": current_user["id"]
+        })
+        if not existing:
+            raise HTTPException(status_code=404, detail="Workout not found")
+    
+    if "calories_burned" in update_data:
+        update_data["calories_estimated"] = False
+    elif existing is not None and (existing.get("calories_estimated") or not existing.get("calories_burned")):
+        # Only re-estimate calories the server estimated in the first place
+        update_data["calories_burned"] = estimate_calories({**existing, **update_data}, current_user)
+        update_data["calories_estimated"] = True
+    
     if update_data:
         result = await db.workouts.update_one(
             {"_id": ObjectId(workout_id), "user_id": current_user["id"]},
@@ -109,16 +151,24 @@ async def update_workout(
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Workout not found")
+        await bump_version(db, current_user, "workouts")
+        
+        if "calories_burned" in update_data:
+            await apply_delta(db, current_user["id"], existing["date"], combine(
+                workout_delta(update_data), workout_delta(existing, -1)
+            ))
+        
+        if "exercises" in update_data:
+            await record_personal_records(db, current_user["id"], update_data["exercises"])
+            # $max cannot lower a record, so recompute exercises that were edited or removed
+            changed = {
+                exercise_key(exercise) for exercise in existing.get("exercises") or []
+                if exercise not in update_data["exercises"]
+            }
+            await recompute_personal_records(db, current_user["id"], changed)
     
     workout = await db.workouts.find_one({"_id": ObjectId(workout_id)})
-    workout["id"] = str(workout["_id"])
-    del workout["_id"]
-    
-    # Convert user_id if it's an ObjectId
-    if isinstance(workout.get("user_id"), ObjectId):
-        workout["user_id"] = str(workout["user_id"])
-    
-    return workout
+    return ORJSONResponse(serialize_doc(workout))
 
 @router.delete("/{workout_id}")
 async def delete_workout(
@@ -127,12 +177,17 @@ async def delete_workout(
 ):
     db = get_database()
     
-    result = await db.workouts.delete_one({
+    deleted = await db.workouts.find_one_and_delete({
         "_id": ObjectId(workout_id),
         "user_id": current_user["id"]
     })
     
-    if result.deleted_count == 0:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Workout not found")
     
+    await apply_delta(db, current_user["id"], deleted["date"], workout_delta(deleted, -1))
+    await bump_version(db, current_user, "workouts")
+    await recompute_personal_records(
+        db, current_user["id"], {exercise_key(e) for e in deleted.get("exercises") or []}
+    )
     return {"message": "Workout deleted successfully"}
\ No newline at end of file
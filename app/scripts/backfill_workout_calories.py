@@ -0,0 +1,89 @@
+"""
+Backfill server-side calorie estimates for historical workouts.
+
+The new calories are added to each user's daily totals and their workouts
+data version is bumped, so energy balance, forecasts and cached
+conditional GETs see them.
+
+Usage:
+    python -m app.scripts.backfill_workout_calories [--batch-size 500] [--dry-run]
+"""
+import argparse
+import asyncio
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.calorie_predictor import CaloriePredictor
+from app.services.daily_totals import apply_delta, day_start
+from app.services.data_versions import bump_version
+
+calorie_predictor = CaloriePredictor()
+
+async def load_user_weights(db, user_ids) -> dict:
+    object_ids = [ObjectId(uid) for uid in user_ids if ObjectId.is_valid(str(uid))]
+    cursor = db.users.find({"_id": {"$in": object_ids}}, {"weight": 1})
+    return {str(user["_id"]): user.get("weight") or 70 async for user in cursor}
+
+async def backfill(batch_size: int = 500, dry_run: bool = False) -> int:
+    db = get_database()
+    query = {"$or": [
+        {"calories_burned": {"$in": [0, None]}},
+        {"calories_burned": {"$exists": False}}
+    ]}
+    cursor = db.workouts.find(
+        query, {"user_id": 1, "date": 1, "title": 1, "type": 1, "exercises": 1, "duration": 1}
+    ).batch_size(batch_size)
+    
+    updated = 0
+    batch = []
+    # (user_id, day) -> calories added; matched workouts had none before
+    added = {}
+    
+    async def flush(workouts):
+        weights = await load_user_weights(db, {str(w["user_id"]) for w in workouts})
+        operations = []
+        for w in workouts:
+            calories = calorie_predictor.estimate_workout_document(w, weights.get(str(w["user_id"]), 70))
+            operations.append(UpdateOne(
+                {"_id": w["_id"]},
+                {"$set": {"calories_burned": calories, "calories_estimated": True}}
+            ))
+            if w.get("date") is not None:
+                key = (str(w["user_id"]), day_start(w["date"]))
+                added[key] = added.get(key, 0) + calories
+        if not dry_run:
+            await db.workouts.bulk_write(operations, ordered=False)
+        return len(operations)
+    
+    async for workout in cursor:
+        batch.append(workout)
+        if len(batch) >= batch_size:
+            updated += await flush(batch)
+            batch = []
+    if batch:
+        updated += await flush(batch)
+    
+    if not dry_run:
+        for (user_id, day), calories in added.items():
+            await apply_delta(db, user_id, day, {"calories_out": calories})
+        for user_id in {user_id for user_id, _ in added}:
+            await bump_version(db, {"id": user_id}, "workouts")
+    
+    return updated
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill workout calorie estimates")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    
+    await connect_to_mongo()
+    try:
+        count = await backfill(args.batch_size, args.dry_run)
+        action = "Would update" if args.dry_run else "Updated"
+        print(f"✅ {action} {count} workouts")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
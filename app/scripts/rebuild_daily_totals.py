@@ -0,0 +1,36 @@
+"""
+Rebuild per-day totals and prefix sums from meal, workout and water history.
+
+Usage:
+    python -m app.scripts.rebuild_daily_totals [--user-id USER_ID]
+"""
+import argparse
+import asyncio
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.daily_totals import rebuild_daily_totals
+
+async def rebuild(user_id: str = None) -> int:
+    db = get_database()
+    if user_id:
+        user_ids = [user_id]
+    else:
+        user_ids = [str(user["_id"]) async for user in db.users.find({}, {"_id": 1})]
+    
+    for uid in user_ids:
+        await rebuild_daily_totals(db, uid)
+    return len(user_ids)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild daily totals and prefix sums")
+    parser.add_argument("--user-id", help="Only rebuild this user")
+    args = parser.parse_args()
+    
+    await connect_to_mongo()
+    try:
+        count = await rebuild(args.user_id)
+        print(f"✅ Rebuilt daily totals for {count} users")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
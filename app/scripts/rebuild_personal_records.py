@@ -0,0 +1,38 @@
+"""
+Rebuild the personal_records collection from workout history.
+
+Usage:
+    python -m app.scripts.rebuild_personal_records [--user-id USER_ID]
+"""
+import argparse
+import asyncio
+from app.database import connect_to_mongo, close_mongo_connection, ensure_indexes, get_database
+from app.services.data_versions import bump_version
+from app.services.personal_records import recompute_personal_records
+
+async def rebuild(user_id: str = None) -> int:
+    db = get_database()
+    user_ids = [user_id] if user_id else await db.workouts.distinct("user_id")
+    
+    total = 0
+    for uid in user_ids:
+        total += await recompute_personal_records(db, str(uid))
+        # Records are derived from workouts and versioned with them
+        await bump_version(db, {"id": str(uid)}, "workouts")
+    return total
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild personal records")
+    parser.add_argument("--user-id", help="Only rebuild records for this user")
+    args = parser.parse_args()
+    
+    await connect_to_mongo()
+    try:
+        await ensure_indexes()
+        count = await rebuild(args.user_id)
+        print(f"✅ Rebuilt {count} personal records")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""
+Reconcile stored streaks against meal, workout and water history.
+
+Usage:
+    python -m app.scripts.repair_streaks [--user-id USER_ID]
+"""
+import argparse
+import asyncio
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from bson import ObjectId
+from app.services.data_versions import bump_version
+from app.services.streaks import repair_streak
+
+async def repair(user_id: str = None) -> int:
+    db = get_database()
+    query = {"_id": ObjectId(user_id)} if user_id else {}
+    users = [user async for user in db.users.find(query, {"streak": 1})]
+    
+    for user in users:
+        uid = str(user["_id"])
+        if await repair_streak(db, uid) != user.get("streak"):
+            # The streak is part of the profile stats' ETag
+            await bump_version(db, {"id": uid}, "profile")
+    return len(users)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Repair user streaks from history")
+    parser.add_argument("--user-id", help="Only repair this user")
+    args = parser.parse_args()
+    
+    await connect_to_mongo()
+    try:
+        count = await repair(args.user_id)
+        print(f"✅ Repaired streaks for {count} users")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
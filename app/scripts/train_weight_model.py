@@ -0,0 +1,98 @@
+"""
+Train the weight-forecast model from logged intake, burn and weigh-ins.
+
+Reads weight_logs and daily_totals for every user, fits a ridge regression
+of weight change on energy balance and writes it to WEIGHT_MODEL_PATH.
+Workers pick the new model up on restart.
+
+Usage:
+    python -m app.scripts.train_weight_model [--output PATH] [--min-samples N]
+"""
+import argparse
+import asyncio
+import os
+from datetime import datetime
+import joblib
+import numpy as np
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from app.config import settings
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.nutrition_targets import compute_nutrition_targets, has_complete_profile
+from app.services.weight_forecast import FEATURES, training_samples
+
+async def collect_samples(db):
+    rows, targets = [], []
+    users = db.users.find({}, {"age": 1, "gender": 1, "height": 1, "weight": 1,
+                               "activity_level": 1, "goal": 1, "nutrition_targets": 1})
+    async for user in users:
+        user_id = str(user["_id"])
+        targets_doc = user.get("nutrition_targets")
+        if not targets_doc:
+            if not has_complete_profile(user):
+                continue
+            targets_doc = compute_nutrition_targets(user)
+
+        weight_logs = await db.weight_logs.find(
+            {"user_id": user_id}, {"weight": 1, "date": 1}
+        ).sort("date", 1).to_list(length=None)
+        if len(weight_logs) < 2:
+            continue
+        daily_totals = await db.daily_totals.find(
+            {"user_id": user_id}, {"day": 1, "calories_in": 1, "calories_out": 1}
+        ).sort("day", 1).to_list(length=None)
+
+        user_rows, user_targets = training_samples(weight_logs, daily_totals, targets_doc["tdee"])
+        rows.extend(user_rows)
+        targets.extend(user_targets)
+    return np.array(rows).reshape(-1, len(FEATURES)), np.array(targets)
+
+def fit(features: np.ndarray, targets: np.ndarray, alpha: float) -> dict:
+    estimator = Pipeline([("scaler", StandardScaler()), ("model", Ridge(alpha=alpha))])
+    metrics = {}
+    if len(targets) >= 20:
+        train_x, test_x, train_y, test_y = train_test_split(features, targets, test_size=0.2, random_state=0)
+        estimator.fit(train_x, train_y)
+        predicted = estimator.predict(test_x)
+        metrics = {
+            "mae_kg": round(float(mean_absolute_error(test_y, predicted)), 3),
+            "r2": round(float(r2_score(test_y, predicted)), 3)
+        }
+    # Final model uses every sample
+    estimator.fit(features, targets)
+    return {
+        "model": "ridge",
+        "features": list(FEATURES),
+        "estimator": estimator,
+        "samples": int(len(targets)),
+        "metrics": metrics,
+        "trained_at": datetime.utcnow().isoformat()
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="Train the weight-forecast model")
+    parser.add_argument("--output", default=settings.WEIGHT_MODEL_PATH, help="Where to write the model")
+    parser.add_argument("--min-samples", type=int, default=50, help="Refuse to train on fewer samples")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Ridge regularization strength")
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    try:
+        features, targets = await collect_samples(get_database())
+    finally:
+        await close_mongo_connection()
+
+    if len(targets) < args.min_samples:
+        print(f"❌ Only {len(targets)} samples, need {args.min_samples}; model not written")
+        return
+
+    artifact = fit(features, targets, args.alpha)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    joblib.dump(artifact, args.output)
+    print(f"✅ Trained on {artifact['samples']} samples {artifact['metrics']} -> {args.output}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,6 @@
 from datetime import timedelta
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from app.utils.security import verify_password, get_password_hash, create_access_token
 from app.database import get_database
 from app.config import settings
@@ -11,7 +12,8 @@ async def authenticate_user(email: str, password: str):
     if not user:
         return None
     
-    if not verify_password(password, user["password"]):
+    # bcrypt takes ~300ms of CPU; keep it off the event loop
+    if not await run_in_threadpool(verify_password, password, user["password"]):
         return None
     
     return user
@@ -26,7 +28,7 @@ async def create_user(user_data: dict):
             detail="Email already registered"
         )
     
-    user_data["password"] = get_password_hash(user_data["password"])
+    user_data["password"] = await run_in_threadpool(get_password_hash, user_data["password"])
     result = await db.users.insert_one(user_data)
     user_data["_id"] = result.inserted_id
     
@@ -1,3 +1,6 @@
+from typing import Dict, Optional
+from app.services.exercise_registry import EXERCISE_CALORIES, exercise_registry
+
 class CaloriePredictor:
     def __init__(self):
         self.activity_multipliers = {
@@ -9,26 +12,21 @@ class CaloriePredictor:
         }
         
         # Exercise calorie burn rates (calories per minute for 70kg person)
-        self.exercise_calories = {
-            "Running (Outdoor)": 11.4,
-            "Treadmill Running": 11.0,
-            "Cycling (Outdoor)": 7.5,
-            "Stationary Bike": 6.8,
-            "Swimming": 9.0,
-            "Jump Rope": 12.3,
-            "Rowing Machine": 8.5,
-            "Elliptical Trainer": 7.0,
-            "Stair Climber": 9.0,
-            "HIIT": 12.0,
-            "Weight Training": 6.0,
-            "Strength Training": 6.0,
-            "Yoga": 3.0,
-            "Pilates": 4.0,
-            "Walking": 4.0,
-            "Burpees": 10.0,
-            "Box Jumps": 9.5,
-            "Battle Ropes": 10.5,
-            "Kettlebell Swings": 9.8
+        self.exercise_calories = EXERCISE_CALORIES
+        
+        # Fallback burn rates by workout type when the name is unknown
+        self.workout_type_calories = {
+            "strength": 6.0,
+            "cardio": 8.0,
+            "flexibility": 3.0,
+            "sports": 7.0,
+            "other": 5.0
+        }
+        
+        # Per-kg rates by workout type; per-exercise rates live in the registry
+        self.type_calories_per_kg = {
+            workout_type: rate / 70
+            for workout_type, rate in self.workout_type_calories.items()
         }
     
     def calculate_bmr(self, age: int, gender: str, height: float, weight: float) -> float:
@@ -146,9 +144,11 @@ class CaloriePredictor:
         Returns:
             Dictionary with calorie estimates and details
         """
-        base_rate = self.exercise_calories.get(exercise_type, 6.0)
+        exercise = exercise_registry.resolve(exercise_type)
+        per_kg = exercise["calories_per_kg"] if exercise else 6.0 / 70
+        base_rate = per_kg * 70
         # Adjust for body weight (base rate is for 70kg person)
-        adjusted_rate = base_rate * (weight / 70)
+        adjusted_rate = per_kg * weight
         calories = adjusted_rate * duration
         
         return {
@@ -163,6 +163,42 @@ class CaloriePredictor:
             }
         }
     
+    def rate_per_kg(self, name: Optional[str], workout_type: str = "other") -> float:
+        """Calories per minute per kg for an exercise name, falling back to the workout type"""
+        exercise = exercise_registry.resolve(name)
+        if exercise:
+            return exercise["calories_per_kg"]
+        return self.type_calories_per_kg.get(workout_type, self.type_calories_per_kg["other"])
+    
+    def estimate_workout_document(self, workout: Dict, weight: float) -> int:
+        """
+        Estimate total calories for a workout document before it is stored
+        
+        Exercises with their own duration use their own burn rate; the rest of
+        the session is charged at the rate for the workout title or type.
+        
+        Args:
+            workout: Workout dict with type, duration, title and exercises
+            weight: Body weight in kilograms
+        
+        Returns:
+            Estimated calories burned
+        """
+        workout_type = workout.get("type") or "other"
+        calories = 0.0
+        timed_minutes = 0
+        
+        for exercise in workout.get("exercises") or []:
+            minutes = exercise.get("duration") or 0
+            if minutes > 0:
+                calories += self.rate_per_kg(exercise.get("name"), workout_type) * weight * minutes
+                timed_minutes += minutes
+        
+        remaining = max((workout.get("duration") or 0) - timed_minutes, 0)
+        calories += self.rate_per_kg(workout.get("title"), workout_type) * weight * remaining
+        
+        return int(calories)
+    
     def _get_intensity_level(self, cal_per_min: float) -> str:
         """Determine exercise intensity based on calorie burn rate"""
         if cal_per_min >= 10:
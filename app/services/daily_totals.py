@@ -0,0 +1,169 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, Optional
+from bson import ObjectId
+from pymongo import DESCENDING, ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+# Per-day totals kept in daily_totals, each with a running cum_<field> prefix sum
+TOTAL_FIELDS = ("calories_in", "calories_out", "protein", "carbs", "fats", "water_liters")
+
+# A crashed writer's lock is taken over after this long
+LOCK_LEASE = timedelta(seconds=10)
+LOCK_RETRY_SECONDS = 0.005
+
+MEAL_FIELDS = {
+    "total_calories": "calories_in",
+    "total_protein": "protein",
+    "total_carbs": "carbs",
+    "total_fats": "fats"
+}
+
+def day_start(value) -> datetime:
+    """Naive UTC midnight of the day containing value, matching $dateToString's UTC buckets"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return day_start(datetime.fromisoformat(str(value).replace('Z', '+00:00')))
+
+def meal_delta(meal: Dict, sign: int = 1) -> Dict:
+    return {target: sign * (meal.get(source) or 0) for source, target in MEAL_FIELDS.items()}
+
+def workout_delta(workout: Dict, sign: int = 1) -> Dict:
+    return {"calories_out": sign * (workout.get("calories_burned") or 0)}
+
+def water_delta(water: Dict, sign: int = 1) -> Dict:
+    return {"water_liters": sign * (water.get("amount") or 0)}
+
+def combine(*deltas: Dict) -> Dict:
+    combined = {}
+    for delta in deltas:
+        for field, value in delta.items():
+            combined[field] = combined.get(field, 0) + value
+    return combined
+
+@asynccontextmanager
+async def user_totals_lock(db, user_id: str):
+    """
+    Serialize changes to one user's daily totals across workers
+
+    A lease document per user in daily_totals_locks; the upsert only matches
+    an expired lease, so while another writer holds it the insert hits the
+    _id and raises DuplicateKeyError, and we retry shortly after.
+    """
+    owner = ObjectId()
+    while True:
+        now = datetime.utcnow()
+        try:
+            await db.daily_totals_locks.update_one(
+                {"_id": user_id, "expires": {"$lt": now}},
+                {"$set": {"owner": owner, "expires": now + LOCK_LEASE}},
+                upsert=True
+            )
+            break
+        except DuplicateKeyError:
+            await asyncio.sleep(LOCK_RETRY_SECONDS)
+    try:
+        yield
+    finally:
+        await db.daily_totals_locks.delete_one({"_id": user_id, "owner": owner})
+
+async def apply_delta(db, user_id: str, when, delta: Dict):
+    """
+    Add a change to one day's totals and to every later prefix sum
+
+    Five commands regardless of history length: the user's lock, one read
+    for the seed, an upsert for the day, one update_many for all later
+    prefix sums and the unlock. The lock matters when the upsert creates the
+    day: a concurrent write to an earlier day could otherwise land between
+    the seed read and the insert and be missing from the new day's sums.
+    """
+    delta = {field: value for field, value in delta.items() if value}
+    if not delta:
+        return
+    day = day_start(when)
+
+    async with user_totals_lock(db, user_id):
+        # Latest day at or before this one: the day itself, or the prefix sums to seed it from
+        previous = await db.daily_totals.find_one(
+            {"user_id": user_id, "day": {"$lte": day}},
+            {f"cum_{field}": 1 for field in TOTAL_FIELDS},
+            sort=[("day", DESCENDING)]
+        )
+        seed = {f"cum_{field}": (previous or {}).get(f"cum_{field}", 0) for field in TOTAL_FIELDS}
+
+        await db.daily_totals.update_one(
+            {"user_id": user_id, "day": day},
+            {"$setOnInsert": seed, "$inc": delta},
+            upsert=True
+        )
+        await db.daily_totals.update_many(
+            {"user_id": user_id, "day": {"$gte": day}},
+            {"$inc": {f"cum_{field}": value for field, value in delta.items()}}
+        )
+
+async def _prefix_at(db, user_id: str, query: Dict) -> Dict:
+    doc = await db.daily_totals.find_one(
+        {"user_id": user_id, "day": query},
+        {f"cum_{field}": 1 for field in TOTAL_FIELDS},
+        sort=[("day", DESCENDING)]
+    )
+    return {field: (doc or {}).get(f"cum_{field}", 0) for field in TOTAL_FIELDS}
+
+async def range_totals(db, user_id: str, start: Optional[datetime], end: datetime) -> Dict:
+    """Totals between two days (inclusive) from two prefix-sum lookups"""
+    upto_end = await _prefix_at(db, user_id, {"$lte": day_start(end)})
+    if start is None:
+        return upto_end
+    before_start = await _prefix_at(db, user_id, {"$lt": day_start(start)})
+    return {field: upto_end[field] - before_start[field] for field in TOTAL_FIELDS}
+
+async def rebuild_daily_totals(db, user_id: str) -> int:
+    """Recompute a user's daily totals and prefix sums from raw history"""
+    # Live prefix-sum updates wait rather than interleave with the replacement
+    async with user_totals_lock(db, user_id):
+        return await _rebuild_daily_totals(db, user_id)
+
+async def _rebuild_daily_totals(db, user_id: str) -> int:
+    per_day: Dict[datetime, Dict] = {}
+
+    async def collect(collection, sums: Dict):
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
+                **{field: {"$sum": f"${source}"} for field, source in sums.items()}
+            }}
+        ]
+        async for item in collection.aggregate(pipeline):
+            if not item["_id"]:
+                continue
+            totals = per_day.setdefault(day_start(item["_id"]), {field: 0 for field in TOTAL_FIELDS})
+            for field in sums:
+                totals[field] += item[field] or 0
+
+    await collect(db.meals, {target: source for source, target in MEAL_FIELDS.items()})
+    await collect(db.workouts, {"calories_out": "calories_burned"})
+    await collect(db.water, {"water_liters": "amount"})
+
+    running = {field: 0 for field in TOTAL_FIELDS}
+    operations = []
+    for day in sorted(per_day):
+        totals = per_day[day]
+        for field in TOTAL_FIELDS:
+            running[field] += totals[field]
+        operations.append(ReplaceOne(
+            {"user_id": user_id, "day": day},
+            {"user_id": user_id, "day": day, **totals,
+             **{f"cum_{field}": value for field, value in running.items()}},
+            upsert=True
+        ))
+
+    await db.daily_totals.delete_many({"user_id": user_id, "day": {"$nin": list(per_day)}})
+    if operations:
+        await db.daily_totals.bulk_write(operations, ordered=False)
+    return len(operations)
@@ -0,0 +1,44 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+from bson import ObjectId
+
+def data_version(current_user: dict, collection: str) -> int:
+    return (current_user.get("data_versions") or {}).get(collection, 0)
+
+async def bump_version(db, current_user: dict, *collections: str):
+    """
+    Record a write to the user's data in the given collections
+
+    The counters live on the user document, which every authenticated
+    request already loads, so checking them for an ETag costs no query.
+    Outside a request (maintenance scripts) pass {"id": user_id}.
+    """
+    await db.users.update_one(
+        {"_id": ObjectId(current_user["id"])},
+        {"$inc": {f"data_versions.{collection}": 1 for collection in collections}}
+    )
+    versions = current_user.setdefault("data_versions", {})
+    for collection in collections:
+        versions[collection] = versions.get(collection, 0) + 1
+
+def compute_etag(current_user: dict, collections: Iterable[str], resource: str, day: Optional[str] = None) -> str:
+    """Weak ETag over the user's collection versions and the requested resource"""
+    parts = [current_user["id"], resource, day or ""]
+    parts.extend(f"{collection}:{data_version(current_user, collection)}" for collection in collections)
+    digest = hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+def today_key() -> str:
+    return datetime.utcnow().date().isoformat()
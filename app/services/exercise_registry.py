@@ -0,0 +1,271 @@
+import re
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Exercise calorie burn rates (calories per minute for 70kg person)
+EXERCISE_CALORIES = {
+    "Running (Outdoor)": 11.4,
+    "Treadmill Running": 11.0,
+    "Cycling (Outdoor)": 7.5,
+    "Stationary Bike": 6.8,
+    "Swimming": 9.0,
+    "Jump Rope": 12.3,
+    "Rowing Machine": 8.5,
+    "Elliptical Trainer": 7.0,
+    "Stair Climber": 9.0,
+    "HIIT": 12.0,
+    "Weight Training": 6.0,
+    "Strength Training": 6.0,
+    "Yoga": 3.0,
+    "Pilates": 4.0,
+    "Walking": 4.0,
+    "Burpees": 10.0,
+    "Box Jumps": 9.5,
+    "Battle Ropes": 10.5,
+    "Kettlebell Swings": 9.8
+}
+
+# Exercises used by the workout planner, grouped by type and muscle group
+EXERCISES_DB = {
+    "strength": {
+        "chest": [
+            "Barbell Bench Press", "Incline Dumbbell Press", "Decline Bench Press",
+            "Dumbbell Flyes", "Cable Crossovers", "Push-ups", "Dips",
+            "Incline Bench Press", "Pec Deck Machine", "Landmine Press"
+        ],
+        "back": [
+            "Deadlifts", "Pull-ups", "Bent Over Barbell Rows", "Lat Pulldowns",
+            "Seated Cable Rows", "T-Bar Rows", "Single-Arm Dumbbell Rows",
+            "Face Pulls", "Hyperextensions", "Inverted Rows"
+        ],
+        "legs": [
+            "Barbell Squats", "Front Squats", "Romanian Deadlifts", "Leg Press",
+            "Bulgarian Split Squats", "Walking Lunges", "Leg Curls", "Leg Extensions",
+            "Calf Raises", "Goblet Squats", "Step-ups", "Hack Squats"
+        ],
+        "shoulders": [
+            "Overhead Press", "Arnold Press", "Lateral Raises", "Front Raises",
+            "Rear Delt Flyes", "Face Pulls", "Shrugs", "Upright Rows",
+            "Cable Lateral Raises", "Dumbbell Shoulder Press"
+        ],
+        "arms": [
+            "Barbell Curls", "Hammer Curls", "Preacher Curls", "Concentration Curls",
+            "Tricep Dips", "Skull Crushers", "Overhead Tricep Extension",
+            "Cable Tricep Pushdowns", "Close-Grip Bench Press", "Cable Curls"
+        ],
+        "core": [
+            "Planks", "Side Planks", "Russian Twists", "Leg Raises",
+            "Bicycle Crunches", "Mountain Climbers", "Dead Bug", "Pallof Press",
+            "Ab Wheel Rollouts", "Hanging Knee Raises", "Cable Crunches"
+        ]
+    },
+    "cardio": [
+        "Running (Outdoor)", "Treadmill Running", "Cycling (Outdoor)",
+        "Stationary Bike", "Swimming", "Rowing Machine", "Jump Rope",
+        "Elliptical Trainer", "Stair Climber", "Battle Ropes",
+        "Box Jumps", "Burpees", "High Knees", "Jumping Jacks",
+        "Mountain Climbers", "Sprint Intervals"
+    ],
+    "hiit": [
+        "Burpees", "Jump Squats", "Mountain Climbers", "High Knees",
+        "Box Jumps", "Jumping Lunges", "Battle Ropes", "Kettlebell Swings",
+        "Sprint Intervals", "Jumping Jacks", "Plank Jacks", "Tuck Jumps"
+    ],
+    "flexibility": [
+        "Yoga Flow", "Dynamic Stretching", "Static Stretching",
+        "Foam Rolling", "Pilates", "Tai Chi", "Mobility Drills"
+    ]
+}
+
+# Alternative spellings users log, mapped to a display name above
+EXERCISE_ALIASES = {
+    "Running (Outdoor)": ["Run", "Running", "Jogging", "Outdoor Run"],
+    "Treadmill Running": ["Treadmill", "Treadmill Run"],
+    "Cycling (Outdoor)": ["Cycling", "Biking", "Bike Ride", "Road Cycling"],
+    "Stationary Bike": ["Spin Bike", "Spinning", "Exercise Bike", "Indoor Cycling"],
+    "Swimming": ["Swim", "Laps"],
+    "Jump Rope": ["Skipping", "Skipping Rope"],
+    "Rowing Machine": ["Rowing", "Rower", "Erg"],
+    "Elliptical Trainer": ["Elliptical", "Cross Trainer"],
+    "Stair Climber": ["Stairmaster", "Stair Machine", "Stairs"],
+    "Weight Training": ["Weights", "Weightlifting", "Lifting"],
+    "Walking": ["Walk", "Hiking", "Brisk Walk"],
+    "Yoga Flow": ["Vinyasa"],
+    "Barbell Bench Press": ["Bench Press", "Bench", "Flat Bench"],
+    "Barbell Squats": ["Squats", "Back Squat", "Squat"],
+    "Deadlifts": ["Deadlift", "Conventional Deadlift"],
+    "Overhead Press": ["OHP", "Military Press", "Shoulder Press"],
+    "Pull-ups": ["Pullups", "Chin-ups", "Chinups"],
+    "Push-ups": ["Pushups", "Press-ups"],
+    "Romanian Deadlifts": ["RDL", "RDLs"],
+    "Bent Over Barbell Rows": ["Barbell Rows", "Bent Over Rows"]
+}
+
+# Burn rates for exercises without an entry in EXERCISE_CALORIES
+CATEGORY_CALORIES = {
+    "strength": 6.0,
+    "cardio": 8.0,
+    "hiit": 10.0,
+    "flexibility": 3.0
+}
+
+# Categories for rate-table entries the planner does not use
+RATE_ONLY_CATEGORIES = {
+    "HIIT": "hiit",
+    "Weight Training": "strength",
+    "Strength Training": "strength",
+    "Yoga": "flexibility",
+    "Walking": "cardio"
+}
+
+FUZZY_THRESHOLD = 0.5
+# Resolved keys memoized per registry; logged names are user input, so bounded
+RESOLVE_CACHE_SIZE = 4096
+
+def normalize_exercise_name(name: str) -> str:
+    """Lowercase and strip punctuation so 'Running (Outdoor)' == 'running outdoor'"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name.lower()).split())
+
+def _singular_key(key: str) -> str:
+    return " ".join(
+        token[:-1] if len(token) > 3 and token.endswith("s") else token
+        for token in key.split()
+    )
+
+def _slug(name: str) -> str:
+    return normalize_exercise_name(name).replace(" ", "_")
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class ExerciseRegistry:
+    """
+    Canonical exercise catalog shared by CaloriePredictor and WorkoutPlanner.
+
+    Names and aliases resolve through a normalized-key dict (O(1)); unknown
+    spellings fall back to the token and trigram indexes and are memoized.
+    """
+
+    def __init__(self):
+        self.exercises: Dict[str, Dict] = {}
+        self._keys: Dict[str, str] = {}
+        self._token_index: Dict[str, set] = {}
+        self._trigram_index: Dict[str, set] = {}
+        self._trigram_counts: Dict[str, int] = {}
+        self._resolved: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+    @classmethod
+    def build(cls) -> "ExerciseRegistry":
+        registry = cls()
+
+        for category, groups in EXERCISES_DB.items():
+            if isinstance(groups, dict):
+                for muscle_group, names in groups.items():
+                    for name in names:
+                        registry._add(name, category, muscle_group)
+            else:
+                for name in groups:
+                    registry._add(name, category)
+
+        for name in EXERCISE_CALORIES:
+            if normalize_exercise_name(name) not in registry._keys:
+                registry._add(name, RATE_ONLY_CATEGORIES.get(name, "cardio"))
+
+        for name, aliases in EXERCISE_ALIASES.items():
+            exercise_id = registry._keys[normalize_exercise_name(name)]
+            for alias in aliases:
+                registry._index_name(alias, exercise_id)
+
+        return registry
+
+    def _add(self, name: str, category: str, muscle_group: Optional[str] = None):
+        exercise_id = self._keys.get(normalize_exercise_name(name))
+        if exercise_id is None:
+            exercise_id = _slug(name)
+            calories_per_min = EXERCISE_CALORIES.get(name, CATEGORY_CALORIES[category])
+            self.exercises[exercise_id] = {
+                "id": exercise_id,
+                "name": name,
+                "categories": [],
+                "muscle_groups": [],
+                "calories_per_min": calories_per_min,
+                "calories_per_kg": calories_per_min / 70
+            }
+            self._index_name(name, exercise_id)
+
+        exercise = self.exercises[exercise_id]
+        if category not in exercise["categories"]:
+            exercise["categories"].append(category)
+        if muscle_group and muscle_group not in exercise["muscle_groups"]:
+            exercise["muscle_groups"].append(muscle_group)
+
+    def _index_name(self, name: str, exercise_id: str):
+        key = normalize_exercise_name(name)
+        for variant in (key, _singular_key(key)):
+            self._keys.setdefault(variant, exercise_id)
+
+        for token in _singular_key(key).split():
+            self._token_index.setdefault(token, set()).add(exercise_id)
+
+        grams = _trigrams(_singular_key(key))
+        for gram in grams:
+            self._trigram_index.setdefault(gram, set()).add(key)
+        self._trigram_counts[key] = len(grams)
+
+    def get(self, exercise_id: str) -> Optional[Dict]:
+        return self.exercises.get(exercise_id)
+
+    def resolve(self, name: Optional[str]) -> Optional[Dict]:
+        """Resolve a logged exercise name to its registry entry, or None"""
+        if not name:
+            return None
+        exercise_id = self.resolve_id(normalize_exercise_name(name))
+        return self.exercises.get(exercise_id) if exercise_id else None
+
+    def resolve_id(self, key: str) -> Optional[str]:
+        if key in self._resolved:
+            self._resolved.move_to_end(key)
+            return self._resolved[key]
+
+        exercise_id = (
+            self._keys.get(key) or self._keys.get(_singular_key(key))
+            or self._fuzzy_match(_singular_key(key))
+        )
+        self._resolved[key] = exercise_id
+        if len(self._resolved) > RESOLVE_CACHE_SIZE:
+            self._resolved.popitem(last=False)
+        return exercise_id
+
+    def _fuzzy_match(self, key: str) -> Optional[str]:
+        tokens = key.split()
+        known = [token for token in tokens if token in self._token_index]
+        # Exercises containing every catalogue word in the key
+        allowed = set.intersection(*(self._token_index[token] for token in known)) if known else None
+        if known and len(known) == len(tokens):
+            # No typos to correct: only an unambiguous combination of words names
+            # an exercise, so "press" or "jumps" alone match nothing
+            return next(iter(allowed)) if len(allowed) == 1 else None
+
+        grams = _trigrams(key)
+        if not grams:
+            return None
+
+        overlap: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._trigram_index.get(gram, ()):
+                if allowed is None or self._keys[candidate] in allowed:
+                    overlap[candidate] = overlap.get(candidate, 0) + 1
+
+        best_key, best_score = None, 0.0
+        for candidate, shared in overlap.items():
+            score = shared / (len(grams) + self._trigram_counts[candidate] - shared)
+            if score > best_score:
+                best_key, best_score = candidate, score
+
+        if best_key is not None and best_score >= FUZZY_THRESHOLD:
+            return self._keys[best_key]
+        return None
+
+# Compiled once at import and shared by all services
+exercise_registry = ExerciseRegistry.build()
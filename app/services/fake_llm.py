@@ -0,0 +1,165 @@
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from typing import Dict, List, Optional
+from app.services.exercise_registry import EXERCISES_DB
+
+# Per-100g values the fake meal plans are portioned from
+FOODS = {
+    "breakfast": [
+        ("Oatmeal", 389, 16.9, 66.3, 6.9), ("Greek Yogurt", 59, 10, 3.6, 0.4),
+        ("Eggs", 155, 13, 1.1, 11), ("Banana", 89, 1.1, 23, 0.3), ("Blueberries", 57, 0.7, 14, 0.3)
+    ],
+    "lunch": [
+        ("Chicken Breast", 165, 31, 0, 3.6), ("Brown Rice", 123, 2.6, 25.6, 1.0),
+        ("Broccoli", 34, 2.8, 7, 0.4), ("Quinoa", 120, 4.4, 21.3, 1.9), ("Avocado", 160, 2, 8.5, 14.7)
+    ],
+    "dinner": [
+        ("Salmon", 208, 20, 0, 13), ("Sweet Potato", 86, 1.6, 20, 0.1),
+        ("Spinach", 23, 2.9, 3.6, 0.4), ("Lentils", 116, 9, 20, 0.4), ("Turkey Breast", 135, 30, 0, 0.7)
+    ],
+    "snack": [
+        ("Almonds", 579, 21, 22, 50), ("Apple", 52, 0.3, 14, 0.2),
+        ("Cottage Cheese", 98, 11, 3.4, 4.3), ("Peanut Butter", 588, 25, 20, 50)
+    ]
+}
+MEAL_TARGET_PATTERN = re.compile(r"- (Breakfast|Lunch|Dinner|Snacks): (\d+) cal")
+SPLITS = [
+    ("Upper Body Push", ["chest", "shoulders"]),
+    ("Lower Body", ["legs", "core"]),
+    ("Upper Body Pull", ["back", "arms"]),
+    ("Full Body", ["chest", "back", "legs"])
+]
+REPS = {"gain_muscle": "8-10", "lose_weight": "12-15", "maintain": "10-12"}
+TIPS = [
+    "Prioritise protein at every meal to support recovery.",
+    "Keep a water bottle with you and sip throughout the day.",
+    "Plan tomorrow's meals tonight to avoid impulsive choices.",
+    "Aim for 7-9 hours of sleep; recovery happens overnight.",
+    "Track your intake for a week before changing your targets.",
+    "Progress one variable at a time: load, reps or sets.",
+    "Fill half your plate with vegetables at lunch and dinner."
+]
+ANSWERS = [
+    "Focus on consistency first: train three to four times a week and progress gradually. Pair that with enough protein and sleep and results will follow.",
+    "A moderate calorie deficit of around 500 kcal a day is sustainable for most people. Keep protein high to preserve muscle while you lose fat.",
+    "Warm up for five to ten minutes before lifting and finish with light mobility work. It reduces injury risk and improves performance."
+]
+
+class FakeLLMError(RuntimeError):
+    """Injected provider failure"""
+
+class FakeLLM:
+    """
+    Offline stand-in for the Gemini and Groq clients
+
+    Replies are schema-valid diet-plan, workout-plan and insight JSON (plain
+    text for the trainer chat), derived deterministically from the prompt.
+    Latency is log-normal around median_ms and slept synchronously, the same
+    way the real SDK clients block their calling thread. error_rate and malformed_rate
+    inject failures and truncated JSON; a seed makes the sequence of
+    latencies and failures reproducible.
+    """
+
+    def __init__(self, median_ms: float = 800, sigma: float = 0.5, error_rate: float = 0.0,
+                 malformed_rate: float = 0.0, seed: Optional[int] = None):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self._rng = random.Random(seed)
+
+    def latency(self) -> float:
+        """Seconds for the next call"""
+        if self.sigma <= 0:
+            return self.median_ms / 1000
+        return self._rng.lognormvariate(math.log(self.median_ms / 1000), self.sigma)
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        delay, outcome = self.latency(), self._rng.random()
+        time.sleep(delay)
+        if outcome < self.error_rate:
+            raise FakeLLMError("injected provider error")
+
+        reply = self.reply(prompt)
+        if outcome < self.error_rate + self.malformed_rate:
+            return reply[:len(reply) // 2]
+        return reply
+
+    def reply(self, prompt: str) -> str:
+        rng = random.Random(hashlib.blake2b(prompt.encode(), digest_size=8).digest())
+        if "meal plan" in prompt:
+            return json.dumps(diet_plan(prompt, rng))
+        if "workout plan" in prompt:
+            return json.dumps(workout_plan(prompt, rng))
+        if "nutrition insights" in prompt:
+            return json.dumps(insights(prompt))
+        return rng.choice(ANSWERS)
+
+def portion(name: str, grams: int, kcal: float, protein: float, carbs: float, fats: float) -> Dict:
+    scale = grams / 100
+    return {
+        "name": name, "quantity": grams, "unit": "g",
+        "calories": round(kcal * scale), "protein": round(protein * scale, 1),
+        "carbs": round(carbs * scale, 1), "fats": round(fats * scale, 1)
+    }
+
+def diet_plan(prompt: str, rng: random.Random) -> Dict:
+    targets = {name.lower().rstrip("s"): int(calories) for name, calories in MEAL_TARGET_PATTERN.findall(prompt)}
+    meals = []
+    for meal_type, foods in FOODS.items():
+        target = targets.get(meal_type, 500)
+        chosen = rng.sample(foods, 3)
+        share = target / len(chosen)
+        meals.append({
+            "type": meal_type,
+            "name": f"{chosen[0][0]} {meal_type.title()} Bowl",
+            "target_calories": target,
+            "foods": [portion(name, max(5, round(share / kcal * 100 / 5) * 5), kcal, protein, carbs, fats)
+                      for name, kcal, protein, carbs, fats in chosen],
+            "preparation": f"Prepare the {chosen[0][0].lower()} and serve with the rest."
+        })
+    return {"meals": meals, "tips": rng.sample(TIPS, 5)}
+
+def workout_plan(prompt: str, rng: random.Random) -> Dict:
+    days = re.search(r"(\d+)-day", prompt)
+    goal = re.search(r"Goal: (\w+)", prompt)
+    days_per_week = int(days.group(1)) if days else 4
+    goal = goal.group(1) if goal else "maintain"
+
+    schedule: List[Dict] = []
+    for day in range(1, days_per_week + 1):
+        focus, groups = SPLITS[(day - 1) % len(SPLITS)]
+        names = rng.sample([name for group in groups for name in EXERCISES_DB["strength"][group]], 4)
+        schedule.append({
+            "day": day,
+            "focus": focus,
+            "type": "strength",
+            "duration": 60,
+            "exercises": [
+                {"name": name, "sets": rng.choice([3, 4]), "reps": REPS.get(goal, "10-12"), "rest": rng.choice([60, 90, 120])}
+                for name in names
+            ]
+        })
+    return {
+        "plan_name": f"{days_per_week}-Day {goal.replace('_', ' ').title()} Program",
+        "goal": goal,
+        "duration_weeks": 8,
+        "weekly_schedule": schedule,
+        "tips": rng.sample(TIPS, 5),
+        "nutrition_guidelines": {
+            "protein": "1.8g per kg", "carbs": "3-5g per kg", "fats": "0.8g per kg", "water": "3 liters"
+        }
+    }
+
+def insights(prompt: str) -> List[str]:
+    bmr = re.search(r"BMR: (\d+)", prompt)
+    tdee = re.search(r"TDEE: (\d+)", prompt)
+    return [
+        f"Your body uses about {bmr.group(1) if bmr else 'your BMR in'} calories a day at rest.",
+        f"Eating around {tdee.group(1) if tdee else 'your TDEE in'} calories keeps your weight stable.",
+        "Adjust intake by 300-500 calories a day toward your goal and review every two weeks."
+    ]
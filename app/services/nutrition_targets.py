@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Dict, Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+from app.services.diet_recommender import DietRecommender
+from app.database import get_database
+
+# Profile fields that BMR/TDEE/macros depend on. Changing any of these
+# invalidates the targets stored on the user document.
+PROFILE_FIELDS = ("age", "gender", "height", "weight", "activity_level", "goal")
+
+diet_recommender = DietRecommender()
+
+def compute_nutrition_targets(profile: dict) -> Dict:
+    """Compute derived nutrition targets from a user profile"""
+    bmr = diet_recommender.calculate_bmr(
+        profile["age"], profile["gender"], profile["height"], profile["weight"]
+    )
+    tdee = diet_recommender.calculate_tdee(bmr, profile["activity_level"])
+    daily_calories = diet_recommender.get_calorie_target(tdee, profile["goal"])
+
+    return {
+        "bmr": round(bmr, 1),
+        "tdee": round(tdee, 1),
+        "daily_calories": daily_calories,
+        "macros": diet_recommender.calculate_macros(daily_calories, profile["goal"]),
+        "meals_breakdown": diet_recommender.create_meal_breakdown(daily_calories),
+        "water_liters": round(profile["weight"] * 0.033, 1),
+        "computed_at": datetime.utcnow()
+    }
+
+def profile_changed(current: dict, update_data: dict) -> bool:
+    """True if the update touches a profile field with a different value"""
+    return any(
+        field in update_data and update_data[field] != current.get(field)
+        for field in PROFILE_FIELDS
+    )
+
+def has_complete_profile(user: dict) -> bool:
+    return all(user.get(field) is not None for field in PROFILE_FIELDS)
+
+async def get_nutrition_targets(current_user: dict) -> Optional[Dict]:
+    """Return stored targets, computing and persisting them for older accounts"""
+    targets = current_user.get("nutrition_targets")
+    if targets:
+        return targets
+
+    if not has_complete_profile(current_user):
+        return None
+
+    targets = compute_nutrition_targets(current_user)
+    db = get_database()
+    await db.users.update_one(
+        {"_id": ObjectId(current_user["id"])},
+        {"$set": {"nutrition_targets": targets}}
+    )
+    current_user["nutrition_targets"] = targets
+    return targets
+
+async def resolve_nutrition_targets(current_user: dict, user_data=None) -> Dict:
+    """
+    Targets for an AI request.
+
+    Uses the stored targets unless the client sent health data that differs
+    from the saved profile, in which case targets are computed for that data.
+    """
+    if user_data is not None:
+        profile = user_data.model_dump()
+        if profile_changed(current_user, profile):
+            return compute_nutrition_targets(profile)
+
+    targets = await get_nutrition_targets(current_user)
+    if targets is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Complete your profile or send health data to get recommendations"
+        )
+    return targets
+
+def profile_from_user(current_user: dict, user_data=None) -> dict:
+    """Health profile for an AI request, preferring explicit request data"""
+    if user_data is not None:
+        return user_data.model_dump()
+    return {field: current_user.get(field) for field in PROFILE_FIELDS}
@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from pymongo import ReplaceOne, UpdateOne
+
+def exercise_key(exercise: Dict) -> str:
+    """Registry id when known, otherwise the lowercased logged name"""
+    return exercise.get("exercise_id") or (exercise.get("name") or "").strip().lower()
+
+def exercise_bests(exercise: Dict) -> Dict:
+    """Record values contributed by a single logged exercise"""
+    weight = exercise.get("weight") or 0
+    reps = exercise.get("reps") or 0
+    sets = exercise.get("sets") or 0
+    bests = {
+        "max_reps": reps,
+        "max_duration": exercise.get("duration") or 0
+    }
+    if weight > 0:
+        bests["max_weight"] = weight
+        bests["max_volume"] = round(weight * reps * sets, 1)
+        bests["max_estimated_1rm"] = round(weight * (1 + reps / 30), 1)
+    return bests
+
+async def record_personal_records(db, user_id: str, exercises: List[Dict]):
+    """Raise per-exercise records with $max in a single bulk write"""
+    operations = []
+    for exercise in exercises:
+        key = exercise_key(exercise)
+        if not key:
+            continue
+        operations.append(UpdateOne(
+            {"user_id": user_id, "exercise_id": key},
+            {
+                "$max": exercise_bests(exercise),
+                "$set": {"name": exercise.get("name"), "updated_at": datetime.utcnow()}
+            },
+            upsert=True
+        ))
+    if operations:
+        await db.personal_records.bulk_write(operations, ordered=False)
+
+async def recompute_personal_records(db, user_id: str, exercise_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Rebuild records from workout history
+
+    Used after deletes and edits, where $max cannot lower a record. Limited
+    to the given exercises when exercise_ids is passed.
+    """
+    exercise_ids = set(exercise_ids) if exercise_ids is not None else None
+    if exercise_ids is not None and not exercise_ids:
+        return 0
+
+    cursor = db.workouts.find({"user_id": user_id, "exercises.0": {"$exists": True}}, {"exercises": 1})
+    records: Dict[str, Dict] = {}
+    async for workout in cursor:
+        for exercise in workout.get("exercises") or []:
+            key = exercise_key(exercise)
+            if not key or (exercise_ids is not None and key not in exercise_ids):
+                continue
+            record = records.setdefault(key, {"name": exercise.get("name")})
+            for field, value in exercise_bests(exercise).items():
+                record[field] = max(record.get(field, value), value)
+            record["name"] = exercise.get("name")
+
+    now = datetime.utcnow()
+    stale_filter = {"user_id": user_id}
+    if exercise_ids is not None:
+        stale_filter["exercise_id"] = {"$in": list(exercise_ids)}
+    await db.personal_records.delete_many({**stale_filter, "exercise_id": {
+        **stale_filter.get("exercise_id", {}), "$nin": list(records)
+    }})
+
+    operations = [
+        ReplaceOne(
+            {"user_id": user_id, "exercise_id": key},
+            {"user_id": user_id, "exercise_id": key, **record, "updated_at": now},
+            upsert=True
+        )
+        for key, record in records.items()
+    ]
+    if operations:
+        await db.personal_records.bulk_write(operations, ordered=False)
+    return len(operations)
+
+async def get_personal_records(db, user_id: str) -> List[Dict]:
+    cursor = db.personal_records.find({"user_id": user_id}, {"_id": 0, "user_id": 0}).sort("name", 1)
+    return await cursor.to_list(length=500)
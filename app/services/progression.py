@@ -0,0 +1,177 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.services.data_versions import data_version
+from app.services.exercise_registry import exercise_registry
+from app.utils.tracing import traced
+
+# Sessions per exercise kept for trend analysis
+HISTORY_SESSIONS = 12
+# Sessions with no estimated-1RM gain before a deload is suggested
+STALL_SESSIONS = 4
+REP_RANGES = {
+    "gain_muscle": (8, 12),
+    "lose_weight": (12, 15),
+    "maintain": (10, 12)
+}
+WEIGHT_STEP = 0.025
+MIN_WEIGHT_STEP = 1.0
+DELOAD = 0.9
+# (user, workouts version, goal) entries kept per worker
+CACHE_SIZE = 4096
+
+def _round_weight(weight: float) -> float:
+    """Round to the nearest 0.5kg plate increment"""
+    return round(weight * 2) / 2
+
+class ProgressionEngine:
+    """
+    Progressive-overload targets computed from a user's logged lifts.
+
+    History is grouped per exercise by one aggregation; trends are computed
+    with numpy. Results are cached under the user's workouts data version,
+    which every workout write bumps on the user document, so a write handled
+    by any worker retires the entries in all of them.
+    """
+
+    def __init__(self):
+        # (user_id, workouts version, goal) -> recommendations, least recent first
+        self._cache: "OrderedDict[Tuple[str, int, str], Dict]" = OrderedDict()
+
+    @traced("progression.get_recommendations")
+    async def get_recommendations(self, db, current_user: dict, goal: str = "maintain") -> Dict:
+        user_id = current_user["id"]
+        key = (user_id, data_version(current_user, "workouts"), goal)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        history = await self._load_history(db, user_id)
+        recommendations = {
+            "exercises": [self._recommend(item, goal) for item in history],
+        }
+        recommendations["by_exercise"] = {
+            item["exercise_id"]: item["next_target"] for item in recommendations["exercises"]
+        }
+        self._cache[key] = recommendations
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return recommendations
+
+    async def _load_history(self, db, user_id: str) -> List[Dict]:
+        pipeline = [
+            {"$match": {"user_id": user_id, "exercises.weight": {"$gt": 0}}},
+            {"$sort": {"date": 1}},
+            {"$unwind": "$exercises"},
+            {"$match": {"exercises.weight": {"$gt": 0}}},
+            {"$group": {
+                "_id": {"$ifNull": ["$exercises.exercise_id", {"$toLower": "$exercises.name"}]},
+                "name": {"$last": "$exercises.name"},
+                "sessions": {"$push": {
+                    "date": "$date",
+                    "sets": "$exercises.sets",
+                    "reps": "$exercises.reps",
+                    "weight": "$exercises.weight"
+                }}
+            }},
+            {"$project": {
+                "name": 1,
+                "total_sessions": {"$size": "$sessions"},
+                "sessions": {"$slice": ["$sessions", -HISTORY_SESSIONS]}
+            }}
+        ]
+        cursor = db.workouts.aggregate(pipeline)
+        history: Dict[str, Dict] = {}
+        async for item in cursor:
+            exercise_id = self._exercise_id(item["_id"])
+            merged = history.get(exercise_id)
+            if merged is None:
+                history[exercise_id] = {
+                    "exercise_id": exercise_id, "name": item["name"],
+                    "total_sessions": item["total_sessions"], "sessions": item["sessions"]
+                }
+                continue
+            # A legacy name and its exercise_id are the same lift
+            if item["sessions"][-1]["date"] > merged["sessions"][-1]["date"]:
+                merged["name"] = item["name"]
+            sessions = sorted(merged["sessions"] + item["sessions"], key=lambda s: s["date"])
+            merged["sessions"] = sessions[-HISTORY_SESSIONS:]
+            merged["total_sessions"] += item["total_sessions"]
+        return list(history.values())
+
+    def _exercise_id(self, key: str) -> str:
+        """Registry id for a group key; workouts logged before ids were stored group by lowercased name"""
+        if exercise_registry.get(key) is not None:
+            return key
+        entry = exercise_registry.resolve(key)
+        return entry["id"] if entry else key
+
+    def _recommend(self, item: Dict, goal: str) -> Dict:
+        sessions = item["sessions"]
+        weights = np.array([s["weight"] for s in sessions], dtype=float)
+        reps = np.array([s["reps"] for s in sessions], dtype=float)
+        sets = np.array([s["sets"] for s in sessions], dtype=float)
+        days = np.array(
+            [(s["date"] - sessions[0]["date"]).total_seconds() / 86400 for s in sessions],
+            dtype=float
+        )
+
+        # Epley estimated one-rep max and per-session volume
+        e1rm = weights * (1 + reps / 30)
+        volume = weights * reps * sets
+
+        e1rm_trend = self._weekly_slope(days, e1rm)
+        volume_trend = self._weekly_slope(days, volume)
+
+        low, high = REP_RANGES.get(goal, REP_RANGES["maintain"])
+        last_weight, last_reps, last_sets = weights[-1], int(reps[-1]), int(sets[-1])
+        # Stalled: the last few sessions never beat the earlier best
+        stalled = (
+            len(e1rm) > STALL_SESSIONS
+            and e1rm[-STALL_SESSIONS:].max() <= e1rm[:-STALL_SESSIONS].max()
+        )
+
+        if last_reps >= high:
+            action = "increase_weight"
+            step = max(last_weight * WEIGHT_STEP, MIN_WEIGHT_STEP)
+            target_weight, target_reps = _round_weight(last_weight + step), low
+        elif stalled:
+            action = "deload"
+            target_weight, target_reps = _round_weight(last_weight * DELOAD), low
+        else:
+            action = "add_reps"
+            target_weight, target_reps = float(last_weight), max(last_reps + 1, low)
+
+        return {
+            "exercise_id": item["exercise_id"],
+            "name": item["name"],
+            "sessions": item["total_sessions"],
+            "last": {
+                "date": sessions[-1]["date"],
+                "weight": float(last_weight),
+                "reps": last_reps,
+                "sets": last_sets
+            },
+            "estimated_1rm": round(float(e1rm[-1]), 1),
+            "best_estimated_1rm": round(float(e1rm.max()), 1),
+            "e1rm_trend_per_week": e1rm_trend,
+            "volume_trend_per_week": volume_trend,
+            "next_target": {
+                "weight": target_weight,
+                "reps": target_reps,
+                "sets": last_sets,
+                "action": action
+            }
+        }
+
+    def _weekly_slope(self, days: np.ndarray, values: np.ndarray) -> Optional[float]:
+        """Least-squares slope in units per week, None with too little history"""
+        if len(values) < 2 or np.ptp(days) == 0:
+            return None
+        centered = days - days.mean()
+        slope = (centered * (values - values.mean())).sum() / (centered ** 2).sum()
+        return round(float(slope * 7), 2)
+
+# Shared by the workouts and AI routers
+progression_engine = ProgressionEngine()
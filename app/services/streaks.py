@@ -0,0 +1,100 @@
+from datetime import datetime, date
+from typing import Dict, Optional, Set
+from bson import ObjectId
+from app.services.daily_totals import day_start
+
+EMPTY_STREAK = {"current": 0, "longest": 0, "last_active_day": None}
+
+def _day(value) -> date:
+    """UTC calendar day, the same buckets as daily totals and the repair job"""
+    return day_start(value).date()
+
+def current_streak(streak: Optional[Dict], today: Optional[date] = None) -> int:
+    """Streak as displayed today: it lapses once a full day passes without activity"""
+    if not streak or not streak.get("last_active_day"):
+        return 0
+    today = today or datetime.utcnow().date()
+    if (today - _day(streak["last_active_day"])).days > 1:
+        return 0
+    return streak.get("current", 0)
+
+def advance_streak(streak: Optional[Dict], activity_day: date) -> Optional[Dict]:
+    """
+    New streak state after activity on a given day, or None if unchanged
+
+    Only activity on or after the last active day moves the streak; backdated
+    entries are left to the repair job.
+    """
+    streak = streak or EMPTY_STREAK
+    last = streak.get("last_active_day")
+    if last is not None:
+        last = _day(last)
+        if activity_day <= last:
+            return None
+        gap = (activity_day - last).days
+        current = streak.get("current", 0) + 1 if gap == 1 else 1
+    else:
+        current = 1
+
+    return {
+        "current": current,
+        "longest": max(streak.get("longest", 0), current),
+        "last_active_day": activity_day.isoformat()
+    }
+
+async def record_activity(db, current_user: dict, when: Optional[datetime] = None):
+    """
+    Advance the user's streak for a meal, workout or water write
+
+    Uses the user document already loaded for the request, so this is at
+    most one conditional update and no reads.
+    """
+    activity_day = _day(when or datetime.utcnow())
+    streak = current_user.get("streak")
+    updated = advance_streak(streak, activity_day)
+    if updated is None:
+        return
+
+    # Guard on the previous day so concurrent writes cannot double-count
+    previous = (streak or {}).get("last_active_day")
+    await db.users.update_one(
+        {"_id": ObjectId(current_user["id"]), "streak.last_active_day": previous},
+        {"$set": {"streak": updated}}
+    )
+    current_user["streak"] = updated
+
+def streak_from_days(active_days: Set[date]) -> Dict:
+    """Full streak state from a set of active days (used by the repair job)"""
+    if not active_days:
+        return dict(EMPTY_STREAK)
+
+    ordered = sorted(active_days)
+    longest = current = 1
+    for previous, day in zip(ordered, ordered[1:]):
+        current = current + 1 if (day - previous).days == 1 else 1
+        longest = max(longest, current)
+
+    return {
+        "current": current,
+        "longest": longest,
+        "last_active_day": ordered[-1].isoformat()
+    }
+
+async def active_days(db, user_id: str) -> Set[date]:
+    """Distinct days with a meal, workout or water entry"""
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}}}
+    ]
+    days = set()
+    for collection in (db.meals, db.workouts, db.water):
+        async for item in collection.aggregate(pipeline):
+            if item["_id"]:
+                days.add(date.fromisoformat(item["_id"]))
+    return days
+
+async def repair_streak(db, user_id: str) -> Dict:
+    """Recompute a user's streak from their full history"""
+    streak = streak_from_days(await active_days(db, user_id))
+    await db.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"streak": streak}})
+    return streak
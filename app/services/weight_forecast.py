@@ -0,0 +1,195 @@
+import os
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.tracing import traced
+from app.services.daily_totals import day_start, range_totals
+
+logger = get_logger(__name__)
+
+# Model inputs, in column order. The target is the weight change in kg.
+FEATURES = (
+    "daily_balance",    # intake - burn - tdee, kcal per day
+    "balance_x_days",   # cumulative surplus over the horizon, kcal
+    "days",
+    "start_weight",
+    "daily_intake",
+    "daily_burn"
+)
+KCAL_PER_KG = 7700
+HORIZONS = (7, 30, 90)
+# Recent window the projection's intake and burn averages are taken from
+RECENT_DAYS = 14
+# Weight-log pairs this far apart become training samples
+MIN_WINDOW_DAYS = 7
+MAX_WINDOW_DAYS = 90
+
+def feature_matrix(start_weight, daily_intake, daily_burn, tdee, days) -> np.ndarray:
+    """One row per (user, horizon); every argument broadcasts against days"""
+    days = np.asarray(days, dtype=float)
+    intake = np.broadcast_to(np.asarray(daily_intake, dtype=float), days.shape)
+    burn = np.broadcast_to(np.asarray(daily_burn, dtype=float), days.shape)
+    weight = np.broadcast_to(np.asarray(start_weight, dtype=float), days.shape)
+    balance = intake - burn - np.asarray(tdee, dtype=float)
+    return np.stack([balance, balance * days, days, weight, intake, burn], axis=-1)
+
+def energy_averages(calories_in: float, calories_out: float, logged_days: int, days: int) -> Tuple[float, float]:
+    """
+    Average daily intake and burn over a window
+
+    Intake is averaged over days with a logged meal so unlogged days do not
+    read as fasting; burn is averaged over every day since rest days are real.
+    """
+    intake = calories_in / logged_days if logged_days else 0.0
+    burn = calories_out / days if days else 0.0
+    return intake, burn
+
+class WeightForecaster:
+    """
+    Projects body weight from recent energy balance.
+
+    Uses the linear model trained by app.scripts.train_weight_model when its
+    file exists, otherwise the 7700 kcal/kg energy-balance rule. The model is
+    loaded once per worker and folded into a single weight vector, so a
+    projection is one small matrix-vector product.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.WEIGHT_MODEL_PATH
+        self.metadata: Dict = {}
+        self._coef: Optional[np.ndarray] = None
+        self._intercept = 0.0
+        self._loaded = False
+
+    @property
+    def model_name(self) -> str:
+        self._ensure_loaded()
+        return self.metadata.get("model", "energy_balance")
+
+    def load(self):
+        self._loaded = True
+        # Fallback: weight change = cumulative surplus / 7700
+        self._coef = np.zeros(len(FEATURES))
+        self._coef[FEATURES.index("balance_x_days")] = 1 / KCAL_PER_KG
+        self._intercept = 0.0
+        self.metadata = {}
+
+        if not os.path.exists(self.path):
+            logger.warning("no weight model, using energy-balance projection", extra={"path": self.path})
+            return
+
+        try:
+            import joblib
+            artifact = joblib.load(self.path)
+            if tuple(artifact["features"]) != FEATURES:
+                raise ValueError("feature set does not match this version")
+            self._coef, self._intercept = fold_pipeline(artifact["estimator"])
+            self.metadata = {key: value for key, value in artifact.items() if key != "estimator"}
+            logger.info("loaded weight model", extra={"path": self.path, "samples": self.metadata.get("samples")})
+        except Exception:
+            logger.exception("failed to load weight model", extra={"path": self.path})
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def predict_changes(self, features: np.ndarray) -> np.ndarray:
+        """Weight change in kg for each row of a feature matrix"""
+        self._ensure_loaded()
+        return features @ self._coef + self._intercept
+
+    @traced("weight_forecast.project")
+    def project(self, start_weight: float, daily_intake: float, daily_burn: float,
+                tdee: float, horizons: Sequence[int] = HORIZONS) -> Dict:
+        changes = self.predict_changes(
+            feature_matrix(start_weight, daily_intake, daily_burn, tdee, horizons)
+        )
+        return {
+            "model": self.model_name,
+            "daily_intake": round(daily_intake, 1),
+            "daily_burn": round(daily_burn, 1),
+            "daily_balance": round(daily_intake - daily_burn - tdee, 1),
+            "projections": [
+                {
+                    "days": int(days),
+                    "weight": round(float(start_weight + change), 1),
+                    "change": round(float(change), 2)
+                }
+                for days, change in zip(horizons, changes)
+            ]
+        }
+
+def fold_pipeline(estimator) -> Tuple[np.ndarray, float]:
+    """Collapse a StandardScaler + linear model pipeline into raw-feature weights"""
+    scaler = estimator.named_steps["scaler"]
+    model = estimator.named_steps["model"]
+    coef = model.coef_ / scaler.scale_
+    intercept = float(model.intercept_ - (scaler.mean_ * coef).sum())
+    return coef, intercept
+
+async def log_weight(db, user_id: str, weight: float, when: Optional[datetime] = None):
+    """Append a weigh-in to the history the model is trained on"""
+    await db.weight_logs.insert_one({
+        "user_id": user_id,
+        "weight": weight,
+        "date": when or datetime.utcnow()
+    })
+
+async def recent_energy(db, user_id: str, today: Optional[datetime] = None) -> Tuple[float, float]:
+    """Average intake and burn over the last RECENT_DAYS days from daily_totals"""
+    end = day_start(today or datetime.utcnow())
+    start = end - timedelta(days=RECENT_DAYS - 1)
+    totals = await range_totals(db, user_id, start, end)
+    logged_days = await db.daily_totals.count_documents({
+        "user_id": user_id, "day": {"$gte": start, "$lte": end}, "calories_in": {"$gt": 0}
+    })
+    return energy_averages(totals["calories_in"], totals["calories_out"], logged_days, RECENT_DAYS)
+
+def training_samples(weight_logs: List[Dict], daily_totals: List[Dict], tdee: float) -> Tuple[List[np.ndarray], List[float]]:
+    """
+    Feature rows and weight changes for one user
+
+    Every pair of weight logs between MIN_WINDOW_DAYS and MAX_WINDOW_DAYS
+    apart is a sample, with intake and burn taken from the days in between.
+    """
+    if len(weight_logs) < 2 or not daily_totals:
+        return [], []
+
+    days = [doc["day"] for doc in daily_totals]
+    calories_in = np.cumsum([doc.get("calories_in") or 0 for doc in daily_totals])
+    calories_out = np.cumsum([doc.get("calories_out") or 0 for doc in daily_totals])
+    logged = np.cumsum([1 if doc.get("calories_in") else 0 for doc in daily_totals])
+
+    def prefix(values: np.ndarray, day: datetime) -> float:
+        position = bisect_right(days, day)
+        return float(values[position - 1]) if position else 0.0
+
+    rows, targets = [], []
+    logs = sorted(weight_logs, key=lambda log: log["date"])
+    for i, start in enumerate(logs):
+        start_day = day_start(start["date"])
+        for end in logs[i + 1:]:
+            end_day = day_start(end["date"])
+            span = (end_day - start_day).days
+            if span < MIN_WINDOW_DAYS:
+                continue
+            if span > MAX_WINDOW_DAYS:
+                break
+            # Days strictly after the start weigh-in up to and including the end one
+            window_logged = prefix(logged, end_day) - prefix(logged, start_day)
+            if not window_logged:
+                continue
+            intake, burn = energy_averages(
+                prefix(calories_in, end_day) - prefix(calories_in, start_day),
+                prefix(calories_out, end_day) - prefix(calories_out, start_day),
+                int(window_logged), span
+            )
+            rows.append(feature_matrix(start["weight"], intake, burn, tdee, [span])[0])
+            targets.append(end["weight"] - start["weight"])
+    return rows, targets
+
+# Loaded lazily on first use, once per worker process
+weight_forecaster = WeightForecaster()
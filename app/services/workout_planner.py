@@ -1,71 +1,109 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from datetime import date
+from functools import lru_cache
+import copy
+import hashlib
 import random
+from app.services.exercise_registry import EXERCISES_DB, exercise_registry
+from app.services.workout_scheduler import WorkoutScheduler, SESSION_CAPS
+from app.utils.tracing import traced
+
+def plan_seed(user_id: str, on_date: Optional[date] = None) -> int:
+    """Stable seed for a user's plan in a given ISO week"""
+    year, week, _ = (on_date or date.today()).isocalendar()
+    digest = hashlib.sha256(f"{user_id}:{year}-W{week:02d}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
 
 class WorkoutPlanner:
     def __init__(self):
-        self.exercises_db = {
-            "strength": {
-                "chest": [
-                    "Barbell Bench Press", "Incline Dumbbell Press", "Decline Bench Press",
-                    "Dumbbell Flyes", "Cable Crossovers", "Push-ups", "Dips",
-                    "Incline Bench Press", "Pec Deck Machine", "Landmine Press"
-                ],
-                "back": [
-                    "Deadlifts", "Pull-ups", "Bent Over Barbell Rows", "Lat Pulldowns",
-                    "Seated Cable Rows", "T-Bar Rows", "Single-Arm Dumbbell Rows",
-                    "Face Pulls", "Hyperextensions", "Inverted Rows"
-                ],
-                "legs": [
-                    "Barbell Squats", "Front Squats", "Romanian Deadlifts", "Leg Press",
-                    "Bulgarian Split Squats", "Walking Lunges", "Leg Curls", "Leg Extensions",
-                    "Calf Raises", "Goblet Squats", "Step-ups", "Hack Squats"
-                ],
-                "shoulders": [
-                    "Overhead Press", "Arnold Press", "Lateral Raises", "Front Raises",
-                    "Rear Delt Flyes", "Face Pulls", "Shrugs", "Upright Rows",
-                    "Cable Lateral Raises", "Dumbbell Shoulder Press"
-                ],
-                "arms": [
-                    "Barbell Curls", "Hammer Curls", "Preacher Curls", "Concentration Curls",
-                    "Tricep Dips", "Skull Crushers", "Overhead Tricep Extension",
-                    "Cable Tricep Pushdowns", "Close-Grip Bench Press", "Cable Curls"
-                ],
-                "core": [
-                    "Planks", "Side Planks", "Russian Twists", "Leg Raises",
-                    "Bicycle Crunches", "Mountain Climbers", "Dead Bug", "Pallof Press",
-                    "Ab Wheel Rollouts", "Hanging Knee Raises", "Cable Crunches"
-                ]
-            },
-            "cardio": [
-                "Running (Outdoor)", "Treadmill Running", "Cycling (Outdoor)", 
-                "Stationary Bike", "Swimming", "Rowing Machine", "Jump Rope",
-                "Elliptical Trainer", "Stair Climber", "Battle Ropes",
-                "Box Jumps", "Burpees", "High Knees", "Jumping Jacks",
-                "Mountain Climbers", "Sprint Intervals"
-            ],
-            "hiit": [
-                "Burpees", "Jump Squats", "Mountain Climbers", "High Knees",
-                "Box Jumps", "Jumping Lunges", "Battle Ropes", "Kettlebell Swings",
-                "Sprint Intervals", "Jumping Jacks", "Plank Jacks", "Tuck Jumps"
-            ],
-            "flexibility": [
-                "Yoga Flow", "Dynamic Stretching", "Static Stretching", 
-                "Foam Rolling", "Pilates", "Tai Chi", "Mobility Drills"
-            ]
-        }
+        self.exercises_db = EXERCISES_DB
+        self.registry = exercise_registry
+        self.scheduler = WorkoutScheduler()
+        # Seeded plans are deterministic, so built plans are kept as templates
+        self._cached_plan = lru_cache(maxsize=512)(self._build_plan)
+        self._cached_exercise_details = lru_cache(maxsize=512)(self._build_exercise_details)
+    
+    def generate_plan(self, goal: str, activity_level: str, days_per_week: int = 4, seed: Optional[int] = None) -> Dict:
+        """
+        Generate personalized workout plan based on user goals
+        
+        With a seed (see plan_seed) identical requests return identical plans,
+        served from the template cache. Without one every call is freshly randomized.
+        """
+        if seed is None:
+            return self._build_plan(goal, activity_level, days_per_week, None)
+        return copy.deepcopy(self._cached_plan(goal, activity_level, days_per_week, seed))
+    
+    @traced("workout_planner.generate_scheduled_plan")
+    def generate_scheduled_plan(self, goal: str, activity_level: str, days_per_week: int = 4,
+                                session_minutes: Optional[int] = None, seed: Optional[int] = None) -> Dict:
+        """
+        Generate a plan whose weekly schedule comes from the constraint scheduler
+        
+        Sessions respect muscle-group recovery windows, the goal's weekly volume
+        targets and a per-session duration cap (by activity level if not given).
+        """
+        plan = self.generate_plan(goal, activity_level, days_per_week, seed=seed)
+        session_minutes = session_minutes or SESSION_CAPS.get(activity_level, 50)
+        
+        schedule = self.scheduler.schedule(goal, days_per_week, session_minutes)
+        for day in schedule:
+            self._add_exercise_ids(day["exercises"])
+        
+        plan["weekly_schedule"] = schedule
+        plan["days_per_week"] = len(schedule)
+        plan["session_minutes"] = session_minutes
+        return plan
     
-    def generate_plan(self, goal: str, activity_level: str, days_per_week: int = 4) -> Dict:
-        """Generate personalized workout plan based on user goals"""
+    def apply_progression(self, plan: Dict, targets: Dict[str, Dict]) -> Dict:
+        """
+        Add next-session weight/rep targets from the user's history to a plan
+        
+        Args:
+            plan: Plan from generate_plan, generate_scheduled_plan or the LLM
+            targets: exercise_id -> next_target, from ProgressionEngine
+        """
+        if not targets:
+            return plan
+        for day in plan.get("weekly_schedule", []):
+            for exercise in day.get("exercises", []):
+                exercise_id = exercise.get("exercise_id")
+                if exercise_id is None:
+                    entry = self.registry.resolve(exercise.get("name"))
+                    exercise_id = entry["id"] if entry else None
+                target = targets.get(exercise_id)
+                if target:
+                    exercise["target_weight"] = target["weight"]
+                    exercise["target_reps"] = target["reps"]
+                    exercise["progression"] = target["action"]
+        return plan
+    
+    def _build_plan(self, goal: str, activity_level: str, days_per_week: int, seed: Optional[int]) -> Dict:
+        rng = random.Random(seed)
         if goal == "lose_weight":
-            return self._weight_loss_plan(days_per_week)
+            plan = self._weight_loss_plan(days_per_week, rng)
         elif goal == "gain_muscle":
-            return self._muscle_gain_plan(days_per_week)
+            plan = self._muscle_gain_plan(days_per_week)
         elif goal == "improve_endurance":
-            return self._endurance_plan(days_per_week)
+            plan = self._endurance_plan(days_per_week)
         else:
-            return self._maintenance_plan(days_per_week)
+            plan = self._maintenance_plan(days_per_week, rng)
+        
+        for day in plan["weekly_schedule"]:
+            self._add_exercise_ids(day["exercises"])
+        return plan
     
-    def _weight_loss_plan(self, days: int) -> Dict:
+    def resolve_exercise(self, name: str) -> Optional[Dict]:
+        """Resolve an exercise name to its shared registry entry"""
+        return self.registry.resolve(name)
+    
+    def _add_exercise_ids(self, exercises: List[Dict]) -> List[Dict]:
+        for exercise in exercises:
+            entry = self.registry.resolve(exercise["name"])
+            exercise["exercise_id"] = entry["id"] if entry else None
+        return exercises
+    
+    def _weight_loss_plan(self, days: int, rng: random.Random) -> Dict:
         schedule = [
             {
                 "day": 1, 
@@ -86,7 +124,7 @@ class WorkoutPlanner:
                 "focus": "Cardio Intervals", 
                 "type": "cardio",
                 "duration": 35,
-                "exercises": self._get_cardio_workout()
+                "exercises": self._get_cardio_workout(rng)
             },
             {
                 "day": 4, 
@@ -249,7 +287,7 @@ class WorkoutPlanner:
             ]
         }
     
-    def _maintenance_plan(self, days: int) -> Dict:
+    def _maintenance_plan(self, days: int, rng: random.Random) -> Dict:
         schedule = [
             {
                 "day": 1, 
@@ -263,7 +301,7 @@ class WorkoutPlanner:
                 "focus": "Cardio Session", 
                 "type": "cardio",
                 "duration": 30,
-                "exercises": self._get_cardio_workout()
+                "exercises": self._get_cardio_workout(rng)
             },
             {
                 "day": 3, 
@@ -389,14 +427,14 @@ class WorkoutPlanner:
             {"name": "Battle Ropes", "sets": 4, "reps": "30 sec work, 30 sec rest"}
         ]
     
-    def _get_cardio_workout(self) -> List[Dict]:
+    def _get_cardio_workout(self, rng: random.Random) -> List[Dict]:
         options = [
             {"name": "Treadmill Running", "duration": 30, "intensity": "moderate", "notes": "Maintain 70-75% max heart rate"},
             {"name": "Cycling (Outdoor)", "duration": 35, "intensity": "moderate", "notes": "Steady pace"},
             {"name": "Rowing Machine", "duration": 25, "intensity": "moderate", "notes": "Focus on form"},
             {"name": "Swimming", "duration": 30, "intensity": "moderate", "notes": "Mix different strokes"}
         ]
-        return [random.choice(options)]
+        return [rng.choice(options)]
     
     def _get_flexibility_workout(self) -> List[Dict]:
         return [
@@ -414,35 +452,41 @@ class WorkoutPlanner:
             {"name": "Mountain Climbers", "sets": 3, "reps": "30 sec", "rest": 30}
         ]
     
-    def get_exercise_details(self, workout_type: str, muscle_group: str = None) -> List[Dict]:
+    def get_exercise_details(self, workout_type: str, muscle_group: str = None, seed: Optional[int] = None) -> List[Dict]:
         """Get specific exercise details for a given workout type and muscle group"""
+        if seed is None:
+            return self._build_exercise_details(workout_type, muscle_group, None)
+        return copy.deepcopy(self._cached_exercise_details(workout_type, muscle_group, seed))
+    
+    def _build_exercise_details(self, workout_type: str, muscle_group: Optional[str], seed: Optional[int]) -> List[Dict]:
+        rng = random.Random(seed)
         exercises = []
         
         if workout_type == "strength" and muscle_group:
             exercise_names = self.exercises_db["strength"].get(muscle_group, [])
-            selected = random.sample(exercise_names, min(5, len(exercise_names)))
+            selected = rng.sample(exercise_names, min(5, len(exercise_names)))
             
             for name in selected:
                 exercises.append({
                     "name": name,
-                    "sets": random.randint(3, 4),
-                    "reps": f"{random.randint(8, 12)}-{random.randint(12, 15)}",
-                    "rest": random.choice([60, 90, 120]),
+                    "sets": rng.randint(3, 4),
+                    "reps": f"{rng.randint(8, 12)}-{rng.randint(12, 15)}",
+                    "rest": rng.choice([60, 90, 120]),
                     "notes": "Focus on proper form and controlled movements"
                 })
         
         elif workout_type == "cardio":
-            exercise_names = random.sample(self.exercises_db["cardio"], min(3, len(self.exercises_db["cardio"])))
+            exercise_names = rng.sample(self.exercises_db["cardio"], min(3, len(self.exercises_db["cardio"])))
             for name in exercise_names:
                 exercises.append({
                     "name": name,
-                    "duration": random.randint(15, 30),
-                    "intensity": random.choice(["low", "moderate", "high"]),
+                    "duration": rng.randint(15, 30),
+                    "intensity": rng.choice(["low", "moderate", "high"]),
                     "notes": "Maintain steady pace"
                 })
         
         elif workout_type == "hiit":
-            exercise_names = random.sample(self.exercises_db["hiit"], min(6, len(self.exercises_db["hiit"])))
+            exercise_names = rng.sample(self.exercises_db["hiit"], min(6, len(self.exercises_db["hiit"])))
             for name in exercise_names:
                 exercises.append({
                     "name": name,
@@ -451,5 +495,5 @@ class WorkoutPlanner:
                     "notes": "Maximum effort during work periods"
                 })
         
-        return exercises
+        return self._add_exercise_ids(exercises)
 
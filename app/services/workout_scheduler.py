@@ -0,0 +1,247 @@
+from typing import Dict, List, Tuple
+from functools import lru_cache
+import copy
+from app.services.exercise_registry import EXERCISES_DB
+
+# Minimum days between two sessions that load the same muscle group
+RECOVERY_DAYS = {
+    "chest": 2,
+    "back": 2,
+    "legs": 3,
+    "shoulders": 2,
+    "arms": 2,
+    "core": 1,
+    "conditioning": 2
+}
+
+# Candidate sessions: focus, type and the muscle groups they train
+SESSION_TEMPLATES = [
+    {"focus": "Chest & Triceps", "type": "strength", "groups": ["chest", "arms"]},
+    {"focus": "Back & Biceps", "type": "strength", "groups": ["back", "arms"]},
+    {"focus": "Legs & Glutes", "type": "strength", "groups": ["legs"]},
+    {"focus": "Shoulders & Core", "type": "strength", "groups": ["shoulders", "core"]},
+    {"focus": "Upper Body Strength", "type": "strength", "groups": ["chest", "back", "shoulders", "arms"]},
+    {"focus": "Lower Body + Core", "type": "strength", "groups": ["legs", "core"]},
+    {"focus": "Full Body Strength", "type": "strength", "groups": ["chest", "back", "legs", "shoulders", "core"]},
+    {"focus": "Full Body HIIT", "type": "hiit", "groups": ["conditioning", "legs"]},
+    {"focus": "Cardio Session", "type": "cardio", "groups": []},
+    {"focus": "Active Recovery & Flexibility", "type": "flexibility", "groups": []}
+]
+
+# Weekly working sets per muscle group and cardio minutes by goal
+VOLUME_TARGETS = {
+    "gain_muscle": {
+        "sets": {"chest": 12, "back": 12, "legs": 12, "shoulders": 10, "arms": 10, "core": 6},
+        "cardio_minutes": 40,
+        "conditioning_sessions": 0
+    },
+    "lose_weight": {
+        "sets": {"chest": 6, "back": 6, "legs": 8, "shoulders": 4, "arms": 4, "core": 6},
+        "cardio_minutes": 120,
+        "conditioning_sessions": 2
+    },
+    "improve_endurance": {
+        "sets": {"chest": 4, "back": 4, "legs": 6, "shoulders": 3, "arms": 3, "core": 6},
+        "cardio_minutes": 150,
+        "conditioning_sessions": 1
+    },
+    "maintain": {
+        "sets": {"chest": 8, "back": 8, "legs": 8, "shoulders": 6, "arms": 6, "core": 6},
+        "cardio_minutes": 60,
+        "conditioning_sessions": 1
+    }
+}
+
+# Set and rep scheme by goal: sets per exercise, reps, rest seconds
+SET_SCHEMES = {
+    "gain_muscle": (4, "8-12", 90),
+    "lose_weight": (3, "12-15", 45),
+    "improve_endurance": (3, "15-20", 30),
+    "maintain": (3, "10-12", 60)
+}
+
+# Default session length cap by activity level (minutes)
+SESSION_CAPS = {
+    "sedentary": 30,
+    "light": 40,
+    "moderate": 50,
+    "active": 60,
+    "very_active": 75
+}
+
+# Which weekdays (0 = Monday) to train for a given number of sessions
+TRAINING_DAYS = {
+    1: [0],
+    2: [0, 3],
+    3: [0, 2, 4],
+    4: [0, 1, 3, 4],
+    5: [0, 1, 2, 4, 5],
+    6: [0, 1, 2, 3, 4, 5],
+    7: [0, 1, 2, 3, 4, 5, 6]
+}
+
+SET_WORK_SECONDS = 45
+BEAM_WIDTH = 8
+
+class WorkoutScheduler:
+    """
+    Assigns sessions to training days with a bounded beam search.
+
+    Hard constraints (muscle-group recovery windows) prune candidates for each
+    day before scoring; the beam keeps the best partial weeks ranked by how
+    close they get to the goal's weekly volume targets.
+    """
+
+    def schedule(self, goal: str, days_per_week: int, session_minutes: int) -> List[Dict]:
+        goal = goal if goal in VOLUME_TARGETS else "maintain"
+        days_per_week = max(1, min(days_per_week, 7))
+        return copy.deepcopy(list(self._schedule(goal, days_per_week, session_minutes)))
+
+    @lru_cache(maxsize=256)
+    def _schedule(self, goal: str, days_per_week: int, session_minutes: int) -> Tuple:
+        sessions = self._sessions(goal, session_minutes)
+        targets = VOLUME_TARGETS[goal]
+
+        # Beam state: (score, chosen session indices, last day each group was trained)
+        beam = [(0.0, (), {})]
+        for weekday in TRAINING_DAYS[days_per_week]:
+            candidates = []
+            for _, chosen, last_trained in beam:
+                for index, session in enumerate(sessions):
+                    if not self._recovered(session, weekday, last_trained):
+                        continue
+                    new_chosen = chosen + (index,)
+                    new_last = dict(last_trained)
+                    for group in session["groups"]:
+                        new_last[group] = weekday
+                    score = self._score(new_chosen, sessions, targets)
+                    candidates.append((score, new_chosen, new_last))
+
+            candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            beam = candidates[:BEAM_WIDTH]
+
+        _, best, _ = beam[0]
+        return tuple(
+            self._render(weekday, sessions[index], best[:position].count(index))
+            for position, (weekday, index) in enumerate(zip(TRAINING_DAYS[days_per_week], best))
+        )
+
+    def _recovered(self, session: Dict, weekday: int, last_trained: Dict) -> bool:
+        return all(
+            weekday - last_trained[group] >= RECOVERY_DAYS[group]
+            for group in session["groups"]
+            if group in last_trained
+        )
+
+    def _score(self, chosen: Tuple, sessions: List[Dict], targets: Dict) -> float:
+        sets = {}
+        cardio_minutes = 0
+        conditioning = 0
+        for index in chosen:
+            session = sessions[index]
+            for group, count in session["sets"].items():
+                sets[group] = sets.get(group, 0) + count
+            cardio_minutes += session["cardio_minutes"]
+            conditioning += "conditioning" in session["groups"]
+
+        score = 0.0
+        for group, target in targets["sets"].items():
+            done = sets.get(group, 0)
+            # Reward coverage up to the target, lightly penalize junk volume above it
+            score += min(done, target) / target - 0.25 * max(done - target, 0) / target
+
+        if targets["cardio_minutes"]:
+            score += min(cardio_minutes, targets["cardio_minutes"]) / targets["cardio_minutes"]
+        if targets["conditioning_sessions"]:
+            score += min(conditioning, targets["conditioning_sessions"]) / targets["conditioning_sessions"]
+        else:
+            score -= 0.5 * conditioning
+
+        # Prefer variety over repeating the same session
+        score -= 0.3 * (len(chosen) - len(set(chosen)))
+        return score
+
+    @lru_cache(maxsize=64)
+    def _sessions(self, goal: str, session_minutes: int) -> List[Dict]:
+        """Candidate sessions with per-group set volume sized to the duration cap"""
+        sets_per_exercise, _, rest = SET_SCHEMES[goal]
+        minutes_per_exercise = sets_per_exercise * (SET_WORK_SECONDS + rest) / 60
+        max_exercises = max(int(session_minutes // minutes_per_exercise), 1)
+
+        sessions = []
+        for template in SESSION_TEMPLATES:
+            session = {**template, "sets": {}, "cardio_minutes": 0, "scheme": SET_SCHEMES[goal]}
+            strength_groups = [group for group in template["groups"] if group in EXERCISES_DB["strength"]]
+
+            if template["type"] == "strength":
+                # One exercise per group in turn until the duration cap is reached
+                count = min(max_exercises, max(2 * len(strength_groups), 4))
+                for position in range(count):
+                    group = strength_groups[position % len(strength_groups)]
+                    session["sets"][group] = session["sets"].get(group, 0) + sets_per_exercise
+                session["exercise_count"] = count
+                session["duration"] = round(count * minutes_per_exercise)
+            elif template["type"] == "hiit":
+                session["sets"] = {"legs": 4, "core": 4}
+                session["cardio_minutes"] = min(session_minutes, 30)
+                session["duration"] = session["cardio_minutes"]
+            elif template["type"] == "cardio":
+                session["cardio_minutes"] = session_minutes
+                session["duration"] = session_minutes
+            else:
+                session["duration"] = min(session_minutes, 30)
+            sessions.append(session)
+        return sessions
+
+    def _render(self, weekday: int, session: Dict, variant: int) -> Dict:
+        """Turn a scheduled session into a plan day with concrete exercises"""
+        return {
+            "day": weekday + 1,
+            "focus": session["focus"],
+            "type": session["type"],
+            "duration": session["duration"],
+            "muscle_groups": [group for group in session["groups"] if group != "conditioning"],
+            "exercises": self._exercises(session, variant)
+        }
+
+    def _exercises(self, session: Dict, variant: int) -> List[Dict]:
+        sets, reps, rest = session["scheme"]
+
+        if session["type"] == "strength":
+            groups = [group for group in session["groups"] if group in EXERCISES_DB["strength"]]
+            exercises, used = [], set()
+            for position in range(session["exercise_count"]):
+                group = groups[position % len(groups)]
+                options = EXERCISES_DB["strength"][group]
+                offset = position // len(groups) + 2 * variant
+                # Skip exercises already picked for another group (e.g. Face Pulls)
+                name = next(
+                    options[(offset + step) % len(options)]
+                    for step in range(len(options))
+                    if options[(offset + step) % len(options)] not in used
+                )
+                used.add(name)
+                exercises.append({"name": name, "sets": sets, "reps": reps, "rest": rest})
+            return exercises
+
+        if session["type"] == "hiit":
+            options = EXERCISES_DB["hiit"]
+            return [
+                {"name": options[(6 * variant + step) % len(options)], "sets": 4, "reps": "30 sec work, 30 sec rest"}
+                for step in range(6)
+            ]
+
+        if session["type"] == "cardio":
+            options = ["Treadmill Running", "Cycling (Outdoor)", "Rowing Machine", "Swimming"]
+            return [{
+                "name": options[variant % len(options)],
+                "duration": session["duration"],
+                "intensity": "moderate",
+                "notes": "Maintain 70-75% max heart rate"
+            }]
+
+        return [
+            {"name": "Dynamic Stretching", "duration": 10, "notes": "Leg swings, arm circles, hip rotations"},
+            {"name": "Yoga Flow", "duration": max(session["duration"] - 15, 5), "notes": "Focus on breath and form"},
+            {"name": "Static Stretching", "duration": 5, "notes": "Hold each stretch 30 seconds"}
+        ]
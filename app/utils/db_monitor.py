@@ -0,0 +1,210 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.tracing import start_span
+
+logger = get_logger(__name__)
+
+# Commands whose body is worth keeping for the slow-query log
+FILTERED_COMMANDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "delete": "deletes",
+    "update": "updates",
+    "findAndModify": "query",
+    "aggregate": "pipeline"
+}
+
+class QueryStats:
+    """Commands issued on behalf of one request"""
+
+    __slots__ = ("count", "duration_micros", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.duration_micros = 0
+        self._lock = threading.Lock()
+
+    def add(self, duration_micros: int):
+        # Motor runs commands on executor threads, possibly several at once
+        with self._lock:
+            self.count += 1
+            self.duration_micros += duration_micros
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_micros / 1000
+
+# Set per request by QueryStatsMiddleware; Motor copies the context into its
+# executor threads, so the listener sees the request that issued a command
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def query_shape(value: Any) -> Any:
+    """A filter or pipeline with its values replaced, keeping keys and operators"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(item) for item in value]
+        # $in lists and the like collapse to one element
+        if shapes and all(shape == "?" for shape in shapes):
+            return ["?"]
+        return shapes
+    return "?"
+
+class CommandStatsListener(monitoring.CommandListener):
+    """
+    Attributes every MongoDB command to the current request and logs slow ones
+
+    Command bodies are only kept between started and finished events for the
+    commands in FILTERED_COMMANDS, so the slow log can show their shape.
+    Commands issued inside a traced request also become CLIENT spans.
+    """
+
+    def __init__(self, slow_ms: float):
+        self.slow_micros = slow_ms * 1000
+        self._pending: Dict[tuple, Dict] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        field = FILTERED_COMMANDS.get(event.command_name)
+        command_span = start_span(f"mongodb.{event.command_name}", "CLIENT", **{"db.system": "mongodb"})
+        if field is None and command_span is None:
+            return
+
+        collection = event.command.get(event.command_name)
+        if command_span is not None and isinstance(collection, str):
+            command_span.set(**{"db.collection": collection})
+        self._pending[(event.connection_id, event.request_id)] = {
+            "collection": collection,
+            "shape": event.command.get(field) if field else None,
+            "span": command_span
+        }
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending and pending["span"] is not None:
+            pending["span"].error = failed
+            pending["span"].end()
+        stats = query_stats_var.get()
+        if stats is not None:
+            stats.add(event.duration_micros)
+
+        if event.duration_micros >= self.slow_micros:
+            logger.warning("slow MongoDB command", extra={
+                "command": event.command_name,
+                "collection": pending["collection"] if pending else None,
+                "shape": query_shape(pending["shape"]) if pending and pending["shape"] else None,
+                "duration_ms": round(event.duration_micros / 1000, 1),
+                "failed": failed
+            })
+
+command_listener = CommandStatsListener(settings.SLOW_QUERY_MS)
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["address"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+POOL_CHECKOUT_FAILURES = Counter(
+    "mongodb_pool_checkout_failures_total",
+    "Connection checkouts that failed, by reason (timeout means the pool was exhausted)",
+    ["address", "reason"]
+)
+POOL_CONNECTIONS = Gauge(
+    "mongodb_pool_connections",
+    "Open pooled connections",
+    ["address"],
+    multiprocess_mode="livesum"
+)
+POOL_IN_USE = Gauge(
+    "mongodb_pool_connections_in_use",
+    "Connections currently checked out",
+    ["address"],
+    multiprocess_mode="livesum"
+)
+POOL_WAITING = Gauge(
+    "mongodb_pool_checkouts_waiting",
+    "Checkouts currently waiting for a connection",
+    ["address"],
+    multiprocess_mode="livesum"
+)
+
+def pool_address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Connection-pool saturation in Prometheus
+
+    Checkout start and finish events for one operation fire on the same
+    thread (Motor's executor runs each operation synchronously), so the wait
+    is timed with a thread-local start.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _checkout_finished(self, event) -> float:
+        address = pool_address(event)
+        POOL_WAITING.labels(address).dec()
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        POOL_WAITING.labels(pool_address(event)).inc()
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait = self._checkout_finished(event)
+        address = pool_address(event)
+        POOL_CHECKOUT_WAIT.labels(address).observe(wait)
+        POOL_IN_USE.labels(address).inc()
+
+    def connection_check_out_failed(self, event):
+        wait = self._checkout_finished(event)
+        POOL_CHECKOUT_FAILURES.labels(pool_address(event), event.reason).inc()
+        logger.warning("MongoDB connection checkout failed", extra={
+            "address": pool_address(event),
+            "reason": event.reason,
+            "waited_ms": round(wait * 1000, 1)
+        })
+
+    def connection_checked_in(self, event):
+        POOL_IN_USE.labels(pool_address(event)).dec()
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS.labels(pool_address(event)).inc()
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS.labels(pool_address(event)).dec()
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        logger.warning("MongoDB connection pool cleared", extra={"address": pool_address(event)})
+
+    def pool_closed(self, event):
+        pass
+
+pool_listener = PoolStatsListener()
@@ -1,7 +1,9 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from app.utils.security import decode_access_token
 from app.database import get_database
+from app.services.data_versions import compute_etag, etag_matches, today_key
+from app.utils.logger import user_id_var
 from bson import ObjectId
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -28,4 +30,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         raise credentials_exception
     
     user["id"] = str(user["_id"])
+    user_id_var.set(user["id"])
     return user
+
+def conditional_get(*collections: str, daily: bool = False):
+    """
+    Dependency answering If-None-Match from the user's data versions
+
+    Raises a 304 before the handler runs, so an unchanged resource costs no
+    query or serialization. Otherwise returns the ETag for the handler to
+    send. daily=True also varies the tag by date, for "today" views.
+    """
+    async def dependency(request: Request, current_user: dict = Depends(get_current_user)) -> str:
+        etag = compute_etag(
+            current_user, collections,
+            f"{request.url.path}?{request.url.query}",
+            today_key() if daily else None
+        )
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return etag
+    return dependency
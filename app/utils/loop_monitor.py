@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+from prometheus_client import Histogram
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the loop monitor was due to wake and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+# Frames kept from the blocked stack, innermost last
+STACK_LIMIT = 25
+
+class LoopLagMonitor:
+    """
+    Measures event-loop scheduling lag and reports what is blocking it.
+
+    A task on the loop sleeps for a fixed interval and records how late it
+    wakes. A watchdog thread watches the task's heartbeat; when the loop has
+    been stuck past the threshold it captures the loop thread's current
+    stack, which is the blocking call itself (bcrypt, a sync LLM client...).
+    Stack reports are limited to one per stall and one per stack_interval.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, stack_interval: float = 60.0):
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_interval = stack_interval
+        self._heartbeat = time.monotonic()
+        self._last_report = float("-inf")
+        self._reported = False
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - self.interval))
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled < self.threshold:
+                self._reported = False
+                continue
+            now = time.monotonic()
+            if self._reported or now - self._last_report < self.stack_interval:
+                continue
+
+            self._reported = True
+            self._last_report = now
+            frame = sys._current_frames().get(self._loop_thread_id)
+            logger.warning("event loop blocked", extra={
+                "blocked_ms": round(stalled * 1000),
+                "stack": "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame else None
+            })
+
+loop_monitor = LoopLagMonitor(
+    threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000,
+    stack_interval=settings.LOOP_LAG_STACK_INTERVAL_S
+)
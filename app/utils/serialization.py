@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+import orjson
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _default(value: Any):
+    """Types orjson does not encode natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    # datetime subclasses such as pandas.Timestamp
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+
+    ObjectId and datetime values are encoded directly, so documents straight
+    from Motor can be returned without per-field conversion. Returning this
+    response from a handler also skips FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def serialize_doc(doc: Optional[Dict]) -> Optional[Dict]:
+    """Expose a MongoDB document's _id as a string id (in place)"""
+    if doc is not None and "_id" in doc:
+        doc["id"] = str(doc.pop("_id"))
+    return doc
+
+def serialize_docs(docs: Iterable[Dict]) -> List[Dict]:
+    return [serialize_doc(doc) for doc in docs]
@@ -0,0 +1,232 @@
+import functools
+import inspect
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.middleware.metrics import UNMATCHED_ROUTE
+from app.utils.logger import get_logger, request_id_var
+from app.utils.serialization import dumps
+
+logger = get_logger(__name__)
+
+SERVICE_NAME = "fitness-tracker-api"
+# Finished traces kept in memory for /traces/slowest
+RECENT_TRACES = 1000
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: str = "INTERNAL", **attributes):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes
+        self.error = False
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, end_ns: Optional[int] = None):
+        self.end_ns = end_ns or time.time_ns()
+        # list.append is atomic, so spans may finish on Motor's executor threads
+        self.trace.spans.append(self)
+
+class Trace:
+    __slots__ = ("trace_id", "spans", "root")
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+
+current_span_var: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def start_span(name: str, kind: str = "INTERNAL", **attributes) -> Optional[Span]:
+    """Child of the current span, or None outside a traced request"""
+    parent = current_span_var.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind, **attributes)
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child span of the current request's trace"""
+    child = start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = current_span_var.set(child)
+    try:
+        yield child
+    except BaseException:
+        child.error = True
+        raise
+    finally:
+        current_span_var.reset(token)
+        child.end()
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span() for sync and async functions"""
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def to_otlp(trace: Trace) -> Dict:
+    """One trace in the OTLP/JSON shape the OpenTelemetry file exporter writes"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": "app.tracing"},
+            "spans": [
+                {
+                    "traceId": trace.trace_id,
+                    "spanId": item.span_id,
+                    "parentSpanId": item.parent_id or "",
+                    "name": item.name,
+                    "kind": f"SPAN_KIND_{item.kind}",
+                    "startTimeUnixNano": str(item.start_ns),
+                    "endTimeUnixNano": str(item.end_ns),
+                    "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in item.attributes.items()],
+                    "status": {"code": "STATUS_CODE_ERROR" if item.error else "STATUS_CODE_UNSET"}
+                }
+                for item in trace.spans
+            ]
+        }]
+    }]}
+
+def summarize(trace: Trace) -> Dict:
+    root = trace.root
+    by_name: Dict[str, float] = {}
+    for item in trace.spans:
+        if item is not root:
+            by_name[item.name] = by_name.get(item.name, 0.0) + item.duration_ms
+    return {
+        "trace_id": trace.trace_id,
+        "name": root.name,
+        "start": root.start_ns // 1_000_000,
+        "duration_ms": round(root.duration_ms, 2),
+        "attributes": root.attributes,
+        "time_by_span": {name: round(total, 2) for name, total in sorted(by_name.items(), key=lambda kv: -kv[1])},
+        "spans": [
+            {"name": item.name, "parent_id": item.parent_id, "span_id": item.span_id,
+             "offset_ms": round((item.start_ns - root.start_ns) / 1e6, 2),
+             "duration_ms": round(item.duration_ms, 2), "error": item.error, **item.attributes}
+            for item in sorted(trace.spans, key=lambda s: s.start_ns)
+        ]
+    }
+
+class TraceExporter:
+    """Appends finished traces to a JSON-lines file from a background thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.SimpleQueue[Optional[Trace]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.recent: Deque[Trace] = deque(maxlen=RECENT_TRACES)
+
+    def export(self, trace: Trace):
+        self.recent.append(trace)
+        if self._thread is None:
+            with self._start_lock:
+                # Re-checked under the lock so concurrent exporters start one writer
+                if self._thread is None:
+                    thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    thread.start()
+                    self._thread = thread
+        self._queue.put(trace)
+
+    def _run(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            try:
+                with open(self.path, "ab") as handle:
+                    handle.write(dumps(to_otlp(trace)) + b"\n")
+            except OSError:
+                logger.exception("failed to export trace", extra={"path": self.path})
+
+    def slowest(self, limit: int = 20) -> List[Dict]:
+        traces = sorted(list(self.recent), key=lambda trace: trace.root.duration_ms, reverse=True)
+        return [summarize(trace) for trace in traces[:limit]]
+
+exporter = TraceExporter(settings.TRACE_EXPORT_PATH)
+
+class TracingMiddleware:
+    """
+    Opens a root span per request and exports the finished trace
+
+    Spans are always recorded (a few microseconds each); a trace is kept
+    when it is sampled at TRACE_SAMPLE_RATE or slower than TRACE_SLOW_MS, so
+    slow requests are never missed.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        root = trace.root = Span(trace, scope["method"], None, "SERVER", **{"http.method": scope["method"]})
+        token = current_span_var.set(root)
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_span_var.reset(token)
+            route = getattr(scope.get("route"), "path_format", None) or UNMATCHED_ROUTE
+            root.name = f"{scope['method']} {route}"
+            root.set(**{"http.route": route, "http.status_code": status_code, "request_id": request_id_var.get() or ""})
+            root.error = status_code >= 500
+            root.end()
+            if root.duration_ms >= settings.TRACE_SLOW_MS or random.random() < settings.TRACE_SAMPLE_RATE:
+                exporter.export(trace)
@@ -0,0 +1,6 @@
+"""
+In-process HTTP benchmarks over a synthetic dataset.
+
+    python -m benchmarks.run --help
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json
+"""
@@ -0,0 +1,49 @@
+"""
+Compare two benchmark reports endpoint by endpoint.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+def load(path: str) -> Dict[Tuple[str, int], Dict]:
+    with open(path) as handle:
+        report = json.load(handle)
+    return {(result["endpoint"], result["concurrency"]): result for result in report["results"]}
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10,
+                        help="Percent p95 increase reported as a regression")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    regressions = 0
+    print(f"{'endpoint':<28} {'c':>4} {'p50 ms':>17} {'p95 ms':>17} {'rps':>17}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        p95_change = change(before["latency_ms"]["p95"], after["latency_ms"]["p95"])
+        regressed = p95_change > args.threshold
+        regressions += regressed
+        print(
+            f"{key[0]:<28} {key[1]:>4} "
+            f"{after['latency_ms']['p50']:>8.2f} ({change(before['latency_ms']['p50'], after['latency_ms']['p50']):+5.0f}%) "
+            f"{after['latency_ms']['p95']:>8.2f} ({p95_change:+5.0f}%) "
+            f"{after['throughput_rps']:>8.1f} ({change(before['throughput_rps'], after['throughput_rps']):+5.0f}%)"
+            + ("  <- regression" if regressed else "")
+        )
+
+    if regressions:
+        print(f"⚠️  {regressions} p95 regressions above {args.threshold:.0f}%")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
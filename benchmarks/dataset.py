@@ -0,0 +1,221 @@
+"""
+Synthetic, seed-reproducible fitness data written straight to the database.
+
+Documents have the same shape the routers write, and the derived collections
+(daily_totals, personal_records, streaks) are rebuilt afterwards with the
+same services the maintenance scripts use.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+from bson import ObjectId
+from app.routers.workouts import add_exercise_ids, estimate_calories
+from app.services.daily_totals import day_start, rebuild_daily_totals
+from app.services.exercise_registry import EXERCISES_DB
+from app.services.nutrition_targets import compute_nutrition_targets
+from app.services.personal_records import recompute_personal_records
+from app.services.streaks import repair_streak
+from app.services.auth_service import create_user_token
+from app.utils.security import get_password_hash
+
+PASSWORD = "benchmark-password"
+# Collections seed_dataset writes, directly or through the rebuild services
+COLLECTIONS = (
+    "users", "meals", "workouts", "water", "social_posts", "weight_logs",
+    "daily_totals", "daily_totals_locks", "personal_records"
+)
+BATCH_SIZE = 1000
+
+FOODS = [
+    {"name": "Chicken Breast", "unit": "g", "calories": 165, "protein": 31, "carbs": 0, "fats": 3.6},
+    {"name": "Brown Rice", "unit": "g", "calories": 123, "protein": 2.6, "carbs": 25.6, "fats": 1.0},
+    {"name": "Broccoli", "unit": "g", "calories": 34, "protein": 2.8, "carbs": 7, "fats": 0.4},
+    {"name": "Salmon", "unit": "g", "calories": 208, "protein": 20, "carbs": 0, "fats": 13},
+    {"name": "Eggs", "unit": "g", "calories": 155, "protein": 13, "carbs": 1.1, "fats": 11},
+    {"name": "Oatmeal", "unit": "g", "calories": 389, "protein": 16.9, "carbs": 66.3, "fats": 6.9},
+    {"name": "Banana", "unit": "g", "calories": 89, "protein": 1.1, "carbs": 23, "fats": 0.3},
+    {"name": "Greek Yogurt", "unit": "g", "calories": 59, "protein": 10, "carbs": 3.6, "fats": 0.4},
+    {"name": "Avocado", "unit": "g", "calories": 160, "protein": 2, "carbs": 8.5, "fats": 14.7},
+    {"name": "Lentils", "unit": "g", "calories": 116, "protein": 9, "carbs": 20, "fats": 0.4}
+]
+STRENGTH_EXERCISES = [name for names in EXERCISES_DB["strength"].values() for name in names]
+CARDIO_EXERCISES = ["Running (Outdoor)", "Cycling (Outdoor)", "Rowing Machine", "Jump Rope"]
+MEAL_HOURS = {"breakfast": 8, "lunch": 13, "dinner": 19, "snack": 16}
+
+def new_id(rng: random.Random) -> ObjectId:
+    """ObjectIds from the seeded generator, so reruns produce identical ids"""
+    return ObjectId(rng.randbytes(12))
+
+def make_user(rng: random.Random, index: int, password_hash: str, now: datetime) -> Dict:
+    user = {
+        "_id": new_id(rng),
+        "name": f"Benchmark User {index}",
+        "email": f"bench{index}@example.com",
+        "password": password_hash,
+        "age": rng.randint(18, 65),
+        "gender": rng.choice(["male", "female"]),
+        "height": round(rng.uniform(155, 195), 1),
+        "weight": round(rng.uniform(55, 110), 1),
+        "activity_level": rng.choice(["sedentary", "light", "moderate", "active", "very_active"]),
+        "goal": rng.choice(["lose_weight", "maintain", "gain_muscle"]),
+        "followers": [],
+        "following": [],
+        "created_at": now
+    }
+    user["nutrition_targets"] = compute_nutrition_targets(user)
+    return user
+
+def make_meal(rng: random.Random, user_id: str, day: datetime, meal_type: str) -> Dict:
+    foods = []
+    for food in rng.sample(FOODS, rng.randint(1, 4)):
+        quantity = rng.choice([50, 100, 150, 200])
+        scale = quantity / 100
+        foods.append({
+            "name": food["name"],
+            "quantity": quantity,
+            "unit": food["unit"],
+            "calories": round(food["calories"] * scale),
+            "protein": round(food["protein"] * scale, 1),
+            "carbs": round(food["carbs"] * scale, 1),
+            "fats": round(food["fats"] * scale, 1)
+        })
+    date = day + timedelta(hours=MEAL_HOURS[meal_type], minutes=rng.randint(0, 59))
+    return {
+        "_id": new_id(rng),
+        "user_id": user_id,
+        "type": meal_type,
+        "foods": foods,
+        "notes": None,
+        "date": date,
+        "created_at": date,
+        "total_calories": sum(food["calories"] for food in foods),
+        "total_protein": sum(food["protein"] for food in foods),
+        "total_carbs": sum(food["carbs"] for food in foods),
+        "total_fats": sum(food["fats"] for food in foods)
+    }
+
+def make_workout(rng: random.Random, user: Dict, day: datetime) -> Dict:
+    if rng.random() < 0.7:
+        workout_type = "strength"
+        exercises = [
+            {"name": name, "sets": rng.randint(3, 5), "reps": rng.randint(5, 12),
+             "weight": float(rng.randrange(20, 140, 5)), "duration": None}
+            for name in rng.sample(STRENGTH_EXERCISES, rng.randint(3, 6))
+        ]
+    else:
+        workout_type = "cardio"
+        exercises = [{"name": rng.choice(CARDIO_EXERCISES), "sets": 1, "reps": 1,
+                      "weight": None, "duration": rng.randint(15, 60)}]
+    date = day + timedelta(hours=rng.randint(6, 20))
+    workout = {
+        "_id": new_id(rng),
+        "user_id": str(user["_id"]),
+        "title": f"{workout_type.title()} session",
+        "type": workout_type,
+        "exercises": add_exercise_ids(exercises),
+        "duration": rng.randint(30, 90),
+        "notes": None,
+        "date": date,
+        "created_at": date
+    }
+    workout["calories_burned"] = estimate_calories(workout, user)
+    workout["calories_estimated"] = True
+    return workout
+
+def make_water(rng: random.Random, user_id: str, day: datetime) -> Dict:
+    time = day + timedelta(hours=rng.randint(7, 22), minutes=rng.randint(0, 59))
+    return {
+        "_id": new_id(rng),
+        "user_id": user_id,
+        "amount": rng.choice([0.25, 0.33, 0.5, 0.75]),
+        "date": time,
+        "time": time,
+        "notes": "",
+        "created_at": time,
+        "updated_at": time
+    }
+
+def make_post(rng: random.Random, user: Dict, user_ids: List[str], created_at: datetime) -> Dict:
+    return {
+        "_id": new_id(rng),
+        "user_id": str(user["_id"]),
+        "user_name": user["name"],
+        "content": rng.choice([
+            "New personal best today!", "Rest day, back at it tomorrow.",
+            "Meal prep done for the week.", "Morning run in the rain."
+        ]),
+        "likes": rng.sample(user_ids, min(len(user_ids), rng.randint(0, 5))),
+        "comments": [],
+        "created_at": created_at
+    }
+
+async def insert_batched(collection, documents: List[Dict]):
+    for start in range(0, len(documents), BATCH_SIZE):
+        await collection.insert_many(documents[start:start + BATCH_SIZE])
+
+async def seed_dataset(db, users: int = 50, days: int = 60, posts_per_user: int = 3,
+                       seed: int = 42) -> Dict:
+    """
+    Write users with `days` of history ending today and return their contexts
+
+    The same seed always produces the same documents and ids; dates are anchored to
+    the current day so "today" endpoints have data. Each context carries the
+    user's auth headers and the ids of their documents for path parameters.
+    """
+    rng = random.Random(seed)
+    today = day_start(datetime.utcnow())
+    password_hash = get_password_hash(PASSWORD)
+
+    user_docs = [make_user(rng, index, password_hash, today - timedelta(days=days)) for index in range(users)]
+    user_ids = [str(user["_id"]) for user in user_docs]
+    for user in user_docs:
+        user["following"] = rng.sample(user_ids, min(len(user_ids), 10))
+
+    meals, workouts, water, posts, weight_logs = [], [], [], [], []
+    contexts = []
+    for user in user_docs:
+        user_id = str(user["_id"])
+        weight = user["weight"]
+        first_meal, first_workout, first_water = len(meals), len(workouts), len(water)
+        for offset in range(days, -1, -1):
+            day = today - timedelta(days=offset)
+            meal_types = ["breakfast", "lunch", "dinner"] + (["snack"] if rng.random() < 0.5 else [])
+            meals.extend(make_meal(rng, user_id, day, meal_type) for meal_type in meal_types)
+            if rng.random() < 4 / 7:
+                workouts.append(make_workout(rng, user, day))
+            water.extend(make_water(rng, user_id, day) for _ in range(rng.randint(3, 8)))
+            if offset % 7 == 0:
+                weight = round(weight + rng.uniform(-0.8, 0.6), 1)
+                weight_logs.append({"user_id": user_id, "weight": weight, "date": day})
+        posts.extend(
+            make_post(rng, user, user_ids, today - timedelta(days=rng.randint(0, days), hours=rng.randint(0, 23)))
+            for _ in range(posts_per_user)
+        )
+        contexts.append({
+            "id": user_id,
+            "email": user["email"],
+            "headers": {"Authorization": f"Bearer {create_user_token(user_id)}"},
+            "meal_ids": [str(doc["_id"]) for doc in meals[first_meal:]],
+            "workout_ids": [str(doc["_id"]) for doc in workouts[first_workout:]],
+            "water_ids": [str(doc["_id"]) for doc in water[first_water:]]
+        })
+
+    await insert_batched(db.users, user_docs)
+    await insert_batched(db.meals, meals)
+    await insert_batched(db.workouts, workouts)
+    await insert_batched(db.water, water)
+    await insert_batched(db.social_posts, posts)
+    await insert_batched(db.weight_logs, weight_logs)
+    for user_id in user_ids:
+        await rebuild_daily_totals(db, user_id)
+        await recompute_personal_records(db, user_id)
+        await repair_streak(db, user_id)
+
+    return {
+        "users": contexts,
+        "post_ids": [str(doc["_id"]) for doc in posts],
+        "counts": {
+            "users": len(user_docs), "meals": len(meals), "workouts": len(workouts),
+            "water": len(water), "social_posts": len(posts), "weight_logs": len(weight_logs)
+        }
+    }
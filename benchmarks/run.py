@@ -0,0 +1,215 @@
+"""
+Drive every router in-process and report throughput and latency percentiles.
+
+Seeds a synthetic dataset, then sends requests through httpx's ASGI transport
+(no network, no server) at each concurrency level and writes one JSON report.
+By default the database is mongomock (in memory, single threaded), which is
+good for comparing application-side CPU cost between runs; point --mongo-uri
+at a disposable local MongoDB for numbers that include real query cost.
+mongomock has no $dateTrunc, so analytics.trends only runs against MongoDB.
+Run with AI_PROVIDER=fake (see FAKE_LLM_* settings) to include the /ai routes
+that call an LLM without spending provider quota.
+
+Each (endpoint, concurrency level) gets its request list generated up front
+from its own Random, so the sequence does not depend on how workers
+interleave. Endpoints that write run after all read-only ones, so reads are
+always measured against the freshly seeded dataset. The adaptive concurrency
+limiter is off unless --concurrency-limits is passed, so runs measure endpoint
+latency rather than load shedding.
+
+Usage:
+    python -m benchmarks.run [--users 50] [--days 60] [--requests 200]
+                             [--concurrency 1,10,50] [--only meals,water]
+                             [--mongo-uri mongodb://localhost:27017/bench --drop]
+                             [--include-llm] [--concurrency-limits]
+                             [--output report.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Tuple
+import httpx
+import numpy as np
+from app.config import settings
+import app.database as database
+from app.routers.ai import init_ai_providers
+from benchmarks.dataset import COLLECTIONS, seed_dataset
+from benchmarks.scenarios import ENDPOINTS, Endpoint
+
+RESULTS_DIR = "benchmark-results"
+WARMUP_REQUESTS = 5
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def summarize(latencies: List[float], elapsed: float, statuses: Counter) -> Dict:
+    millis = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(millis, [50, 95, 99])
+    errors = sum(count for code, count in statuses.items() if code >= 400)
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(float(millis.mean()), 2),
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "max": round(float(millis.max()), 2)
+        },
+        "errors": errors,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+def plan(endpoint: Endpoint, users: List[Dict], dataset: Dict, count: int,
+         rng: random.Random) -> List[Tuple[str, str, Dict]]:
+    """The `count` requests of one measurement, in the order they are sent"""
+    return [endpoint.request(rng, rng.choice(users), dataset) for _ in range(count)]
+
+async def measure(client: httpx.AsyncClient, requests: List[Tuple[str, str, Dict]], concurrency: int) -> Dict:
+    """Send the planned requests from `concurrency` concurrent workers"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    # Shared across workers; the event loop is single threaded so no lock is needed
+    remaining = iter(requests)
+
+    async def worker():
+        for method, path, kwargs in remaining:
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, statuses)
+
+async def connect(args):
+    if args.mongo_uri:
+        settings.MONGODB_URI = args.mongo_uri
+        await database.connect_to_mongo()
+        existing = set(await database.db.list_collection_names()) & set(COLLECTIONS)
+        if existing and not args.drop:
+            raise SystemExit(f"{database.db.name} already has {sorted(existing)}; pass --drop to reset it")
+        for name in COLLECTIONS:
+            await database.db.drop_collection(name)
+        await database.ensure_indexes()
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        database.client = AsyncMongoMockClient()
+        database.db = database.client["fitness_tracker"]
+        await database.ensure_indexes()
+
+async def run(args) -> Dict:
+    # The middleware stack is fixed when app.main is imported
+    settings.CONCURRENCY_LIMITS_ENABLED = args.concurrency_limits
+    from app.main import app
+
+    started_at = datetime.utcnow()
+    await connect(args)
+    # ASGITransport does not run the lifespan, so do its non-database warm-up here
+    init_ai_providers()
+    try:
+        seed_start = time.perf_counter()
+        dataset = await seed_dataset(database.db, args.users, args.days, args.posts_per_user, args.seed)
+        seed_seconds = time.perf_counter() - seed_start
+        print(f"Seeded {dataset['counts']} in {seed_seconds:.1f}s", file=sys.stderr)
+
+        endpoints = [
+            endpoint for endpoint in ENDPOINTS
+            if (args.include_llm or not endpoint.llm)
+            and (args.mongo_uri or not endpoint.mongodb_only)
+            and (not args.only or any(name in endpoint.name for name in args.only))
+        ]
+        # Stable sort: catalogue order within the read-only and writing groups
+        endpoints.sort(key=lambda endpoint: endpoint.writes)
+        results = []
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for endpoint in endpoints:
+                users = [user for user in dataset["users"] if endpoint.accepts(user, dataset)]
+                if not users:
+                    print(f"{endpoint.name:<28} skipped: no user has documents for its path", file=sys.stderr)
+                    continue
+
+                def requests_for(level) -> List[Tuple[str, str, Dict]]:
+                    rng = random.Random(f"{args.seed}:{endpoint.name}:{level}")
+                    return plan(endpoint, users, dataset, WARMUP_REQUESTS if level == "warmup" else args.requests, rng)
+
+                await measure(client, requests_for("warmup"), 1)
+                for concurrency in args.concurrency:
+                    stats = await measure(client, requests_for(concurrency), concurrency)
+                    results.append({
+                        "endpoint": endpoint.name, "method": endpoint.method, "path": endpoint.path,
+                        "concurrency": concurrency, "writes": endpoint.writes, **stats
+                    })
+                    latency = stats["latency_ms"]
+                    print(
+                        f"{endpoint.name:<28} c={concurrency:<4} {stats['throughput_rps']:>8.1f} rps  "
+                        f"p50={latency['p50']:>8.2f}  p95={latency['p95']:>8.2f}  p99={latency['p99']:>8.2f} ms"
+                        + (f"  errors={stats['errors']}" if stats["errors"] else ""),
+                        file=sys.stderr
+                    )
+    finally:
+        if args.mongo_uri:
+            await database.close_mongo_connection()
+
+    return {
+        "meta": {
+            "started_at": started_at.isoformat() + "Z",
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "backend": "mongodb" if args.mongo_uri else "mongomock",
+            "seed": args.seed,
+            "dataset": dataset["counts"],
+            "seed_seconds": round(seed_seconds, 2),
+            "requests_per_level": args.requests,
+            "concurrency": args.concurrency,
+            "concurrency_limits": args.concurrency_limits
+        },
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process HTTP benchmark over a synthetic dataset")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--days", type=int, default=60, help="Days of history per user")
+    parser.add_argument("--posts-per-user", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint per concurrency level")
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")],
+                        default=[1, 10, 50], help="Comma-separated concurrency levels")
+    parser.add_argument("--only", type=lambda value: value.split(","), help="Endpoint name substrings to run")
+    parser.add_argument("--include-llm", action="store_true", help="Also run endpoints that call Gemini/Groq")
+    parser.add_argument("--concurrency-limits", action="store_true",
+                        help="Keep the adaptive concurrency limiter (503 load shedding) enabled")
+    parser.add_argument("--mongo-uri", help="Benchmark against this MongoDB instead of mongomock")
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark collections before seeding")
+    parser.add_argument("--output", help=f"Report path (default {RESULTS_DIR}/<timestamp>.json)")
+    args = parser.parse_args()
+
+    # Per-request app logging would dominate the measurements
+    logging.getLogger("app").setLevel(logging.WARNING)
+    report = asyncio.run(run(args))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"✅ Wrote {output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
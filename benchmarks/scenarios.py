@@ -0,0 +1,112 @@
+"""
+The endpoints the benchmark drives, covering every router.
+
+Each Endpoint turns a seeded user context into one request; path parameters
+are filled from that user's own documents so lookups hit real data.
+Endpoints marked `writes` change documents other scenarios read, so the
+runner measures them after every read-only endpoint.
+"""
+import random
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from benchmarks.dataset import FOODS, PASSWORD
+
+class Endpoint:
+    def __init__(self, name: str, method: str, path: str,
+                 body: Optional[Callable[[random.Random, Dict], Dict]] = None,
+                 form: bool = False, llm: bool = False, writes: bool = False,
+                 mongodb_only: bool = False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        # Body is sent form-encoded (OAuth2 login) rather than as JSON
+        self.form = form
+        # Calls Gemini/Groq when keys are configured
+        self.llm = llm
+        # Inserts or edits documents, growing or changing the dataset
+        self.writes = writes
+        # Uses server features mongomock lacks ($dateTrunc)
+        self.mongodb_only = mongodb_only
+
+    def accepts(self, user: Dict, dataset: Dict) -> bool:
+        """Whether the user has documents for every path parameter"""
+        return all(
+            f"{{{name}}}" not in self.path or (dataset if name == "post_id" else user)[f"{name}s"]
+            for name in ("meal_id", "workout_id", "water_id", "post_id")
+        )
+
+    def request(self, rng: random.Random, user: Dict, dataset: Dict) -> Tuple[str, str, Dict]:
+        path = self.path.format(
+            meal_id=rng.choice(user["meal_ids"]) if "{meal_id}" in self.path else "",
+            workout_id=rng.choice(user["workout_ids"]) if "{workout_id}" in self.path else "",
+            water_id=rng.choice(user["water_ids"]) if "{water_id}" in self.path else "",
+            post_id=rng.choice(dataset["post_ids"]) if "{post_id}" in self.path else ""
+        )
+        kwargs: Dict = {"headers": user["headers"]}
+        if self.body is not None:
+            kwargs["data" if self.form else "json"] = self.body(rng, user)
+        return self.method, path, kwargs
+
+def meal_body(rng: random.Random, user: Dict) -> Dict:
+    foods = [
+        {"name": food["name"], "quantity": 100, "unit": food["unit"], "calories": food["calories"],
+         "protein": food["protein"], "carbs": food["carbs"], "fats": food["fats"]}
+        for food in rng.sample(FOODS, 2)
+    ]
+    return {"type": rng.choice(["breakfast", "lunch", "dinner", "snack"]), "foods": foods}
+
+def workout_body(rng: random.Random, user: Dict) -> Dict:
+    return {
+        "title": "Benchmark session",
+        "type": "strength",
+        "duration": 45,
+        "exercises": [
+            {"name": "Barbell Squats", "sets": 3, "reps": rng.randint(5, 10), "weight": float(rng.randrange(60, 140, 5))},
+            {"name": "Barbell Bench Press", "sets": 3, "reps": rng.randint(5, 10), "weight": float(rng.randrange(40, 100, 5))}
+        ]
+    }
+
+def water_body(rng: random.Random, user: Dict) -> Dict:
+    return {"amount": rng.choice([0.25, 0.5]), "date": datetime.utcnow().isoformat()}
+
+ENDPOINTS: List[Endpoint] = [
+    # auth
+    Endpoint("auth.me", "GET", "/auth/me"),
+    Endpoint("auth.update_me", "PUT", "/auth/me", lambda rng, user: {"bio": f"bio {rng.randint(0, 999)}"},
+             writes=True),
+    Endpoint("auth.login", "POST", "/auth/login",
+             lambda rng, user: {"username": user["email"], "password": PASSWORD}, form=True),
+    # users
+    Endpoint("users.stats_detailed", "GET", "/users/stats/detailed"),
+    Endpoint("users.personal_records", "GET", "/users/personal-records"),
+    # workouts
+    Endpoint("workouts.list", "GET", "/workouts/"),
+    Endpoint("workouts.get", "GET", "/workouts/{workout_id}"),
+    Endpoint("workouts.progression", "GET", "/workouts/progression"),
+    Endpoint("workouts.create", "POST", "/workouts/", workout_body, writes=True),
+    # meals
+    Endpoint("meals.list", "GET", "/meals/"),
+    Endpoint("meals.get", "GET", "/meals/{meal_id}"),
+    Endpoint("meals.create", "POST", "/meals/", meal_body, writes=True),
+    Endpoint("meals.update", "PUT", "/meals/{meal_id}", lambda rng, user: {"notes": "edited"}, writes=True),
+    # water
+    Endpoint("water.list", "GET", "/water/"),
+    Endpoint("water.today", "GET", "/water/today"),
+    Endpoint("water.stats", "GET", "/water/stats"),
+    Endpoint("water.get", "GET", "/water/{water_id}"),
+    Endpoint("water.create", "POST", "/water/", water_body, writes=True),
+    # social
+    Endpoint("social.feed", "GET", "/social/feed"),
+    Endpoint("social.create_post", "POST", "/social/posts", lambda rng, user: {"content": "Benchmark post"},
+             writes=True),
+    Endpoint("social.like", "POST", "/social/posts/{post_id}/like", writes=True),
+    # analytics
+    Endpoint("analytics.trends", "GET", "/analytics/trends", mongodb_only=True),
+    Endpoint("analytics.energy_balance", "GET", "/analytics/energy-balance"),
+    # ai
+    Endpoint("ai.food_database", "GET", "/ai/food-database"),
+    Endpoint("ai.workout_plan", "POST", "/ai/workout-plan", llm=True),
+    Endpoint("ai.predict_calories", "POST", "/ai/predict-calories", llm=True),
+    Endpoint("ai.diet_recommendations", "POST", "/ai/diet-recommendations", llm=True)
+]
@@ -0,0 +1,29 @@
+"""
+Gunicorn settings for production (loaded automatically from the repo root).
+
+    gunicorn app.main:app
+
+Each worker writes Prometheus metrics to its own file under
+PROMETHEUS_MULTIPROC_DIR so /metrics reports totals across workers.
+"""
+import os
+import shutil
+
+# Must be set before prometheus_client is first imported: it picks its
+# single- or multi-process value class at import time, and workers inherit
+# the master's modules when they fork
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/fitness-tracker-metrics")
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+def on_starting(server):
+    # Stale files from a previous run would be merged into the new totals
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,130 @@
+"""
+Shared fixtures: an app client over a seeded database that counts queries.
+
+By default the database is mongomock wrapped in CountingDatabase, which
+reports each collection operation to the request's QueryStats the way the
+pymongo command listener does against a real server. Set TEST_MONGODB_URI to
+run against a local MongoDB instead (its collections are dropped and reseeded);
+counts then come from the listener itself.
+"""
+import asyncio
+import os
+
+# Never reach a real LLM from tests, whatever .env configures
+os.environ["AI_PROVIDER"] = "fake"
+os.environ["FAKE_LLM_MEDIAN_MS"] = "0"
+os.environ["FAKE_LLM_SIGMA"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+import app.database as database
+from app.config import settings
+from app.main import app
+from app.routers.ai import init_ai_providers
+from app.utils.db_monitor import query_stats_var
+from benchmarks.dataset import COLLECTIONS, seed_dataset
+
+TEST_MONGODB_URI = os.getenv("TEST_MONGODB_URI")
+
+# Collection methods that issue one command per call
+COMMAND_METHODS = {
+    "find_one", "find_one_and_update", "find_one_and_delete", "find_one_and_replace",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "count_documents", "estimated_document_count",
+    "distinct", "bulk_write", "create_index"
+}
+# Methods returning a cursor; counted once when the cursor is opened
+CURSOR_METHODS = {"find", "aggregate"}
+
+def count_command():
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.add(0)
+
+class CountingCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in COMMAND_METHODS and name not in CURSOR_METHODS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            count_command()
+            return attribute(*args, **kwargs)
+        return counted
+
+class CountingDatabase:
+    def __init__(self, db):
+        self._db = db
+
+    def __getattr__(self, name):
+        attribute = getattr(self._db, name)
+        if name == "command":
+            def counted(*args, **kwargs):
+                count_command()
+                return attribute(*args, **kwargs)
+            return counted
+        if hasattr(attribute, "find_one"):
+            return CountingCollection(attribute)
+        return attribute
+
+    def __getitem__(self, name):
+        return CountingCollection(self._db[name])
+
+    def get_collection(self, name, **kwargs):
+        return CountingCollection(self._db.get_collection(name, **kwargs))
+
+def query_count(response) -> int:
+    return int(response.headers["X-DB-Query-Count"])
+
+def run_async(client, func):
+    """Run a coroutine function on the loop the database client belongs to"""
+    # Against TEST_MONGODB_URI the Motor client belongs to the TestClient's loop
+    if client.portal is not None:
+        return client.portal.call(func)
+    return asyncio.run(func())
+
+@pytest.fixture(scope="session")
+def seeded_client():
+    """(client, dataset) over 3 users with two weeks of history"""
+    if TEST_MONGODB_URI:
+        settings.MONGODB_URI = TEST_MONGODB_URI
+        with TestClient(app) as client:
+            for name in COLLECTIONS:
+                client.portal.call(database.db.drop_collection, name)
+            dataset = client.portal.call(seed_dataset, database.db, 3, 14)
+            yield client, dataset
+        return
+
+    from mongomock_motor import AsyncMongoMockClient
+    database.client = AsyncMongoMockClient()
+    database.db = CountingDatabase(database.client["fitness_tracker_test"])
+    asyncio.run(database.ensure_indexes())
+    # TestClient outside a `with` block skips the lifespan warm-up
+    init_ai_providers()
+    dataset = asyncio.run(seed_dataset(database.db, 3, 14))
+    yield TestClient(app), dataset
+
+@pytest.fixture(scope="session")
+def client(seeded_client):
+    return seeded_client[0]
+
+@pytest.fixture(scope="session")
+def dataset(seeded_client):
+    return seeded_client[1]
+
+@pytest.fixture(scope="session")
+def user(dataset):
+    return dataset["users"][0]
+
+@pytest.fixture(scope="session")
+def empty_user(client):
+    """A registered user with no logged history"""
+    response = client.post("/auth/register", json={
+        "name": "Empty", "email": "empty@example.com", "password": "password",
+        "age": 30, "gender": "female", "height": 170, "weight": 65
+    })
+    assert response.status_code == 200, response.text
+    return {"headers": {"Authorization": f"Bearer {response.json()['access_token']}"}}
@@ -0,0 +1,23 @@
+"""
+Benchmark request plans are reproducible and skip users without documents.
+"""
+import random
+from benchmarks.run import plan
+from benchmarks.scenarios import ENDPOINTS
+
+ENDPOINTS_BY_NAME = {endpoint.name: endpoint for endpoint in ENDPOINTS}
+
+def test_plans_depend_only_on_their_seed(dataset):
+    endpoint = ENDPOINTS_BY_NAME["workouts.get"]
+
+    first = plan(endpoint, dataset["users"], dataset, 20, random.Random("42:workouts.get:10"))
+    second = plan(endpoint, dataset["users"], dataset, 20, random.Random("42:workouts.get:10"))
+
+    assert first == second
+
+def test_users_without_documents_are_not_accepted(dataset, user):
+    no_workouts = {**user, "workout_ids": []}
+
+    assert not ENDPOINTS_BY_NAME["workouts.get"].accepts(no_workouts, dataset)
+    assert ENDPOINTS_BY_NAME["meals.get"].accepts(no_workouts, dataset)
+    assert ENDPOINTS_BY_NAME["workouts.list"].accepts(no_workouts, dataset)
@@ -0,0 +1,68 @@
+"""
+Load shedding under a saturated AI route class.
+
+The LLM call runs on a worker thread, so a backlog of slow /ai requests
+fills the AI limit and is shed with 503 while CRUD requests on the same
+event loop keep answering promptly.
+"""
+import asyncio
+import time
+import httpx
+import app.routers.ai as ai
+from app.main import app
+from app.middleware.concurrency import AIMDLimit, ConcurrencyLimitMiddleware
+from app.services.fake_llm import FakeLLM
+from tests.conftest import run_async
+
+LLM_MS = 400
+AI_LIMIT = 2
+AI_REQUESTS = 6
+
+ORIGIN = "http://localhost:3000"
+
+def app_limiter() -> ConcurrencyLimitMiddleware:
+    """The limiter inside the app's own middleware stack, under CORS"""
+    if app.middleware_stack is None:
+        app.middleware_stack = app.build_middleware_stack()
+    layer = app.middleware_stack
+    while not isinstance(layer, ConcurrencyLimitMiddleware):
+        layer = layer.app
+    return layer
+
+def test_saturated_ai_routes_shed_while_crud_stays_fast(client, user, monkeypatch):
+    monkeypatch.setattr(ai, "fake_llm", FakeLLM(median_ms=LLM_MS, sigma=0))
+    monkeypatch.setattr(app_limiter(), "limits", {
+        # max_limit starts the limit at half its value
+        "ai": AIMDLimit("ai", AI_LIMIT * 2, 10_000),
+        "auth": AIMDLimit("auth", 8, 10_000),
+        "crud": AIMDLimit("crud", 100, 10_000)
+    })
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            async def chat():
+                return await http.post("/ai/chat-with-trainer", params={"question": "How often?"},
+                                       headers={**user["headers"], "Origin": ORIGIN})
+
+            async def crud():
+                # Let the AI requests get admitted first
+                await asyncio.sleep(LLM_MS / 4000)
+                start = time.perf_counter()
+                response = await http.get("/auth/me", headers=user["headers"])
+                return response, time.perf_counter() - start
+
+            return await asyncio.gather(*(chat() for _ in range(AI_REQUESTS)), crud())
+
+    *chats, (me, me_seconds) = run_async(client, scenario)
+
+    statuses = sorted(response.status_code for response in chats)
+    assert statuses == [200] * AI_LIMIT + [503] * (AI_REQUESTS - AI_LIMIT)
+    shed = [response for response in chats if response.status_code == 503]
+    for response in shed:
+        assert int(response.headers["Retry-After"]) >= 1
+        # Readable by the web frontend
+        assert response.headers["Access-Control-Allow-Origin"] == ORIGIN
+        assert "Retry-After" in response.headers["Access-Control-Expose-Headers"]
+    assert me.status_code == 200
+    assert me_seconds < LLM_MS / 2000
@@ -0,0 +1,66 @@
+"""
+Daily totals: UTC day bucketing and per-user serialization of prefix-sum updates.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from mongomock_motor import AsyncMongoMockClient
+from app.services.daily_totals import apply_delta, day_start, rebuild_daily_totals
+
+DAY = datetime(2024, 3, 1)
+
+def test_day_start_buckets_aware_times_by_utc_day():
+    plus_five = timezone(timedelta(hours=5))
+
+    assert day_start(datetime(2024, 3, 2, 1, 30, tzinfo=plus_five)) == DAY
+    assert day_start("2024-03-01T23:30:00-02:00") == DAY + timedelta(days=1)
+    assert day_start("2024-03-01T23:30:00Z") == DAY
+    assert day_start(datetime(2024, 3, 1, 23, 30)) == DAY
+
+class PausedAfterRead:
+    """daily_totals whose seed read waits for a gate, so another write can land in between"""
+
+    def __init__(self, collection, gate: asyncio.Event):
+        self._collection = collection
+        self._gate = gate
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    async def find_one(self, *args, **kwargs):
+        result = await self._collection.find_one(*args, **kwargs)
+        await self._gate.wait()
+        return result
+
+class PausedDatabase:
+    def __init__(self, db, gate: asyncio.Event):
+        self.daily_totals = PausedAfterRead(db.daily_totals, gate)
+        self.daily_totals_locks = db.daily_totals_locks
+
+def test_write_to_an_earlier_day_waits_for_a_new_day_to_be_seeded():
+    db = AsyncMongoMockClient()["daily_totals_test"]
+    workouts = [(DAY, 100), (DAY + timedelta(days=2), 10), (DAY + timedelta(days=1), 5)]
+
+    async def scenario():
+        await db.workouts.insert_many([
+            {"user_id": "u1", "date": date, "calories_burned": calories} for date, calories in workouts
+        ])
+        await apply_delta(db, "u1", DAY, {"calories_out": 100})
+
+        # Day 3 reads its seed; the day 2 write starts before day 3 is created
+        gate = asyncio.Event()
+        late = asyncio.create_task(apply_delta(PausedDatabase(db, gate), "u1", workouts[1][0], {"calories_out": 10}))
+        await asyncio.sleep(0)
+        early = asyncio.create_task(apply_delta(db, "u1", workouts[2][0], {"calories_out": 5}))
+        await asyncio.sleep(0.05)
+        gate.set()
+        await asyncio.gather(late, early)
+
+        applied = await db.daily_totals.find_one({"user_id": "u1", "day": workouts[1][0]})
+        await rebuild_daily_totals(db, "u1")
+        rebuilt = await db.daily_totals.find_one({"user_id": "u1", "day": workouts[1][0]})
+        return applied, rebuilt
+
+    applied, rebuilt = asyncio.run(scenario())
+
+    assert applied["cum_calories_out"] == 115
+    assert rebuilt["cum_calories_out"] == 115
@@ -0,0 +1,34 @@
+"""
+Resolving logged exercise names, including misspellings and vague ones.
+"""
+import pytest
+from app.services.exercise_registry import ExerciseRegistry, exercise_registry
+
+@pytest.mark.parametrize("name, exercise_id", [
+    ("Bench", "barbell_bench_press"),
+    ("push ups", "push_ups"),
+    ("Benchpress", "barbell_bench_press"),
+    ("bench pres", "barbell_bench_press"),
+    ("Runing", "running_outdoor"),
+    ("Treadmil", "treadmill_running"),
+    ("Barbel squat", "barbell_squats"),
+    ("squat jump", "jump_squats"),
+    ("Swimming laps", "swimming")
+])
+def test_resolves_aliases_and_misspellings(name, exercise_id):
+    assert exercise_registry.resolve(name)["id"] == exercise_id
+
+@pytest.mark.parametrize("name", ["Press", "Jumps", "Stretching", "incline press", "cycle"])
+def test_vague_names_do_not_resolve(name):
+    assert exercise_registry.resolve(name) is None
+
+def test_resolutions_are_cached_per_registry(monkeypatch):
+    monkeypatch.setattr("app.services.exercise_registry.RESOLVE_CACHE_SIZE", 2)
+    first, second = ExerciseRegistry.build(), ExerciseRegistry.build()
+
+    assert first.resolve_id("runing") == "running_outdoor"
+    assert "runing" in first._resolved
+    assert "runing" not in second._resolved
+    for key in ("cycling", "swimming", "rowing"):
+        first.resolve_id(key)
+    assert list(first._resolved) == ["swimming", "rowing"]
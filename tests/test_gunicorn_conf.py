@@ -0,0 +1,36 @@
+"""
+gunicorn.conf.py must switch prometheus_client to multiprocess mode before
+the master imports it, or forked workers write no metric files.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = textwrap.dedent("""
+    import os, runpy, sys
+    config = runpy.run_path("gunicorn.conf.py")
+    assert "PROMETHEUS_MULTIPROC_DIR" in os.environ
+    # Point the hooks at a scratch directory; prometheus_client has not been
+    # imported yet, so it reads this value
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = sys.argv[1]
+    config["on_starting"](None)
+
+    pid = os.fork()
+    if pid == 0:
+        from prometheus_client import Counter
+        Counter("conf_test_requests", "Requests").inc()
+        os._exit(0)
+    os.waitpid(pid, 0)
+""")
+
+def test_forked_worker_writes_to_multiproc_dir(tmp_path):
+    metrics_dir = tmp_path / "metrics"
+    env = {key: value for key, value in os.environ.items() if key != "PROMETHEUS_MULTIPROC_DIR"}
+    subprocess.run(
+        [sys.executable, "-c", WORKER, str(metrics_dir)], cwd=ROOT, env=env, check=True
+    )
+
+    assert any(name.startswith("counter_") for name in os.listdir(metrics_dir))
@@ -0,0 +1,23 @@
+"""
+Queued log records keep their exception for the listener's formatter.
+"""
+import json
+import logging
+import queue
+from app.utils.logger import JSONFormatter, LocalQueueHandler
+
+def test_exception_reaches_json_formatter_as_its_own_field():
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("tests.logger")
+    logger.propagate = False
+    logger.addHandler(LocalQueueHandler(log_queue))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed for %s", "user")
+
+    entry = json.loads(JSONFormatter().format(log_queue.get_nowait()))
+
+    assert entry["msg"] == "failed for user"
+    assert "Traceback" in entry["exc_info"]
+    assert "ValueError: boom" in entry["exc_info"]
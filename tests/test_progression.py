@@ -0,0 +1,48 @@
+"""
+ProgressionEngine history grouping and its data-version keyed cache.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from mongomock_motor import AsyncMongoMockClient
+from app.services.progression import ProgressionEngine
+
+START = datetime(2024, 1, 1)
+
+def workout(day: int, name: str, weight: float, exercise_id: str = None) -> dict:
+    exercise = {"name": name, "sets": 3, "reps": 10, "weight": weight}
+    if exercise_id:
+        exercise["exercise_id"] = exercise_id
+    return {"user_id": "u1", "date": START + timedelta(days=day), "exercises": [exercise]}
+
+def recommendations(engine, db, user):
+    return asyncio.run(engine.get_recommendations(db, user))
+
+def test_legacy_names_group_with_their_exercise_id():
+    db = AsyncMongoMockClient()["progression_test"]
+    asyncio.run(db.workouts.insert_many([
+        # Logged before exercise ids were stored, under an alias
+        workout(0, "Bench", 60),
+        workout(3, "bench press", 62.5),
+        workout(7, "Barbell Bench Press", 65, "barbell_bench_press")
+    ]))
+
+    exercises = recommendations(ProgressionEngine(), db, {"id": "u1"})["exercises"]
+
+    assert [item["exercise_id"] for item in exercises] == ["barbell_bench_press"]
+    assert exercises[0]["sessions"] == 3
+    assert exercises[0]["name"] == "Barbell Bench Press"
+    assert exercises[0]["last"]["weight"] == 65
+
+def test_cache_follows_the_workouts_data_version():
+    db = AsyncMongoMockClient()["progression_test_cache"]
+    asyncio.run(db.workouts.insert_one(workout(0, "Deadlifts", 100, "deadlifts")))
+    engine = ProgressionEngine()
+    user = {"id": "u1", "data_versions": {"workouts": 1}}
+    recommendations(engine, db, user)
+
+    # A write from another worker bumps the version on the user document
+    asyncio.run(db.workouts.insert_one(workout(2, "Deadlifts", 110, "deadlifts")))
+    assert recommendations(engine, db, user)["exercises"][0]["last"]["weight"] == 100
+    user["data_versions"]["workouts"] = 2
+
+    assert recommendations(engine, db, user)["exercises"][0]["last"]["weight"] == 110
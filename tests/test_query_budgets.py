@@ -0,0 +1,117 @@
+"""
+MongoDB command budgets per endpoint.
+
+Each endpoint in the benchmark catalogue declares how many commands one
+request may issue, including the users lookup in get_current_user. A change
+that adds a round trip (a re-read after a write, a diagnostic query, another
+format fallback) fails here; lower the budget when an endpoint gets cheaper.
+Writes are measured as the user's first of the day, their most expensive
+case since it also advances the streak.
+"""
+import random
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+import app.database as database
+import app.routers.analytics as analytics
+from benchmarks.scenarios import ENDPOINTS
+from tests.conftest import TEST_MONGODB_URI, query_count, run_async
+
+BUDGETS = {
+    "auth.me": 1,
+    "auth.update_me": 4,
+    "auth.login": 1,
+    "users.stats_detailed": 10,
+    "users.personal_records": 2,
+    "workouts.list": 2,
+    "workouts.get": 2,
+    "workouts.progression": 2,
+    "workouts.create": 10,
+    "meals.list": 2,
+    "meals.get": 2,
+    "meals.create": 9,
+    "meals.update": 4,
+    "water.list": 2,
+    "water.today": 2,
+    "water.stats": 2,
+    "water.get": 2,
+    "water.create": 9,
+    "social.feed": 3,
+    "social.create_post": 2,
+    "social.like": 4,
+    "analytics.trends": 4,
+    "analytics.energy_balance": 2,
+    "ai.food_database": 1,
+    "ai.workout_plan": 2,
+    "ai.predict_calories": 4,
+    "ai.diet_recommendations": 1
+}
+# Users with no history, where empty results used to trigger extra lookups
+EMPTY_BUDGETS = {
+    # count_with_fallback retries each count with ObjectId user ids
+    "users.stats_detailed": 15,
+    "workouts.list": 2,
+    "meals.list": 2,
+    "water.list": 2,
+    "water.today": 2,
+    "analytics.energy_balance": 2
+}
+# Endpoints answering If-None-Match before the handler runs
+CONDITIONAL = ["users.stats_detailed", "workouts.list", "meals.list", "water.today"]
+
+ENDPOINTS_BY_NAME = {endpoint.name: endpoint for endpoint in ENDPOINTS}
+
+def send(client, endpoint, user, dataset, **headers):
+    method, path, kwargs = endpoint.request(random.Random(0), user, dataset)
+    kwargs["headers"] = {**kwargs["headers"], **headers}
+    return client.request(method, path, **kwargs)
+
+def raw_date_pipeline(user_id, start, end, bucket, sums):
+    return [
+        {"$match": {"user_id": user_id, "date": {"$gte": start, "$lt": end}}},
+        {"$group": {"_id": "$date", **{field: {"$sum": expression} for field, expression in sums.items()}}}
+    ]
+
+@pytest.fixture
+def mongomock_compatible(monkeypatch):
+    # mongomock has no $dateTrunc; grouping on the raw date issues the same
+    # commands, so the count is still the endpoint's
+    if not TEST_MONGODB_URI:
+        monkeypatch.setattr(analytics, "trunc_pipeline", raw_date_pipeline)
+
+def start_new_day(client, user):
+    """Make the user's next write their first of the day"""
+    yesterday = (datetime.utcnow().date() - timedelta(days=1)).isoformat()
+    run_async(client, lambda: database.db.users.update_one(
+        {"_id": ObjectId(user["id"])}, {"$set": {"streak.last_active_day": yesterday}}
+    ))
+
+def test_every_endpoint_has_a_budget():
+    assert set(ENDPOINTS_BY_NAME) == set(BUDGETS)
+
+@pytest.mark.parametrize("name", sorted(BUDGETS))
+def test_query_budget(client, dataset, user, mongomock_compatible, name):
+    endpoint = ENDPOINTS_BY_NAME[name]
+    if endpoint.writes:
+        start_new_day(client, user)
+    response = send(client, endpoint, user, dataset)
+
+    assert response.status_code < 400, response.text
+    assert query_count(response) <= BUDGETS[name]
+
+@pytest.mark.parametrize("name", sorted(EMPTY_BUDGETS))
+def test_query_budget_without_history(client, dataset, empty_user, name):
+    response = send(client, ENDPOINTS_BY_NAME[name], empty_user, dataset)
+
+    assert response.status_code == 200, response.text
+    assert query_count(response) <= EMPTY_BUDGETS[name]
+
+@pytest.mark.parametrize("name", CONDITIONAL)
+def test_not_modified_costs_only_the_user_lookup(client, dataset, user, name):
+    endpoint = ENDPOINTS_BY_NAME[name]
+    etag = send(client, endpoint, user, dataset).headers["ETag"]
+
+    response = send(client, endpoint, user, dataset, **{"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert query_count(response) == 1
@@ -0,0 +1,61 @@
+"""
+Maintenance scripts keep derived data and ETag versions in step with what they rewrite.
+"""
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+import app.scripts.backfill_workout_calories as backfill_script
+import app.scripts.repair_streaks as repair_script
+from app.services.daily_totals import apply_delta, range_totals
+
+DAY = datetime(2024, 3, 1, 18, 0)
+
+def test_backfill_updates_daily_totals_and_workouts_version(monkeypatch):
+    db = AsyncMongoMockClient()["backfill_test"]
+    monkeypatch.setattr(backfill_script, "get_database", lambda: db)
+    user_id = ObjectId()
+
+    async def scenario():
+        await db.users.insert_one({"_id": user_id, "weight": 80, "data_versions": {"workouts": 3}})
+        await db.workouts.insert_one({
+            "user_id": str(user_id), "date": DAY, "title": "Run", "type": "cardio",
+            "duration": 30, "exercises": [], "calories_burned": 0
+        })
+        await apply_delta(db, str(user_id), DAY, {"calories_in": 2000})
+
+        updated = await backfill_script.backfill()
+        workout = await db.workouts.find_one({"user_id": str(user_id)})
+        totals = await range_totals(db, str(user_id), DAY, DAY)
+        user = await db.users.find_one({"_id": user_id})
+        return updated, workout, totals, user
+
+    updated, workout, totals, user = asyncio.run(scenario())
+
+    assert updated == 1
+    assert workout["calories_burned"] > 0
+    assert totals["calories_out"] == workout["calories_burned"]
+    assert totals["calories_in"] == 2000
+    assert user["data_versions"]["workouts"] == 4
+
+def test_repair_streaks_bumps_profile_version_only_when_changed(monkeypatch):
+    db = AsyncMongoMockClient()["repair_streaks_test"]
+    monkeypatch.setattr(repair_script, "get_database", lambda: db)
+    stale, current = ObjectId(), ObjectId()
+    streak = {"current": 1, "longest": 1, "last_active_day": "2024-03-01"}
+
+    async def scenario():
+        await db.users.insert_many([
+            {"_id": stale, "streak": {"current": 5, "longest": 5, "last_active_day": "2024-02-01"}},
+            {"_id": current, "streak": streak}
+        ])
+        for user_id in (stale, current):
+            await db.meals.insert_one({"user_id": str(user_id), "date": DAY})
+        await repair_script.repair()
+        return [await db.users.find_one({"_id": user_id}) for user_id in (stale, current)]
+
+    repaired, untouched = asyncio.run(scenario())
+
+    assert repaired["streak"] == streak
+    assert repaired["data_versions"]["profile"] == 1
+    assert "data_versions" not in untouched
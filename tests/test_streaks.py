@@ -0,0 +1,18 @@
+"""
+Streak day boundaries follow UTC, like the repair job's $dateToString buckets.
+"""
+from datetime import date, datetime, timedelta, timezone
+from app.services.streaks import advance_streak, current_streak
+
+def test_aware_last_active_time_counts_on_its_utc_day():
+    # 23:30 at UTC-5 is already March 2nd in UTC
+    streak = {"current": 3, "longest": 3, "last_active_day": "2024-03-01T23:30:00-05:00"}
+
+    assert current_streak(streak, today=date(2024, 3, 3)) == 3
+    assert advance_streak(streak, date(2024, 3, 2)) is None
+
+def test_aware_datetime_last_active_day():
+    last = datetime(2024, 3, 2, 2, 0, tzinfo=timezone(timedelta(hours=5)))
+    streak = {"current": 2, "longest": 4, "last_active_day": last}
+
+    assert advance_streak(streak, date(2024, 3, 2))["current"] == 3
@@ -0,0 +1,39 @@
+"""
+Trace export and the traces endpoint.
+"""
+import threading
+from app.utils.tracing import Span, Trace, TraceExporter
+
+def finished_trace() -> Trace:
+    trace = Trace()
+    trace.root = Span(trace, "GET /", None, "SERVER")
+    trace.root.end()
+    return trace
+
+def test_traces_endpoint_is_off_by_default(client):
+    assert client.get("/traces/slowest").status_code == 404
+
+def test_concurrent_exports_start_one_writer(tmp_path, monkeypatch):
+    exporter = TraceExporter(str(tmp_path / "traces.jsonl"))
+    barrier = threading.Barrier(8)
+    started = []
+    original_start = threading.Thread.start
+
+    def recording_start(thread):
+        if thread.name == "trace-exporter":
+            started.append(thread)
+        original_start(thread)
+
+    def export():
+        barrier.wait()
+        exporter.export(finished_trace())
+
+    monkeypatch.setattr(threading.Thread, "start", recording_start)
+    threads = [threading.Thread(target=export) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(started) == 1
+    assert len(exporter.recent) == 8
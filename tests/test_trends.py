@@ -0,0 +1,59 @@
+"""
+Trend bucketing: gap filling, rolling means and totals from aggregation rows.
+"""
+from datetime import datetime
+import pytest
+from app.routers.analytics import trend_buckets
+from tests.conftest import TEST_MONGODB_URI
+
+START = datetime(2024, 3, 1)
+END = datetime(2024, 3, 4)
+
+MEALS = [
+    {"_id": datetime(2024, 3, 1), "calories_in": 2000, "protein": 120, "carbs": 200, "fats": 70, "meals": 3},
+    {"_id": datetime(2024, 3, 3), "calories_in": 2400, "protein": 140, "carbs": 260, "fats": 80, "meals": 4}
+]
+WORKOUTS = [{"_id": datetime(2024, 3, 2), "calories_out": 500, "workout_minutes": 45, "workouts": 1}]
+
+def test_empty_buckets_are_zeros():
+    result = trend_buckets((MEALS, WORKOUTS, []), START, END, "day", 0)
+
+    assert [row["period"] for row in result["buckets"]] == [
+        "2024-03-01T00:00:00", "2024-03-02T00:00:00", "2024-03-03T00:00:00"
+    ]
+    assert [row["calories_in"] for row in result["buckets"]] == [2000, 0, 2400]
+    assert [row["net_calories"] for row in result["buckets"]] == [2000, -500, 2400]
+    assert [row["meals"] for row in result["buckets"]] == [3, 0, 4]
+    assert "calories_in_rolling" not in result["buckets"][0]
+
+def test_totals_cover_every_series():
+    totals = trend_buckets((MEALS, WORKOUTS, [{"_id": START, "water_liters": 2.5}]), START, END, "day", 0)["totals"]
+
+    assert totals["calories_in"] == 4400
+    assert totals["calories_out"] == 500
+    assert totals["net_calories"] == 3900
+    assert totals["water_liters"] == 2.5
+    assert totals["workouts"] == 1
+
+def test_rolling_mean_over_buckets():
+    buckets = trend_buckets((MEALS, WORKOUTS, []), START, END, "day", 2)["buckets"]
+
+    assert [row["calories_in_rolling"] for row in buckets] == [2000, 1000, 1200]
+    assert [row["net_calories_rolling"] for row in buckets] == [2000, 750, 950]
+
+def test_week_buckets_start_on_monday():
+    rows = [{"_id": datetime(2024, 3, 4), "calories_in": 14000, "meals": 21}]
+
+    buckets = trend_buckets((rows, [], []), datetime(2024, 2, 26), datetime(2024, 3, 12), "week", 0)["buckets"]
+
+    assert [row["period"][:10] for row in buckets] == ["2024-02-26", "2024-03-04", "2024-03-11"]
+    assert [row["calories_in"] for row in buckets] == [0, 14000, 0]
+
+@pytest.mark.skipif(not TEST_MONGODB_URI, reason="mongomock has no $dateTrunc")
+def test_pipeline_buckets_line_up_with_periods(client, user):
+    response = client.get("/analytics/trends", params={"bucket": "week", "rolling": 0}, headers=user["headers"])
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["totals"]["meals"] == sum(row["meals"] for row in body["buckets"]) > 0
+    assert all(datetime.fromisoformat(row["period"]).weekday() == 0 for row in body["buckets"])
@@ -0,0 +1,37 @@
+"""
+Fallback workout plans are cached briefly so an LLM outage is not retried per request.
+"""
+import app.routers.ai as ai
+from app.services.fake_llm import FakeLLM
+
+class CountingFailingLLM(FakeLLM):
+    def __init__(self):
+        super().__init__(median_ms=0, sigma=0, error_rate=1.0)
+        self.calls = 0
+
+    def generate(self, prompt, system_prompt=None):
+        self.calls += 1
+        return super().generate(prompt, system_prompt)
+
+def request_plans(client, user, days_per_week: int, count: int):
+    for _ in range(count):
+        response = client.post("/ai/workout-plan", params={"days_per_week": days_per_week}, headers=user["headers"])
+        assert response.status_code == 200, response.text
+        assert len(response.json()["weekly_schedule"]) == days_per_week
+
+def test_fallback_plan_is_reused_within_its_ttl(client, user, monkeypatch):
+    llm = CountingFailingLLM()
+    monkeypatch.setattr(ai, "fake_llm", llm)
+
+    request_plans(client, user, 2, 3)
+
+    assert llm.calls == 1
+
+def test_llm_is_retried_once_the_fallback_expires(client, user, monkeypatch):
+    llm = CountingFailingLLM()
+    monkeypatch.setattr(ai, "fake_llm", llm)
+    monkeypatch.setattr(ai, "FALLBACK_PLAN_TTL", 0)
+
+    request_plans(client, user, 3, 2)
+
+    assert llm.calls == 2